@@ -4,17 +4,24 @@ import pandas as pd
 import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from docs.cal_position import cal_position
 from docs.cal_chart import process_chart_data
+from docs.strategy.signal_matrix import signal_matrix
 
 set_timevalue = '5m'
-
-from pymongo import MongoClient
-
-mongoClient = MongoClient("mongodb://mongodb:27017")
-# mongoClient = MongoClient("mongodb://localhost:27017")
-
-database = mongoClient["bitcoin"]
+symbol = 'BTCUSDT'
+BACKTEST_DAYS = 7  # capped 컬렉션(2,100개 5분봉)과 같은 기간
+BACKTEST_INTERVAL_HOURS = 3  # 리버스 설정 갱신 주기
+BAR_MINUTES = 5  # set_timevalue 봉 길이
+WALK_FORWARD_DAYS = 365  # 워크 포워드 검증에 쓸 과거 기간 (로컬 캔들 캐시)
+
+from docs.utility.mongo_client import get_database
+from docs.utility.candle_store import ensure_timestamp_index
+from docs.utility.candle_cache import load_candles, sync_from_collection
+from docs.utility.backtest_engine import backtest_columns, should_reverse
+from docs.utility.walk_forward import run_walk_forward, format_report
+
+# 로컬 실행 시 MONGO_URI=mongodb://localhost:27017
+database = get_database()
 # Capped Collections 초기화
 collections_config = {
     'chart_1m': {'size': 200 * 1500, 'max': 1500},  # 실시간 모니터링용
@@ -34,6 +41,7 @@ for collection_name, config in collections_config.items():
         print(f"{collection_name} Capped Collection 생성됨")
     else:
         print(f"{collection_name} 컬렉션이 이미 존재함")
+    ensure_timestamp_index(database[collection_name])
 
 time.sleep(1)
 
@@ -53,7 +61,7 @@ if set_timevalue not in chart_collections:
 
 # 설정값 저장 및 업데이트
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 def init_reverse_config(database):
     """초기 설정값 생성"""
@@ -127,187 +135,31 @@ handler.setFormatter(formatter)
 logger.addHandler(handler)
 
 
-def evaluate_strategy(df, signal_column):
-    """각 전략의 백테스팅 수행"""
-    initial_capital = 10000000  # 1천만 달러 시작
-    commission_rate = 0.00044   # 0.044%
-    trigger_amount = 800        # 트리거 가격차이 800달러
-
-    positions = df[signal_column].tolist()
-    timestamps = df.index.tolist()
-    current_position = None
-    entry_price = 0
-    entry_time = None
-    position_size = 1
-    capital = initial_capital
-    save_winloss_list =[]
-    wins = 0
-    losses = 0
-   
-    for i in range(len(df) - 1):
-        if current_position is None and positions[i] in ['Long', 'Short']:
-            # 새로운 포지션 진입
-            current_position = positions[i]
-            entry_price = df['open'].iloc[i + 1]
-            entry_time = timestamps[i + 1]
-            
-            # TP/SL 가격 설정
-            if current_position == 'Long':
-                tp_price = entry_price + trigger_amount
-                sl_price = entry_price - trigger_amount
-            else:  # Short
-                tp_price = entry_price - trigger_amount
-                sl_price = entry_price + trigger_amount
-            
-            # 진입 로그 기록
-            # logger.info(f"\n진입 시간: {entry_time}")
-            # logger.info(f"포지션: {current_position}")
-            # logger.info(f"진입가: {entry_price}")
-            # logger.info(f"TP 가격: {tp_price}")
-            # logger.info(f"SL 가격: {sl_price}")
-            
-            # 진입 수수료 계산
-            commission = position_size * entry_price * commission_rate
-            capital -= commission
-            
-        elif current_position:
-            high = df['high'].iloc[i]
-            low = df['low'].iloc[i]
-            close = df['close'].iloc[i]
-            open_price = df['open'].iloc[i]
-            current_time = timestamps[i]
-           
-           # 청산 봉의 OHLC 로깅
-            # logger.info(f"\n체크 봉 OHLC: 시간 {current_time} Open {open_price}, High {high}, Low {low}, Close {close}")
-           
-            # 동일 봉에서 TP와 SL을 모두 만족하는 경우 
-            if current_position == 'Long' and (high >= tp_price and low <= sl_price):
-                # 봉의 방향으로 판단
-                candle_direction = 'up' if close > open_price else 'down'
-                if candle_direction == 'up':  # 양봉이면 TP
-                    profit = tp_price - entry_price
-                    capital += profit
-                    commission = position_size * tp_price * commission_rate
-                    capital -= commission
-                    wins += 1
-                    # 승리 시 0
-                    save_winloss_list.append(0)
-                    # logger.info(f"청산 시간: {current_time} - TP Hit (동일 봉 TPSL, 양봉)")
-                    # logger.info(f"청산가: {tp_price}")
-                    # logger.info(f"수익: {profit}")
-                else:  # 음봉이면 SL
-                    loss = sl_price - entry_price
-                    capital += loss
-                    commission = position_size * sl_price * commission_rate
-                    capital -= commission
-                    losses += 1
-                    # 패배시 1
-                    save_winloss_list.append(1)
-                #     logger.info(f"청산 시간: {current_time} - SL Hit (동일 봉 TPSL, 음봉)")
-                #     logger.info(f"청산가: {sl_price}")
-                #     logger.info(f"손실: {loss}")
-                # logger.info(f"수수료: {commission}")
-                current_position = None
-                
-            elif current_position == 'Short' and (low <= tp_price and high >= sl_price):
-                # 봉의 방향으로 판단
-                candle_direction = 'up' if close > open_price else 'down'
-                if candle_direction == 'down':  # 음봉이면 TP
-                    profit = entry_price - tp_price
-                    capital += profit
-                    commission = position_size * tp_price * commission_rate
-                    capital -= commission
-                    # 승리 시 0
-                    save_winloss_list.append(0)
-                    wins += 1
-                    # logger.info(f"청산 시간: {current_time} - TP Hit (동일 봉 TPSL, 음봉)")
-                    # logger.info(f"청산가: {tp_price}")
-                    # logger.info(f"수익: {profit}")
-                else:  # 양봉이면 SL
-                    loss = entry_price - sl_price
-                    capital += loss
-                    commission = position_size * sl_price * commission_rate
-                    capital -= commission
-                    losses += 1
-                    # 패배시 1
-                    save_winloss_list.append(1)
-                #     logger.info(f"청산 시간: {current_time} - SL Hit (동일 봉 TPSL, 양봉)")
-                #     logger.info(f"청산가: {sl_price}")
-                #     logger.info(f"손실: {loss}")
-                # logger.info(f"수수료: {commission}")
-                current_position = None
-               
-              # TP만 만족하는 경우
-            elif (current_position == 'Long' and high >= tp_price) or \
-                (current_position == 'Short' and low <= tp_price):
-                if current_position == 'Long':
-                    profit = tp_price - entry_price
-                else:
-                    profit = entry_price - tp_price
-                capital += profit
-                commission = position_size * tp_price * commission_rate
-                capital -= commission
-                wins += 1
-                # 승리 시 0
-                save_winloss_list.append(0)
-                # logger.info(f"청산 시간: {current_time} - TP Hit")
-                # logger.info(f"청산가: {tp_price}")
-                # logger.info(f"수익: {profit}")
-                # logger.info(f"수수료: {commission}")
-                current_position = None
-               
-            # SL만 만족하는 경우  
-            elif (current_position == 'Long' and low <= sl_price) or \
-                (current_position == 'Short' and high >= sl_price):
-                if current_position == 'Long':
-                    loss = sl_price - entry_price
-                else:
-                    loss = entry_price - sl_price
-                capital += loss
-                commission = position_size * sl_price * commission_rate
-                capital -= commission
-                losses += 1
-                # 패배시 1
-                save_winloss_list.append(1)
-                # logger.info(f"청산 시간: {current_time} - SL Hit")
-                # logger.info(f"청산가: {sl_price}")
-                # logger.info(f"손실: {loss}")
-                # logger.info(f"수수료: {commission}")
-                current_position = None
-   
-    total_trades = wins + losses
-    def calculate_win_rate(winloss_list):
-        # 0이 승리, 1이 패배이므로 0의 개수를 세어 승리 횟수 계산
-        wins = winloss_list.count(0)
-        
-        # 리스트에 요소가 있는 경우에만 계산
-        total_trades = len(winloss_list)
-        win_rate = (wins / total_trades * 100) if total_trades > 0 else 0
-    
-        return win_rate
-    save_winloss_list = save_winloss_list[-5:]
-    last_5_win_rate = calculate_win_rate(save_winloss_list)
-
-    win_rate = (wins / total_trades * 100) if total_trades > 0 else 0
-    total_pnl = capital - initial_capital
-
-    
-
+def log_strategy_result(signal_column, result):
     logger.info(f"\n{'='*50}")
     logger.info(f"Strategy: {signal_column}")
-    logger.info(f"Initial Capital: ${initial_capital:,.2f}")
-    logger.info(f"Final Capital: ${capital:,.2f}")
-    logger.info(f"Total PnL: ${total_pnl:,.2f}")
-    logger.info(f"Total Trades: {total_trades}")
-    logger.info(f"Wins: {wins}")
-    logger.info(f"Losses: {losses}")
-    logger.info(f"Total Win Rate: {win_rate:.2f}%")
-    logger.info(f"Last 5 Win Rate: {last_5_win_rate:.2f}%")
-
+    logger.info(f"Initial Capital: ${result['initial_capital']:,.2f}")
+    logger.info(f"Final Capital: ${result['capital']:,.2f}")
+    logger.info(f"Total PnL: ${result['total_pnl']:,.2f}")
+    logger.info(f"Total Trades: {result['total_trades']}")
+    logger.info(f"Wins: {result['wins']}")
+    logger.info(f"Losses: {result['losses']}")
+    logger.info(f"Total Win Rate: {result['win_rate']:.2f}%")
+    logger.info(f"Last 5 Win Rate: {result['last_5_win_rate']:.2f}%")
 
-    return last_5_win_rate, total_trades
-
-def backtest_all_strategies(df_backtest):
+def evaluate_strategy(df, signal_column):
+    """각 전략의 백테스팅 수행 (진입/TP·SL/수수료 규칙은 backtest_engine 참고)"""
+    result = backtest_columns(df, [signal_column])[signal_column]
+    log_strategy_result(signal_column, result)
+    return result['last_5_win_rate'], result['total_trades']
+
+def backtest_all_strategies(df_backtest, signals=None):
+    """
+    전략별 백테스트 후 리버스 여부 판단
+    Parameters:
+        df_backtest: 가격(open/high/low/close)이 있는 데이터프레임
+        signals: signal_matrix() 결과 (없으면 df_backtest의 시그널 컬럼 사용)
+    """
     strategy_columns = {
         'lr': 'line_reg_signal',
         'dv': 'macd_dive_signal',
@@ -316,19 +168,47 @@ def backtest_all_strategies(df_backtest):
     }
     
     results = {}
-    
+
+    # 가격 배열을 한 번만 만들어 모든 전략을 같이 평가
+    source = df_backtest if signals is None else signals
+    evaluated = backtest_columns(df_backtest, [column for column in strategy_columns.values() if column in source.columns],
+                                 signals=signals)
+
     for tag, column in strategy_columns.items():
-        if column in df_backtest.columns:
-            # 전략 테스트
-            win_rate, total_trades = evaluate_strategy(df_backtest, column)
-            # 거래가 있을 때만 리버스 여부 판단
-            if total_trades > 0:
-                results[tag] = win_rate < 50
-            else:
-                results[tag] = False  # 거래가 없으면 리버스 하지 않음
+        if column in evaluated:
+            result = evaluated[column]
+            log_strategy_result(column, result)
+            # 거래가 있을 때만 리버스 여부 판단 (거래가 없으면 리버스 하지 않음)
+            results[tag] = should_reverse(result)
     
     return results
 
+def load_backtest_data(chart_collection):
+    """
+    로컬 Arrow 캐시를 Mongo 최신분으로 보충한 뒤 최근 BACKTEST_DAYS일 캔들 로드
+    (마지막 미완성 봉 제외). 캐시를 쓸 수 없으면 기존처럼 Mongo 전체 조회
+    """
+    try:
+        sync_from_collection(symbol, set_timevalue, chart_collection)
+        df = load_candles(symbol, set_timevalue, start=datetime.utcnow() - timedelta(days=BACKTEST_DAYS))
+        if df is not None and len(df) > 1:
+            return df.iloc[:-1]
+    except Exception as e:
+        logger.warning(f"로컬 캔들 캐시 로드 실패, Mongo에서 조회: {e}")
+
+    data_cursor = chart_collection.find().sort("timestamp", -1).skip(1)
+    data_list = list(data_cursor)
+    
+    df = pd.DataFrame(data_list)
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+
+    if '_id' in df.columns:
+        df.drop('_id', axis=1, inplace=True)
+
+    df.set_index('timestamp', inplace=True)
+    df.sort_index(inplace=True)
+    return df
+
 def run_daily_backtest():
     is_firtst_time=True
     chart_collection = database[chart_collections[set_timevalue]] 
@@ -344,17 +224,7 @@ def run_daily_backtest():
             logger.info(f"\n{'='*50}")
             logger.info(f"백테스트 시작 시간: {current_time}")
 
-            data_cursor = chart_collection.find().sort("timestamp", -1).skip(1)
-            data_list = list(data_cursor)
-            
-            df = pd.DataFrame(data_list)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-
-            if '_id' in df.columns:
-                df.drop('_id', axis=1, inplace=True)
-
-            df.set_index('timestamp', inplace=True)
-            df.sort_index(inplace=True)
+            df = load_backtest_data(chart_collection)
 
 
             # 전략 계산
@@ -371,10 +241,12 @@ def run_daily_backtest():
 
                 is_firtst_time = False
 
-            position, df_backtest, tag = cal_position(df=df_calculated, STG_CONFIG = STG_CONFIG)  # 포지션은 숏,롱,None, hma롱, hma숏
+            # 지표 행렬은 위에서 한 번만 계산, 전략은 읽기 전용 컬럼 뷰로 int8 시그널 행렬만 만든다
+            # (cal_position 경로처럼 전략마다 df를 복사하지 않고, 네 전략을 매번 모두 평가)
+            signals = signal_matrix(df_calculated, STG_CONFIG)
 
             # 백테스트 실행
-            backtest_results = backtest_all_strategies(df_backtest)
+            backtest_results = backtest_all_strategies(df_calculated, signals)
             
             # 설정 업데이트
             for tag, should_reverse in backtest_results.items():
@@ -392,16 +264,42 @@ def run_daily_backtest():
             logger.info(f"Strategy Results: {backtest_results}")
             logger.info("백테스트 완료")
             
-            # 6시간 대기
-            time.sleep(3 * 60 * 60)
+            # 다음 갱신까지 대기
+            time.sleep(BACKTEST_INTERVAL_HOURS * 60 * 60)
             
         except Exception as e:
             logger.error(f"백테스트 중 오류 발생: {e}")
             time.sleep(30)  # 오류 발생시 5분 후 재시도
 
-# 실행
-logger.info("백테스트 프로그램 시작")
-run_daily_backtest()
+def run_walk_forward_report():
+    """
+    운영과 같은 주기(최근 BACKTEST_DAYS일로 판단 -> BACKTEST_INTERVAL_HOURS시간 적용)로
+    긴 과거 데이터를 밀어 가며 리버스 판단의 표본 외 성적 확인
+    """
+    chart_collection = database[chart_collections[set_timevalue]]
+    sync_from_collection(symbol, set_timevalue, chart_collection)
+    df = load_candles(symbol, set_timevalue, start=datetime.utcnow() - timedelta(days=WALK_FORWARD_DAYS))
+    if df is None or len(df) < 2:
+        logger.error("워크 포워드: 로컬 캔들 캐시가 없습니다")
+        return None
+    df = df.iloc[:-1]  # 마지막 미완성 봉 제외
+
+    bars_per_hour = 60 // BAR_MINUTES
+    report = run_walk_forward(df, train_size=BACKTEST_DAYS * 24 * bars_per_hour,
+                              test_size=BACKTEST_INTERVAL_HOURS * bars_per_hour)
+    for line in format_report(report):
+        logger.info(line)
+        print(line)
+    return report
+
+# 실행 (python back_test.py --walk-forward: 워크 포워드 검증만 실행하고 종료)
+# 워커 프로세스가 이 파일을 다시 import해도 실행되지 않도록 __main__에서만 시작
+if __name__ == "__main__":
+    if '--walk-forward' in sys.argv:
+        run_walk_forward_report()
+    else:
+        logger.info("백테스트 프로그램 시작")
+        run_daily_backtest()
 
 
     
\ No newline at end of file
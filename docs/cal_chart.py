@@ -1,151 +1,103 @@
 import pandas as pd
-import ta  # 기술적 지표 라이브러리
 import numpy as np
-
-def process_chart_data(df):
-
-    STG_CONFIG = {
-        'MACD_SIZE': {
-            'STG_No' : 1,
-            'MACD_FAST_LENGTH': 12,
-            'MACD_SLOW_LENGTH': 17,
-            'MACD_SIGNAL_LENGTH': 10,
-            'SIZE_RATIO_THRESHOLD': 0.9,
-            'DI_LENGTH': 16,
-            'DI_SLOPE_LENGTH': 11,
-            'MIN_SLOPE_THRESHOLD': 18,
-            'REQUIRED_CONSECUTIVE_CANDLES': 2
-        },
-        'MACD_DIVE': {
-            'STG_No' : 2,
-            'FAST_LENGTH': 10,
-            'SLOW_LENGTH': 21,
-            'SIGNAL_LENGTH': 16,
-            'HISTOGRAM_UPPER_LIMIT': 90,
-            'HISTOGRAM_LOWER_LIMIT': -60,
-            'LOOKBACK_PERIOD': 2,
-            'PRICE_MOVEMENT_THRESHOLD': 0.03
-        },
-        'SUPERTREND': {
-            'STG_No' : 3,
-            'ATR_PERIOD': 30,
-            'ATR_MULTIPLIER': 6,
-            'ADX_LENGTH': 11,
-            'DI_DIFFERENCE_FILTER': 6,
-            'DI_DIFFERENCE_LOOKBACK_PERIOD': 4
-        },
-        'LINEAR_REG': {
-            'STG_No' : 4,
-            'LENGTH': 100,
-            'RSI_LENGTH': 14,
-            'RSI_LOWER_BOUND': 30,
-            'RSI_UPPER_BOUND': 60,
-            'MIN_BOUNCE_BARS': 5,
-            'UPPER_MULTIPLIER': 3,
-            'LOWER_MULTIPLIER': 3,
-            'MIN_SLOPE_VALUE': 6,
-            'MIN_TREND_DURATION': 50
-        },
-        'MACD_DI_SLOPE': {
-            'STG_No' : 5,
-            'FAST_LENGTH': 12,
-            'SLOW_LENGTH': 26,
-            'SIGNAL_LENGTH': 8,
-            'DI_LENGTH': 14,
-            'SLOPE_LENGTH': 3,
-            'RSI_LENGTH': 14,
-            'RSI_UPPER_BOUND': 60,
-            'RSI_LOWER_BOUND': 40,
-            'MIN_SLOPE_THRESHOLD': 6,
-            'REQUIRED_CONSECUTIVE_SIGNALS': 5
-        },
-        'VOLUME_TREND': {
-            'STG_No' : 6,
-            'VOLUME_MA_LENGTH': 9,
-            'TREND_PERIOD': 11,
-            'SIGNAL_THRESHOLD': 0.2,
-            'NORM_PERIOD' : 100
-        }
+from docs.utility.rolling_regression import rolling_linreg, trend_duration
+from docs.utility.indicator_cache import IndicatorCache
+
+# 전략별 설정값 (process_chart_data와 IndicatorState가 공유)
+STG_CONFIG = {
+    'MACD_SIZE': {
+        'STG_No' : 1,
+        'MACD_FAST_LENGTH': 12,
+        'MACD_SLOW_LENGTH': 17,
+        'MACD_SIGNAL_LENGTH': 10,
+        'SIZE_RATIO_THRESHOLD': 0.9,
+        'DI_LENGTH': 16,
+        'DI_SLOPE_LENGTH': 11,
+        'MIN_SLOPE_THRESHOLD': 18,
+        'REQUIRED_CONSECUTIVE_CANDLES': 2
+    },
+    'MACD_DIVE': {
+        'STG_No' : 2,
+        'FAST_LENGTH': 10,
+        'SLOW_LENGTH': 21,
+        'SIGNAL_LENGTH': 16,
+        'HISTOGRAM_UPPER_LIMIT': 90,
+        'HISTOGRAM_LOWER_LIMIT': -60,
+        'LOOKBACK_PERIOD': 2,
+        'PRICE_MOVEMENT_THRESHOLD': 0.03
+    },
+    'SUPERTREND': {
+        'STG_No' : 3,
+        'ATR_PERIOD': 30,
+        'ATR_MULTIPLIER': 6,
+        'ADX_LENGTH': 11,
+        'DI_DIFFERENCE_FILTER': 6,
+        'DI_DIFFERENCE_LOOKBACK_PERIOD': 4
+    },
+    'LINEAR_REG': {
+        'STG_No' : 4,
+        'LENGTH': 100,
+        'RSI_LENGTH': 14,
+        'RSI_LOWER_BOUND': 30,
+        'RSI_UPPER_BOUND': 60,
+        'MIN_BOUNCE_BARS': 5,
+        'UPPER_MULTIPLIER': 3,
+        'LOWER_MULTIPLIER': 3,
+        'MIN_SLOPE_VALUE': 6,
+        'MIN_TREND_DURATION': 50
+    },
+    'MACD_DI_SLOPE': {
+        'STG_No' : 5,
+        'FAST_LENGTH': 12,
+        'SLOW_LENGTH': 26,
+        'SIGNAL_LENGTH': 8,
+        'DI_LENGTH': 14,
+        'SLOPE_LENGTH': 3,
+        'RSI_LENGTH': 14,
+        'RSI_UPPER_BOUND': 60,
+        'RSI_LOWER_BOUND': 40,
+        'MIN_SLOPE_THRESHOLD': 6,
+        'REQUIRED_CONSECUTIVE_SIGNALS': 5
+    },
+    'VOLUME_TREND': {
+        'STG_No' : 6,
+        'VOLUME_MA_LENGTH': 9,
+        'TREND_PERIOD': 11,
+        'SIGNAL_THRESHOLD': 0.2,
+        'NORM_PERIOD' : 100
     }
+}
+
+
+def merge_config(overrides=None):
+    """
+    STG_CONFIG 복사본에 덮어쓸 값 적용 (원본 STG_CONFIG는 바꾸지 않음)
+    Parameters:
+        overrides: {'SUPERTREND': {'ATR_MULTIPLIER': 5}, ...} 형태의 부분 설정
+    """
+    config = {section: dict(values) for section, values in STG_CONFIG.items()}
+    for section, values in (overrides or {}).items():
+        if section not in config:
+            raise KeyError(f"알 수 없는 전략 설정: {section}")
+        for key, value in values.items():
+            if key not in config[section]:
+                raise KeyError(f"알 수 없는 설정 키: {section}.{key}")
+            config[section][key] = value
+    return config
+
+
+def process_chart_data(df, cache=None, config=None):
+    """
+    전략별 지표 계산
+    Parameters:
+        df: OHLCV 데이터프레임
+        cache: 같은 df로 만든 IndicatorCache (없으면 새로 생성, 호출 후 cache.stats()로 적중 통계 확인)
+        config: STG_CONFIG에 덮어쓸 부분 설정 (파라미터 탐색용, 없으면 STG_CONFIG 그대로 사용)
+    """
+    if cache is None:
+        cache = IndicatorCache(df)
+    stg_config = merge_config(config) if config else STG_CONFIG
 
-
-    # 함수 및 공통 계산 부분
-        # SMA 초기값을 사용하는 EMA 함수
-    def ema_with_sma_init(series, period):
-        sma = series.rolling(window=period, min_periods=period).mean()
-        ema = series.ewm(span=period, adjust=False).mean()
-        ema[:period] = sma[:period]  # 초기값을 SMA로 설정
-        return ema
-    
-    def ema_with_sma_init(series, period):
-        # NaN 체크 및 제거
-        if series.isnull().any():
-            print(f"Warning: Input series contains {series.isnull().sum()} NaN values")
-        
-        # EMA multiplier
-        multiplier = 2 / (period + 1)
-        
-        # SMA 계산 (min_periods를 1로 설정하여 초기값 계산 개선)
-        sma = series.rolling(window=period, min_periods=1).mean()
-        
-        # EMA 계산
-        ema = pd.Series(0.0, index=series.index)
-        
-        # 첫 번째 유효한 값을 찾아 초기값으로 사용
-        first_valid_idx = series.first_valid_index()
-        if first_valid_idx:
-            ema.loc[first_valid_idx] = series.loc[first_valid_idx]
-        
-        # EMA 계산 (이전 값이 있는 경우에만 계산)
-        for i in range(1, len(series)):
-            prev_ema = ema.iloc[i-1]
-            curr_price = series.iloc[i]
-            
-            if pd.notna(curr_price) and pd.notna(prev_ema):
-                ema.iloc[i] = (curr_price * multiplier) + (prev_ema * (1 - multiplier))
-            else:
-                ema.iloc[i] = curr_price if pd.notna(curr_price) else prev_ema
-        
-        return ema
-    
-
-    # RMA 함수 정의
-    def rma(series, period):
-        alpha = 1/period
-        return series.ewm(alpha=alpha, adjust=False).mean()
-
-    def wilder_smoothing(series, period):
-        if not isinstance(series, pd.Series):
-            series = pd.Series(series)
-        
-        # 모든 값을 미리 float로 변환
-        series = series.astype(float)
-        
-        first_valid_idx = series.first_valid_index()
-        if first_valid_idx is None:
-            return pd.Series(index=series.index)
-        
-        first_valid_loc = series.index.get_loc(first_valid_idx)
-        if not isinstance(first_valid_loc, (int, np.integer)):
-            first_valid_loc = first_valid_loc.start if isinstance(first_valid_loc, slice) else 0
-        
-        smoothed = np.full(len(series), np.nan)
-        smoothed[first_valid_loc] = series.iloc[first_valid_loc]
-        
-        # 계산 과정
-        for i in range(first_valid_loc + 1, len(series)):
-            current_value = series.iloc[i]
-            prev_value = smoothed[i-1]
-            
-            if np.isnan(current_value):
-                smoothed[i] = prev_value
-            elif np.isnan(prev_value):
-                smoothed[i] = current_value
-            else:
-                smoothed[i] = (prev_value * (period - 1) + current_value) / period
-        
-        return pd.Series(smoothed, index=series.index)
-    
     # ATR 계산
     df['TR'] = pd.Series(np.maximum(df['high'] - df['low'], 
                         np.maximum(abs(df['high'] - df['close'].shift(1)), 
@@ -169,41 +121,41 @@ def process_chart_data(df):
     ''' 여기서부터 계산 부분 '''
 
     # STG_No1 - MACD_SIZE 전략
-    df['EMA_fast_stg1'] = ema_with_sma_init(df['close'], STG_CONFIG['MACD_SIZE']['MACD_FAST_LENGTH'])
-    df['EMA_slow_stg1'] = ema_with_sma_init(df['close'], STG_CONFIG['MACD_SIZE']['MACD_SLOW_LENGTH'])
+    df['EMA_fast_stg1'] = cache.ema('close', stg_config['MACD_SIZE']['MACD_FAST_LENGTH'])
+    df['EMA_slow_stg1'] = cache.ema('close', stg_config['MACD_SIZE']['MACD_SLOW_LENGTH'])
     df['macd_stg1'] = df['EMA_fast_stg1'] - df['EMA_slow_stg1']
-    df['macd_signal_stg1'] = ema_with_sma_init(df['macd_stg1'], STG_CONFIG['MACD_SIZE']['MACD_SIGNAL_LENGTH'])
+    df['macd_signal_stg1'] = cache.ema('macd_stg1', stg_config['MACD_SIZE']['MACD_SIGNAL_LENGTH'])
     df['hist_stg1'] = df['macd_stg1'] - df['macd_signal_stg1']
 
         ## MACD Size 계산부분
     df['hist_size'] = abs(df['hist_stg1'])
     df['candle_size'] = abs(df['close'] - df['open'])
-    df['candle_size_ma'] = df['candle_size'].rolling(window=STG_CONFIG['MACD_SIZE']['MACD_SLOW_LENGTH']).mean()
+    df['candle_size_ma'] = cache.rolling_mean('candle_size', stg_config['MACD_SIZE']['MACD_SLOW_LENGTH'])
     df['normalized_candle_size'] = df['candle_size'] / df['candle_size_ma']
-    df['hist_size_ma'] = df['hist_size'].rolling(window=STG_CONFIG['MACD_SIZE']['MACD_SLOW_LENGTH']).mean()
+    df['hist_size_ma'] = cache.rolling_mean('hist_size', stg_config['MACD_SIZE']['MACD_SLOW_LENGTH'])
     df['normalized_hist_size'] = df['hist_size'] / df['hist_size_ma']
 
 
-    df['Smoothed_TR_stg1'] = wilder_smoothing(df['TR'], STG_CONFIG['MACD_SIZE']['DI_LENGTH'])
-    df['Smoothed_DM+_stg1'] = wilder_smoothing(df['DM+'], STG_CONFIG['MACD_SIZE']['DI_LENGTH'])
-    df['Smoothed_DM-_stg1'] = wilder_smoothing(df['DM-'], STG_CONFIG['MACD_SIZE']['DI_LENGTH'])
+    df['Smoothed_TR_stg1'] = cache.wilder('TR', stg_config['MACD_SIZE']['DI_LENGTH'])
+    df['Smoothed_DM+_stg1'] = cache.wilder('DM+', stg_config['MACD_SIZE']['DI_LENGTH'])
+    df['Smoothed_DM-_stg1'] = cache.wilder('DM-', stg_config['MACD_SIZE']['DI_LENGTH'])
     
     df['DI+_stg1'] = 100 * (df['Smoothed_DM+_stg1'] / df['Smoothed_TR_stg1'])
     df['DI-_stg1'] = 100 * (df['Smoothed_DM-_stg1'] / df['Smoothed_TR_stg1'])
     
         # DI Slopes
-    df['DIPlus_stg1'] = df['DI+_stg1'] - df['DI+_stg1'].shift(STG_CONFIG['MACD_SIZE']['DI_SLOPE_LENGTH'])
-    df['DIMinus_stg1'] = df['DI-_stg1'] - df['DI-_stg1'].shift(STG_CONFIG['MACD_SIZE']['DI_SLOPE_LENGTH'])
+    df['DIPlus_stg1'] = df['DI+_stg1'] - df['DI+_stg1'].shift(stg_config['MACD_SIZE']['DI_SLOPE_LENGTH'])
+    df['DIMinus_stg1'] = df['DI-_stg1'] - df['DI-_stg1'].shift(stg_config['MACD_SIZE']['DI_SLOPE_LENGTH'])
 
 
     ''' STG_No1 MACD_SIZE 계산 끝'''
 
 
     # STG_No2 - MACD_DIVE 전략
-    df['EMA_fast_stg2'] = ema_with_sma_init(df['close'], STG_CONFIG['MACD_DIVE']['FAST_LENGTH'])
-    df['EMA_slow_stg2'] = ema_with_sma_init(df['close'], STG_CONFIG['MACD_DIVE']['SLOW_LENGTH'])
+    df['EMA_fast_stg2'] = cache.ema('close', stg_config['MACD_DIVE']['FAST_LENGTH'])
+    df['EMA_slow_stg2'] = cache.ema('close', stg_config['MACD_DIVE']['SLOW_LENGTH'])
     df['macd_stg2'] = df['EMA_fast_stg2'] - df['EMA_slow_stg2']
-    df['macd_signal_stg2'] = ema_with_sma_init(df['macd_stg2'], STG_CONFIG['MACD_DIVE']['SIGNAL_LENGTH'])
+    df['macd_signal_stg2'] = cache.ema('macd_stg2', stg_config['MACD_DIVE']['SIGNAL_LENGTH'])
     df['hist_stg2'] = df['macd_stg2'] - df['macd_signal_stg2']
     
         # === MACD dive 방향 ===
@@ -214,11 +166,11 @@ def process_chart_data(df):
 
 
     # STG_No3 - SUPERTREND 전략
-    df['atr_stg3'] = rma(df['TR'], STG_CONFIG['SUPERTREND']['ATR_PERIOD'])  # RMA로 변경
+    df['atr_stg3'] = cache.rma('TR', stg_config['SUPERTREND']['ATR_PERIOD'])  # RMA로 변경
 
-    df['Smoothed_TR_stg3'] = wilder_smoothing(df['TR'], STG_CONFIG['SUPERTREND']['ADX_LENGTH'])
-    df['Smoothed_DM+_stg3'] = wilder_smoothing(df['DM+'], STG_CONFIG['SUPERTREND']['ADX_LENGTH'])
-    df['Smoothed_DM-_stg3'] = wilder_smoothing(df['DM-'], STG_CONFIG['SUPERTREND']['ADX_LENGTH'])
+    df['Smoothed_TR_stg3'] = cache.wilder('TR', stg_config['SUPERTREND']['ADX_LENGTH'])
+    df['Smoothed_DM+_stg3'] = cache.wilder('DM+', stg_config['SUPERTREND']['ADX_LENGTH'])
+    df['Smoothed_DM-_stg3'] = cache.wilder('DM-', stg_config['SUPERTREND']['ADX_LENGTH'])
 
     # DI+ 및 DI- 계산
     df['DI+_stg3'] = 100 * (df['Smoothed_DM+_stg3'] / df['Smoothed_TR_stg3'])
@@ -229,128 +181,67 @@ def process_chart_data(df):
 
     # STG_No4 - LINEAR_REG 전략
 
-    length = STG_CONFIG['LINEAR_REG']['LENGTH']
+    length = stg_config['LINEAR_REG']['LENGTH']
     
-    # 초기값 설정
-    df['slope'] = np.nan
-    df['intercept'] = np.nan
-    df['average'] = np.nan
-    
-    # 선형 회귀 계산
-    for i in range(length-1, len(df)):
-        sum_x = 0.0
-        sum_y = 0.0
-        sum_xy = 0.0
-        sum_x2 = 0.0
-        
-        # 파인스크립트와 동일한 방식으로 계산
-        for j in range(length):
-            price = df['close'].iloc[i-j]  # 최신 데이터부터 역순으로
-            x = length - 1 - j  # x값도 역순으로
-            sum_x += x
-            sum_y += price
-            sum_xy += x * price
-            sum_x2 += x * x
-        
-        n = float(length)
-        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
-        intercept = (sum_y - slope * sum_x) / n
-        average = sum_y / n
-        
-        df.loc[df.index[i], 'slope'] = slope
-        df.loc[df.index[i], 'intercept'] = intercept
-        df.loc[df.index[i], 'average'] = average
-
-    # 중심선 계산
-    df['middle_line'] = np.nan
-    for i in range(len(df)):
-        if not np.isnan(df['intercept'].iloc[i]):
-            # 현재 캔들의 중간값 계산
-            candle_middle = (df['close'].iloc[i] + df['open'].iloc[i]) / 2
-            # 파인스크립트와 동일한 방식으로 계산
-            df.loc[df.index[i], 'middle_line'] = df['intercept'].iloc[i] + df['slope'].iloc[i] * candle_middle
+    # 선형 회귀 계산 (파인스크립트와 동일한 방식, 슬라이딩 윈도우로 벡터화)
+    slope, intercept, average, std_dev = rolling_linreg(df['close'], length)
+    df['slope'] = slope
+    df['intercept'] = intercept
+    df['average'] = average
+
+    # 중심선 계산 (현재 캔들의 중간값 기준)
+    candle_middle = (df['close'] + df['open']) / 2
+    df['middle_line'] = df['intercept'] + df['slope'] * candle_middle
     
     # 표준편차 계산
-    df['std_dev'] = np.nan
-
-    for i in range(length-1, len(df)):
-        sum_diff_sq = 0.0
-        current_slope = df['slope'].iloc[i]
-        current_intercept = df['intercept'].iloc[i]
-        
-        for j in range(length):
-            expected_price = current_intercept + current_slope * float(j)
-            idx = i - j  # 명시적으로 인덱스 계산
-            # 최신 데이터부터 과거 순서로 계산
-            diff = df['close'].iat[idx] - expected_price  # iloc 대신 iat 사용
-            sum_diff_sq += diff * diff
-            
-        std_dev = np.sqrt(sum_diff_sq / length)
-        df.loc[df.index[i], 'std_dev'] = std_dev
+    df['std_dev'] = std_dev
     
     # 채널 밴드 계산
-    up_multiplier = STG_CONFIG['LINEAR_REG']['UPPER_MULTIPLIER']
-    lw_multiplier = STG_CONFIG['LINEAR_REG']['LOWER_MULTIPLIER']
+    up_multiplier = stg_config['LINEAR_REG']['UPPER_MULTIPLIER']
+    lw_multiplier = stg_config['LINEAR_REG']['LOWER_MULTIPLIER']
     df['upper_band'] = df['middle_line'] + up_multiplier * df['std_dev']
     df['lower_band'] = df['middle_line'] - lw_multiplier * df['std_dev']
     
     # 추세 지속성 계산
-    df['trend_duration'] = 0
-    current_duration = 0
-    
-    for i in range(len(df)):
-        is_uptrend = df['slope'].iloc[i] >= 0
-        is_downtrend = df['slope'].iloc[i] < 0
-        
-        if i == 0:
-            current_duration = 1 if is_uptrend else -1
-        else:
-            prev_duration = df['trend_duration'].iloc[i-1]
-            if is_uptrend:
-                current_duration = (prev_duration + 1) if prev_duration >= 0 else 1
-            elif is_downtrend:
-                current_duration = (prev_duration - 1) if prev_duration <= 0 else -1
-            else:
-                current_duration = 0
-                
-        df.loc[df.index[i], 'trend_duration'] = current_duration
+    df['trend_duration'] = trend_duration(df['slope'])
 
 
-    rsi_length = STG_CONFIG['LINEAR_REG']['RSI_LENGTH']
-    df['rsi_stg4'] = ta.momentum.rsi(df['close'], window=rsi_length).fillna(50)
+    rsi_length = stg_config['LINEAR_REG']['RSI_LENGTH']
+    df['rsi_stg4'] = cache.rsi('close', rsi_length)
 
     ''' STG_No4 LINEAR_REG 계산 끝 '''
 
     # STG_No5 MACD_DI_SLOPE 전략
-    df['EMA_fast_stg5'] = ema_with_sma_init(df['close'], STG_CONFIG['MACD_DI_SLOPE']['FAST_LENGTH'])
-    df['EMA_slow_stg5'] = ema_with_sma_init(df['close'], STG_CONFIG['MACD_DI_SLOPE']['SLOW_LENGTH'])
+    df['EMA_fast_stg5'] = cache.ema('close', stg_config['MACD_DI_SLOPE']['FAST_LENGTH'])
+    df['EMA_slow_stg5'] = cache.ema('close', stg_config['MACD_DI_SLOPE']['SLOW_LENGTH'])
     df['macd_stg5'] = df['EMA_fast_stg5'] - df['EMA_slow_stg5']
 
     # NaN이 아닌 값으로 시그널 라인 계산
-    # df['macd_signal_stg5'] = ema_with_sma_init(df['macd_stg5'].fillna(method='ffill'), STG_CONFIG['MACD_DI_SLOPE']['SIGNAL_LENGTH'])
-    df['macd_signal_stg5'] = ema_with_sma_init(df['macd_stg5'].ffill(), STG_CONFIG['MACD_DI_SLOPE']['SIGNAL_LENGTH'])
+    # df['macd_signal_stg5'] = ema_with_sma_init(df['macd_stg5'].fillna(method='ffill'), stg_config['MACD_DI_SLOPE']['SIGNAL_LENGTH'])
+    df['macd_signal_stg5'] = cache.ema('macd_stg5.ffill', stg_config['MACD_DI_SLOPE']['SIGNAL_LENGTH'],
+                                       series=df['macd_stg5'].ffill())
     df['hist_stg5'] = df['macd_stg5'] - df['macd_signal_stg5']
     
     # === MACD dive 방향 ===
     df['hist_direction_stg5'] = df['hist_stg5'] - df['hist_stg5'].shift(1)
 
 
-    df['Smoothed_TR_stg5'] = wilder_smoothing(df['TR'], STG_CONFIG['MACD_DI_SLOPE']['DI_LENGTH'])
-    df['Smoothed_DM+_stg5'] = wilder_smoothing(df['DM+'], STG_CONFIG['MACD_DI_SLOPE']['DI_LENGTH'])
-    df['Smoothed_DM-_stg5'] = wilder_smoothing(df['DM-'], STG_CONFIG['MACD_DI_SLOPE']['DI_LENGTH'])
+    df['Smoothed_TR_stg5'] = cache.wilder('TR', stg_config['MACD_DI_SLOPE']['DI_LENGTH'])
+    df['Smoothed_DM+_stg5'] = cache.wilder('DM+', stg_config['MACD_DI_SLOPE']['DI_LENGTH'])
+    df['Smoothed_DM-_stg5'] = cache.wilder('DM-', stg_config['MACD_DI_SLOPE']['DI_LENGTH'])
 
     # DI+ 및 DI- 계산
     df['DI+_stg5'] = 100 * (df['Smoothed_DM+_stg5'] / df['Smoothed_TR_stg5'])
     df['DI-_stg5'] = 100 * (df['Smoothed_DM-_stg5'] / df['Smoothed_TR_stg5'])
 
     # === 두 번째 전략의 DI Slope (slope_len=3) ===
-    df['DIPlus_stg5'] = df['DI+_stg5'] - df['DI+_stg5'].shift(STG_CONFIG['MACD_DI_SLOPE']['SLOPE_LENGTH'])
-    df['DIMinus_stg5'] = df['DI-_stg5'] - df['DI-_stg5'].shift(STG_CONFIG['MACD_DI_SLOPE']['SLOPE_LENGTH'])
+    df['DIPlus_stg5'] = df['DI+_stg5'] - df['DI+_stg5'].shift(stg_config['MACD_DI_SLOPE']['SLOPE_LENGTH'])
+    df['DIMinus_stg5'] = df['DI-_stg5'] - df['DI-_stg5'].shift(stg_config['MACD_DI_SLOPE']['SLOPE_LENGTH'])
     df['slope_diff_stg5'] = df['DIPlus_stg5'] - df['DIMinus_stg5']
     
     # RSI (Relative Strength Index)
-    rsi_length = STG_CONFIG['MACD_DI_SLOPE']['RSI_LENGTH']
-    df['rsi_stg5'] = ta.momentum.rsi(df['close'], window=rsi_length).fillna(50)
+    rsi_length = stg_config['MACD_DI_SLOPE']['RSI_LENGTH']
+    df['rsi_stg5'] = cache.rsi('close', rsi_length)
 
     ''' STG_No5 MACD_DI_SLPOE 계산 끝'''
 
@@ -358,21 +249,21 @@ def process_chart_data(df):
 
     # STG_No6 VOLUME_TREND 전략
 
-    vol_length = STG_CONFIG['VOLUME_TREND']['VOLUME_MA_LENGTH']
-    trend_length = STG_CONFIG['VOLUME_TREND']['TREND_PERIOD']
-    norm_period = STG_CONFIG['VOLUME_TREND']['NORM_PERIOD']
+    vol_length = stg_config['VOLUME_TREND']['VOLUME_MA_LENGTH']
+    trend_length = stg_config['VOLUME_TREND']['TREND_PERIOD']
+    norm_period = stg_config['VOLUME_TREND']['NORM_PERIOD']
     
     
     # 볼륨 이동평균
-    df['vol_ma'] = df['volume'].rolling(vol_length).mean()
+    df['vol_ma'] = cache.rolling_mean('volume', vol_length)
     
     # 상승/하락 볼륨 구분 및 이동평균 계산
     df['up_vol'] = np.where(df['close'] >= df['open'], df['volume'], 0)
     df['down_vol'] = np.where(df['close'] < df['open'], df['volume'], 0)
 
     # 상승/하락 볼륨 이동평균
-    df['up_vol_ma'] = df['up_vol'].rolling(vol_length).mean()
-    df['down_vol_ma'] = df['down_vol'].rolling(vol_length).mean()
+    df['up_vol_ma'] = cache.rolling_mean('up_vol', vol_length)
+    df['down_vol_ma'] = cache.rolling_mean('down_vol', vol_length)
     
     # 볼륨 강도 계산
     df['vol_strength'] = ((df['up_vol_ma'] - df['down_vol_ma']) / df['vol_ma']) * 100
@@ -404,7 +295,7 @@ def process_chart_data(df):
     except Exception as e:
         print(f"컬럼 지우기 오류 발생: {e}")
     
-    return df, STG_CONFIG
+    return df, stg_config
 
 
 if __name__ == "__main__":
@@ -414,9 +305,9 @@ if __name__ == "__main__":
     slice_size = 300
     total_ticks = 85
 
-    from pymongo import MongoClient
-    mongoClient = MongoClient("mongodb://mongodb:27017")
-    database = mongoClient["bitcoin"]
+    from docs.utility.mongo_client import get_database
+    from docs.utility.candle_cache import load_candles, sync_from_collection
+    database = get_database()
 
     chart_collections = {
         '1m': 'chart_1m',
@@ -434,18 +325,9 @@ if __name__ == "__main__":
 
     # range의 끝값을 -1로 변경하여 0을 포함하도록 수정
     for current_from in range(start_from, -1, -1):
-        # 최신 데이터부터 과거 데이터까지 모두 가져오기
-        data_cursor = chart_collection.find().sort("timestamp", -1)
-        data_list = list(data_cursor)
-
-        df = pd.DataFrame(data_list)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-
-        if '_id' in df.columns:
-            df.drop('_id', axis=1, inplace=True)
-
-        df.set_index('timestamp', inplace=True)
-        df.sort_index(inplace=True)
+        # 로컬 Arrow 캐시를 Mongo 최신분으로 보충한 뒤 로드
+        sync_from_collection('BTCUSDT', set_timevalue, chart_collection)
+        df = load_candles('BTCUSDT', set_timevalue)
 
         if current_from > len(df):
             raise ValueError(f"start_from ({current_from}) is larger than available data length ({len(df)})")
@@ -457,12 +339,13 @@ if __name__ == "__main__":
             df = df.iloc[-(current_from + slice_size):-current_from]
         df, STG_CONFIG = process_chart_data(df)
         
-        from strategy.supertrend import supertrend
+        from docs.strategy.supertrend import supertrend
+        from docs.strategy.signal import SIGNAL_DTYPE, Signal, label
 
         df = supertrend(df,STG_CONFIG)
 
         print("\n===== 포지션 계산 디버깅 =====")
-        print(f"슈퍼트렌드 포지션: {df['st_position'].iloc[-1]}")
+        print(f"슈퍼트렌드 포지션: {label(df['st_position'].iloc[-1])}")
 
         # 슈퍼트랜드 필터링 적용
         di_diff_filter = STG_CONFIG['SUPERTREND']['DI_DIFFERENCE_FILTER']
@@ -478,18 +361,14 @@ if __name__ == "__main__":
         print(f"DI 차이: {df['di_diff'].iloc[-1]:.2f}")
         print(f"4기간 평균 DI 차이: {df['avg_di_diff'].iloc[-1]:.2f}")
 
-        # 시그널 필터링
-        df['filtered_position'] = None
-        
-        long_condition = (df['st_position'] == 'Long') & (df['avg_di_diff'] > di_diff_filter)
-        short_condition = (df['st_position'] == 'Short') & (df['avg_di_diff'] < -di_diff_filter)
-        
-        df.loc[long_condition, 'filtered_position'] = 'Long'
-        df.loc[short_condition, 'filtered_position'] = 'Short'
+        # 시그널 필터링 (int8 비교)
+        long_condition = (df['st_position'] == Signal.LONG) & (df['avg_di_diff'] > di_diff_filter)
+        short_condition = (df['st_position'] == Signal.SHORT) & (df['avg_di_diff'] < -di_diff_filter)
+        df['filtered_position'] = np.where(long_condition | short_condition, df['st_position'], Signal.NONE).astype(SIGNAL_DTYPE)
 
         st_position = df['filtered_position'].iloc[-1]
         print(f"\n===== 필터링 결과 =====")
-        print(f"DI 필터 적용 포지션: {df['filtered_position'].iloc[-1]}")
+        print(f"DI 필터 적용 포지션: {label(st_position)}")
 
         # from strategy.volume_norm import check_VSTG_signal
         # position = check_VSTG_signal(df)
@@ -1,3 +1,4 @@
+import numpy as np
 from docs.strategy.follow_line import follow_line
 from docs.strategy.supertrend import supertrend
 from docs.strategy.hma_strategy import check_hma_signals
@@ -5,11 +6,24 @@ from docs.strategy.squeeze_strategy import check_squeeze_signals
 from docs.strategy.macd_stg import check_trade_signal
 from docs.strategy.macd_di_slop import generate_macd_di_rsi_signal
 from docs.strategy.macd_size_di import generate_macd_size_signal
+from docs.strategy.macd_size_di import last_signal as macd_size_last_signal
 from docs.strategy.macd_divergence import generate_macd_dive_signal
+from docs.strategy.macd_divergence import last_signal as macd_dive_last_signal
 from docs.strategy.volume_norm import check_VSTG_signal
 from docs.strategy.line_reg import check_line_reg_signal
+from docs.strategy.line_reg import last_signal as line_reg_last_signal
+from docs.strategy.signal import Signal, SIGNAL_DTYPE, to_signal, label
 import json
-def cal_position(df, STG_CONFIG):
+
+STRATEGY_ENABLE_PATH = '/app/trading_bot/STRATEGY_ENABLE.json'  # 대시보드가 읽는 전략 활성화 설정
+
+def cal_position(df, STG_CONFIG, live=False, enable_path=STRATEGY_ENABLE_PATH):
+    """
+    live=True 이면 대체 전략은 마지막 봉 시그널만 계산한다 (시그널 컬럼을 df에 추가하지 않음).
+    백테스트처럼 전체 시그널 컬럼이 필요하면 기본값(live=False)을 사용한다.
+    enable_path: 전략 활성화 설정을 저장할 경로 (None이면 저장하지 않음, 컨테이너 밖 검증용)
+    시그널 컬럼과 반환 포지션은 int8/Signal (LONG / SHORT / NONE), 문자열은 출력에만 사용한다.
+    """
     # 전략 활성화 설정
     STRATEGY_ENABLE = {
         'SUPERTREND': True,      # 슈퍼트렌드 전략
@@ -19,8 +33,9 @@ def cal_position(df, STG_CONFIG):
         'MACD_SIZE': True,       # MACD 크기 전략
         'MACD_DIVERGENCE': True,  # MACD 다이버전스 전략
     }
-    with open('/app/trading_bot/STRATEGY_ENABLE.json', 'w') as f:
-        json.dump(STRATEGY_ENABLE, f)
+    if enable_path:
+        with open(enable_path, 'w') as f:
+            json.dump(STRATEGY_ENABLE, f)
 
     tag = None
     
@@ -28,7 +43,7 @@ def cal_position(df, STG_CONFIG):
     if STRATEGY_ENABLE['SUPERTREND']:
         df = supertrend(df, STG_CONFIG)
         print("\n===== 포지션 계산 디버깅 =====")
-        print(f"슈퍼트렌드 포지션: {df['st_position'].iloc[-1]}")
+        print(f"슈퍼트렌드 포지션: {label(df['st_position'].iloc[-1])}")
 
         # 슈퍼트랜드 필터링 적용
         di_diff_filter = STG_CONFIG['SUPERTREND']['DI_DIFFERENCE_FILTER']
@@ -44,53 +59,60 @@ def cal_position(df, STG_CONFIG):
         print(f"DI 차이: {df['di_diff'].iloc[-1]:.2f}")
         print(f"4기간 평균 DI 차이: {df['avg_di_diff'].iloc[-1]:.2f}")
 
-        # 시그널 필터링
-        df['filtered_position'] = None
-        
-        long_condition = (df['st_position'] == 'Long') & (df['avg_di_diff'] > di_diff_filter)
-        short_condition = (df['st_position'] == 'Short') & (df['avg_di_diff'] < -di_diff_filter)
-        
-        df.loc[long_condition, 'filtered_position'] = 'Long'
-        df.loc[short_condition, 'filtered_position'] = 'Short'
+        # 시그널 필터링 (int8 비교)
+        st_codes = df['st_position'].to_numpy()
+        avg_di_diff = df['avg_di_diff'].to_numpy()
+        long_condition = (st_codes == Signal.LONG) & (avg_di_diff > di_diff_filter)
+        short_condition = (st_codes == Signal.SHORT) & (avg_di_diff < -di_diff_filter)
+        df['filtered_position'] = np.where(long_condition | short_condition, st_codes, Signal.NONE).astype(SIGNAL_DTYPE)
 
-        st_position = df['filtered_position'].iloc[-1]
+        st_position = to_signal(df['filtered_position'].iloc[-1])
         print(f"\n===== 필터링 결과 =====")
-        print(f"DI 필터 적용 포지션: {df['filtered_position'].iloc[-1]}")
+        print(f"DI 필터 적용 포지션: {label(st_position)}")
     else:
-        st_position = None
+        st_position = Signal.NONE
 
     if not st_position:
         print("\n===== 대체 시그널 확인 =====")
         
-        line_position = None
-        dive_position = None
-        slop_position = None
-        size_position = None
-        volume_position = None
+        line_position = Signal.NONE
+        dive_position = Signal.NONE
+        slop_position = Signal.NONE
+        size_position = Signal.NONE
+        volume_position = Signal.NONE
 
         # 각 전략 실행 (활성화된 경우에만)
         if STRATEGY_ENABLE['LINE_REGRESSION']:
-            df = check_line_reg_signal(df, STG_CONFIG)
-            line_position = df['line_reg_signal'].iloc[-1]
-            print(f"선형회귀 시그널: {line_position}")
+            if live:
+                line_position = line_reg_last_signal(df, STG_CONFIG)
+            else:
+                df = check_line_reg_signal(df, STG_CONFIG)
+                line_position = to_signal(df['line_reg_signal'].iloc[-1])
+            print(f"선형회귀 시그널: {label(line_position)}")
 
         if STRATEGY_ENABLE['MACD_DIVERGENCE']:
-            df = generate_macd_dive_signal(df, STG_CONFIG)
-            dive_position = df['macd_dive_signal'].iloc[-1]
-            print(f"MACD 다이버전스 시그널: {dive_position}")
+            if live:
+                dive_position = macd_dive_last_signal(df, STG_CONFIG)
+            else:
+                df = generate_macd_dive_signal(df, STG_CONFIG)
+                dive_position = to_signal(df['macd_dive_signal'].iloc[-1])
+            print(f"MACD 다이버전스 시그널: {label(dive_position)}")
 
         if STRATEGY_ENABLE['MACD_DI_RSI']:
             slop_position = generate_macd_di_rsi_signal(df, STG_CONFIG, debug=True)
-            print(f"MACD-DI-RSI 시그널: {slop_position}")
+            print(f"MACD-DI-RSI 시그널: {label(slop_position)}")
 
         if STRATEGY_ENABLE['MACD_SIZE']:
-            df = generate_macd_size_signal(df, STG_CONFIG, debug=True)
-            size_position = df['macd_size_signal'].iloc[-1]
-            print(f"MACD 크기 시그널: {size_position}")
+            if live:
+                size_position = macd_size_last_signal(df, STG_CONFIG, debug=True)
+            else:
+                df = generate_macd_size_signal(df, STG_CONFIG, debug=True)
+                size_position = to_signal(df['macd_size_signal'].iloc[-1])
+            print(f"MACD 크기 시그널: {label(size_position)}")
 
         if STRATEGY_ENABLE['VOLUME_NORM']:
             volume_position = check_VSTG_signal(df, STG_CONFIG)
-            print(f"볼륨 정규화 시그널 : {volume_position}")
+            print(f"볼륨 정규화 시그널 : {label(volume_position)}")
 
         # 우선순위에 따라 포지션 결정
         if line_position:
@@ -109,20 +131,20 @@ def cal_position(df, STG_CONFIG):
             position = dive_position
             tag = 'dv'
         else:
-            position = None
+            position = Signal.NONE
     else:
         position = st_position
         tag = 'st'
 
     print(f"\n===== 최종 포지션 =====")
-    print(f"결정된 포지션: {tag}, {position}")
+    print(f"결정된 포지션: {tag}, {label(position)}")
 
     return position, df, tag
 
 
 
 if __name__ == "__main__":
-   from pymongo import MongoClient
+   from docs.utility.mongo_client import get_database
 
    # 초기 설정
    symbol = "BTCUSDT"
@@ -131,9 +153,8 @@ if __name__ == "__main__":
    set_timevalue = '5m'
 
    # 데이터베이스 연결
-   mongoClient = MongoClient("mongodb://mongodb:27017")
-   # 'bitcoin' 데이터베이스 연결
-   database = mongoClient["bitcoin"]
+   # 'bitcoin' 데이터베이스 연결 (공유 연결)
+   database = get_database()
 
    # set_timevalue 값에 따라 적절한 차트 컬렉션 선택
    if set_timevalue == '1m':
@@ -0,0 +1,143 @@
+"""
+Bybit 연결 공용 모듈
+
+프로세스 전체가 keep-alive HTTP 세션 하나와 ccxt 객체 하나를 같이 쓴다.
+(ccxt도 같은 세션을 사용하므로 주문/포지션/잔고/가격/PnL 요청이 TLS 연결을 재사용하고,
+마켓 정보는 처음 한 번만 로드된다)
+
+    from docs.exchange_gateway import exchange, session, signed_headers
+"""
+import hashlib
+import hmac
+import json
+import os
+import threading
+
+import ccxt
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from logger import logger
+from docs.utility.exchange_clock import clock
+
+# 환경 변수 로드
+load_dotenv()
+
+BYBIT_ACCESS_KEY = os.getenv("BYBIT_ACCESS_KEY")
+BYBIT_SECRET_KEY = os.getenv("BYBIT_SECRET_KEY")
+
+BYBIT_API_URL = "https://api.bybit.com"
+RECV_WINDOW = '5000'  # 서명 문자열과 헤더에 같은 값 사용
+REQUEST_TIMEOUT = 10  # 초
+POOL_SIZE = 10
+
+# 공용 keep-alive 세션
+session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
+# 공용 Bybit 거래소 객체 (무기한 선물)
+exchange = ccxt.bybit({
+    'apiKey': BYBIT_ACCESS_KEY,
+    'secret': BYBIT_SECRET_KEY,
+    'options': {
+        'defaultType': 'swap',  # 무기한 선물 (perpetual swap) 용
+        'recvWindow': 10000  # recv_window를 10초로 증가
+    },
+    'enableRateLimit': True,  # API 호출 속도 제한 관리 활성화
+    'timeout': REQUEST_TIMEOUT * 1000,
+    'session': session,
+})
+
+_markets_lock = threading.Lock()
+
+
+def get_exchange():
+    """서버 시계 오프셋을 적용한 공용 ccxt 객체 (마켓 정보는 최초 1회 로드)"""
+    if not exchange.markets:
+        with _markets_lock:
+            if not exchange.markets:
+                exchange.load_markets()
+    return clock.apply(exchange)
+
+
+def warm_up():
+    """거래 루프 시작 전 연결/마켓/시계 미리 준비 (첫 주문이 핸드셰이크 비용을 내지 않도록)"""
+    try:
+        get_exchange()
+        return True
+    except Exception as e:
+        logger.warning(f"거래소 연결 준비 실패: {e}")
+        return False
+
+
+def create_signature(timestamp, api_key, api_secret, params):
+    """
+    Bybit V5 API 서명 생성 POST
+    """
+    # 서명 문자열 생성 (timestamp + api_key + recv_window + params_json)
+    signature_string = f"{timestamp}{api_key}{RECV_WINDOW}{json.dumps(params)}"
+    return hmac.new(api_secret.encode('utf-8'), signature_string.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def create_signature_for_get(timestamp, api_key, api_secret, params):
+    """
+    GET 요청을 위한 서명 생성 (파라미터 알파벳 순 쿼리 문자열)
+    """
+    query_string = '&'.join([f"{key}={value}" for key, value in sorted(params.items())])
+    signature_string = f"{timestamp}{api_key}{RECV_WINDOW}{query_string}"
+    return hmac.new(api_secret.encode('utf-8'), signature_string.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def signed_headers(params, method='GET'):
+    """보정된 서버 시간으로 서명한 V5 인증 헤더"""
+    timestamp = clock.timestamp()
+    if method == 'GET':
+        signature = create_signature_for_get(timestamp, BYBIT_ACCESS_KEY, BYBIT_SECRET_KEY, params)
+    else:
+        signature = create_signature(timestamp, BYBIT_ACCESS_KEY, BYBIT_SECRET_KEY, params)
+
+    headers = {
+        'X-BAPI-API-KEY': BYBIT_ACCESS_KEY,
+        'X-BAPI-SIGN': signature,
+        'X-BAPI-TIMESTAMP': timestamp,
+        'X-BAPI-RECV-WINDOW': RECV_WINDOW
+    }
+    if method != 'GET':
+        headers['Content-Type'] = 'application/json'
+    return headers
+
+
+def private_get(path, params):
+    return session.get(f"{BYBIT_API_URL}{path}", headers=signed_headers(params, 'GET'),
+                       params=params, timeout=REQUEST_TIMEOUT)
+
+
+def private_post(path, params):
+    # 서명한 문자열과 같은 본문을 보내야 하므로 직접 직렬화
+    return session.post(f"{BYBIT_API_URL}{path}", headers=signed_headers(params, 'POST'),
+                        data=json.dumps(params), timeout=REQUEST_TIMEOUT)
+
+
+def public_get(path, params=None):
+    return session.get(f"{BYBIT_API_URL}{path}", params=params, timeout=REQUEST_TIMEOUT)
+
+
+if __name__ == "__main__":
+    import time
+
+    # 연결 재사용 효과 측정 (공개 API, 새 연결 vs 공용 세션)
+    def timed(call, repeat=5):
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            call()
+            times.append((time.perf_counter() - t0) * 1000)
+        return times
+
+    url = f"{BYBIT_API_URL}/v5/market/time"
+    fresh = timed(lambda: requests.get(url, timeout=REQUEST_TIMEOUT))
+    pooled = timed(lambda: public_get("/v5/market/time"))
+    print(f"새 연결: 평균 {sum(fresh) / len(fresh):.1f}ms, 공용 세션: 평균 {sum(pooled[1:]) / len(pooled[1:]):.1f}ms")
@@ -1,8 +1,7 @@
 import ccxt
 import os
-from datetime import datetime, timedelta, timezone
+from datetime import datetime
 from dotenv import load_dotenv
-from pymongo import MongoClient
 import time
 import sys
 import os
@@ -10,17 +9,19 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from logger import logger
+from docs.utility.mongo_client import get_database
+from docs.utility.exchange_clock import clock
+from docs.exchange_gateway import exchange as bybit
+from docs.utility.candle_store import upsert_candles, archive_candles, ensure_timestamp_index, load_archive_range
+from docs.utility.candle_cache import append_candles
+from docs.utility.gap_scanner import scan_collection, plan_fetches, to_ms
+from docs.utility.candle_resampler import TIMEFRAME_MINUTES, bucket_start, resample_ohlcv, compare_candles
 
 # 환경 변수 로드
 load_dotenv()
 
-# Bybit API 키와 시크릿 가져오기
-BYBIT_ACCESS_KEY = os.getenv("BYBIT_ACCESS_KEY")
-BYBIT_SECRET_KEY = os.getenv("BYBIT_SECRET_KEY")
-
-# MongoDB에 접속
-mongoClient = MongoClient("mongodb://mongodb:27017")
-database = mongoClient["bitcoin"]
+# MongoDB에 접속 (공유 연결)
+database = get_database()
 # Capped Collections 초기화
 collections_config = {
     'chart_1m': {'size': 200 * 1500, 'max': 1500},  # 실시간 모니터링용
@@ -40,147 +41,202 @@ for collection_name, config in collections_config.items():
         print(f"{collection_name} Capped Collection 생성됨")
     else:
         print(f"{collection_name} 컬렉션이 이미 존재함")
+    # timestamp 조회/upsert용 유니크 인덱스
+    ensure_timestamp_index(database[collection_name])
 
 chart_collection_1m = database['chart_1m']
 chart_collection_3m = database['chart_3m']
 chart_collection_5m = database['chart_5m']
 chart_collection_15m = database['chart_15m']
+CHART_COLLECTIONS = {
+    '1m': chart_collection_1m,
+    '3m': chart_collection_3m,
+    '5m': chart_collection_5m,
+    '15m': chart_collection_15m
+}
 
-# Bybit 거래소 객체 생성 (recvWindow 값 조정)
-bybit = ccxt.bybit({
-    'apiKey': BYBIT_ACCESS_KEY,
-    'secret': BYBIT_SECRET_KEY,
-    'options': {
-        'recvWindow': 5000,  # recvWindow 값을 5000으로 설정
-    },
-    'enableRateLimit': True
-})
-
-
-
+# True 이면 3m/5m/15m은 거래소에서 따로 받지 않고 1분봉을 집계해서 만든다
+RESAMPLE_FROM_1M = os.getenv("RESAMPLE_FROM_1M", "false").lower() == "true"
 
 
-def chart_update(update,symbol):
-    """차트를 업데이트하고 MongoDB에 저장"""
+def cache_candles(symbol, timeframe, ohlcv):
+    """로컬 Arrow 캐시에 추가 (캐시 실패는 차트 업데이트를 막지 않음)"""
+    try:
+        append_candles(symbol, timeframe, ohlcv)
+    except Exception as e:
+        logger.warning(f"로컬 캔들 캐시 저장 실패: {e}")
 
-    # Bybit 서버 시간 가져오기 (재시도 처리 추가)
-    max_retries = 3
-    retry_delay = 10
-    server_time = None
 
-    for attempt in range(max_retries):
-        try:
-            server_time = bybit.fetch_time() / 1000  # 밀리초를 초 단위로 변환
-            server_datetime = datetime.utcfromtimestamp(server_time)
-            print(f"바이비트 서버 시간 (UTC): {server_datetime}")
-            break  # 성공하면 루프 탈출
-        except Exception as e:
-            print(f"바이비트 서버 시간 가져오기 실패 (시도 {attempt+1}/{max_retries}): {str(e)}")
-            if attempt < max_retries - 1:  # 마지막 시도가 아니면 대기 후 재시도
-                time.sleep(retry_delay)
-            else:
-                print(f"바이비트 서버 시간 가져오기 최종 실패: {str(e)}")
-                # 모든 재시도 실패 시 현재 시간으로 대체
-                server_time = time.time()  # 이미 초 단위로 반환됨
-                server_datetime = datetime.utcfromtimestamp(server_time)
-                print(f"로컬 시간으로 대체 (UTC): {server_datetime}")
-                print("주의: 로컬 시간은 바이비트 서버 시간과 약간의 차이가 있을 수 있습니다")
-
-    def fetch_and_store_ohlcv(collection, timeframe, symbol, limit, minutes_per_unit, time_description):
-        # 기존 코드와 동일하지만 update_one 대신 insert_one 사용
-        last_saved_data = collection.find_one(sort=[("timestamp", -1)])
-        if last_saved_data:
-            last_timestamp = last_saved_data["timestamp"]
-            print(f"{time_description} 마지막으로 저장된 데이터 시점: {last_timestamp}")
-        else:
-            last_timestamp = server_datetime - timedelta(minutes=minutes_per_unit * limit)
-            print(f"{time_description} 저장된 데이터가 없습니다. {limit}틱 전 시점부터 데이터를 가져옵니다.")
+def fetch_and_store_ohlcv(collection, timeframe, symbol, limit, minutes_per_unit, time_description, server_time):
+    # 보관 기간(요청 개수와 capped 최대 개수 중 작은 값) 안의 누락 구간만 찾아 페이지 단위로 백필
+    window = min(limit, collections_config[collection.name]['max'])
+    interval_ms = minutes_per_unit * 60 * 1000
+    end_ms = int(server_time * 1000) // interval_ms * interval_ms  # 현재(미완성) 봉
+    start_ms = end_ms - (window - 1) * interval_ms
 
-        since_timestamp = int(last_timestamp.timestamp() * 1000)
+    report = scan_collection(collection, interval_ms, start_ms, end_ms)
+    message = (f"{time_description} 완성도 {report['completeness']:.2f}% "
+               f"({report['present']}/{report['expected']}), 누락 구간 {len(report['gaps'])}개")
+    print(message)
+    logger.info(message)
 
+    for since_ms, count in plan_fetches(report['gaps'], interval_ms):
         try:
-            ohlcv = bybit.fetch_ohlcv(symbol, timeframe, since=since_timestamp, limit=limit)
+            ohlcv = bybit.fetch_ohlcv(symbol, timeframe, since=since_ms, limit=count)
         except ccxt.InvalidNonce as e:
             print(f"InvalidNonce 오류 발생: {e}")
             return
 
-        for data in ohlcv:
-            timestamp = data[0]
-            dt_object = datetime.utcfromtimestamp(timestamp / 1000)
-            data_dict = {
-                "timestamp": dt_object,
-                "open": data[1],
-                "high": data[2],
-                "low": data[3],
-                "close": data[4],
-                "volume": data[5]
-            }
-
-            collection.delete_many({"timestamp": dt_object})
-            # 올바른 방법
-            collection.update_one(
-                {"timestamp": dt_object},     # 이 타임스탬프를 가진 문서를 찾아서
-                {"$set": data_dict},         # 이 데이터로 업데이트하거나
-                upsert=True                  # 없으면 새로 만들어라
-            )
-            print(f"{time_description} 저장된 데이터: {dt_object} - O: {data[1]}, H: {data[2]}, L: {data[3]}, C: {data[4]}, V: {data[5]}")
+        if not ohlcv:
+            print(f"{time_description} {datetime.utcfromtimestamp(since_ms / 1000)} 이후 가져온 데이터가 없습니다.")
+            continue
+
+        result = upsert_candles(collection, ohlcv)
+        archive_candles(timeframe, ohlcv)  # 장기 보관용 월별 아카이브에도 기록
+        cache_candles(symbol, timeframe, ohlcv)
+        first_time = datetime.utcfromtimestamp(ohlcv[0][0] / 1000)
+        last_time = datetime.utcfromtimestamp(ohlcv[-1][0] / 1000)
+        message = (f"{time_description} 저장 완료: {first_time} ~ {last_time}, {result['candles']}개 "
+                   f"(신규 {result['upserted']}, 갱신 {result['modified']}, 일치 {result['matched']}, "
+                   f"요청 {result['requests']}회, {result['elapsed']:.2f}초)")
+        print(message)
+        logger.info(message)
+
+
+def resample_from_1m(update, symbol, server_time):
+    """
+    저장된 1분봉으로 update 타임프레임 봉을 만들어 저장
+    마지막으로 저장된 봉의 버킷부터 다시 집계해 진행 중인 봉도 함께 갱신한다.
+    1분봉 capped 컬렉션 보관 기간 밖이면 1분봉 아카이브에서 읽는다.
+    """
+    minutes = TIMEFRAME_MINUTES[update]
+    interval_ms = minutes * 60 * 1000
+    collection = CHART_COLLECTIONS[update]
+    end_ms = int(server_time * 1000)
+
+    last_saved = collection.find_one(sort=[("timestamp", -1)])
+    if last_saved:
+        since_ms = bucket_start(to_ms(last_saved["timestamp"]), minutes)
+    else:
+        since_ms = bucket_start(end_ms, minutes) - (collections_config[collection.name]['max'] - 1) * interval_ms
+    since = datetime.utcfromtimestamp(since_ms / 1000)
+
+    documents = list(chart_collection_1m.find({"timestamp": {"$gte": since}}, {'_id': 0}).sort("timestamp", 1))
+    if not documents or to_ms(documents[0]["timestamp"]) > since_ms:
+        archived = load_archive_range('1m', since, datetime.utcfromtimestamp(end_ms / 1000 + 60))
+        if archived is not None:
+            documents = archived.reset_index().to_dict('records')
+    ohlcv = [[to_ms(doc["timestamp"]), doc["open"], doc["high"], doc["low"], doc["close"], doc["volume"]]
+             for doc in documents]
+
+    candles = resample_ohlcv(ohlcv, minutes, include_partial=True)
+    if not candles:
+        print(f"{update} 집계할 1분봉이 없습니다.")
+        return None
+
+    result = upsert_candles(collection, candles)
+    archive_candles(update, candles)
+    cache_candles(symbol, update, candles)
+    message = (f"{update} 1분봉 집계 저장: {len(ohlcv)}개 1분봉 -> {len(candles)}개 "
+               f"(신규 {result['upserted']}, 갱신 {result['modified']}, {result['elapsed']:.2f}초)")
+    print(message)
+    logger.info(message)
+    return result
+
+
+def validate_resampled(update, symbol, bars=200):
+    """
+    검증 모드: 거래소 update 봉과 저장된 1분봉 집계 결과 비교 (마감된 봉만)
+    Returns:
+        compare_candles 결과 dict
+    """
+    minutes = TIMEFRAME_MINUTES[update]
+    exchange_candles = bybit.fetch_ohlcv(symbol, update, limit=bars + 1)[:-1]  # 진행 중인 봉 제외
+    if not exchange_candles:
+        return None
+
+    since = datetime.utcfromtimestamp(exchange_candles[0][0] / 1000)
+    documents = list(chart_collection_1m.find({"timestamp": {"$gte": since}}, {'_id': 0}).sort("timestamp", 1))
+    ohlcv = [[to_ms(doc["timestamp"]), doc["open"], doc["high"], doc["low"], doc["close"], doc["volume"]]
+             for doc in documents]
+    report = compare_candles(exchange_candles, resample_ohlcv(ohlcv, minutes))
+    print(f"{update} 집계 검증: 비교 {report['compared']}개, 불일치 {report['mismatched']}개, "
+          f"누락 {report['missing']}개, 최대 상대 오차 {report['max_rel_error']}")
+    return report
+
+
+def chart_update(update,symbol):
+    """차트를 업데이트하고 MongoDB에 저장"""
+
+    # Bybit 서버 시간 (공용 시계 오프셋으로 보정, 요청마다 fetch_time 하지 않음)
+    server_time = clock.now_ms() / 1000
+    server_datetime = datetime.utcfromtimestamp(server_time)
+    print(f"바이비트 서버 시간 (UTC): {server_datetime}")
 
     # 심볼 설정
     symbol = symbol
 
+    if RESAMPLE_FROM_1M and update in ('3m', '5m', '15m'):
+        # 1분봉만 거래소에서 받고 상위 타임프레임은 집계
+        fetch_and_store_ohlcv(chart_collection_1m, '1m', symbol, limit=1440, minutes_per_unit=1, time_description="1분봉", server_time=server_time)
+        resample_from_1m(update, symbol, server_time)
+        return CHART_COLLECTIONS[update].find_one(sort=[("timestamp", -1)]), server_time
+
     if update == '1m':
         # 1분봉 데이터 업데이트
-        fetch_and_store_ohlcv(chart_collection_1m, '1m', symbol, limit=1440, minutes_per_unit=1, time_description="1분봉")
+        fetch_and_store_ohlcv(chart_collection_1m, '1m', symbol, limit=1440, minutes_per_unit=1, time_description="1분봉", server_time=server_time)
         return chart_collection_1m.find_one(sort=[("timestamp", -1)]), server_time
 
     elif update == '3m':
         # 3분봉 데이터 업데이트 (7일치)
         minutes_per_3m = 3
         limit_7d = (7 * 24 * 60) // minutes_per_3m
-        fetch_and_store_ohlcv(chart_collection_3m, '3m', symbol, limit=limit_7d, minutes_per_unit=minutes_per_3m, time_description="3분봉")
+        fetch_and_store_ohlcv(chart_collection_3m, '3m', symbol, limit=limit_7d, minutes_per_unit=minutes_per_3m, time_description="3분봉", server_time=server_time)
         return chart_collection_3m.find_one(sort=[("timestamp", -1)]), server_time
 
     elif update == '5m':
         # 5분봉 (최근 1000틱 데이터 저장 및 업데이트)
-        fetch_and_store_ohlcv(chart_collection_5m, '5m', symbol, limit=2000, minutes_per_unit=5, time_description="5분봉")
+        fetch_and_store_ohlcv(chart_collection_5m, '5m', symbol, limit=2000, minutes_per_unit=5, time_description="5분봉", server_time=server_time)
         return chart_collection_5m.find_one(sort=[("timestamp", -1)]), server_time
 
     elif update == '15m':
         # 15분봉 (최근 3500틱 데이터 저장 및 업데이트)
-        fetch_and_store_ohlcv(chart_collection_15m, '15m', symbol, limit=3500, minutes_per_unit=15, time_description="15분봉")
+        fetch_and_store_ohlcv(chart_collection_15m, '15m', symbol, limit=3500, minutes_per_unit=15, time_description="15분봉", server_time=server_time)
         return chart_collection_15m.find_one(sort=[("timestamp", -1)]), server_time
 
     else:
         raise ValueError(f"Invalid update value: {update}")
 
 
+def chart_completeness(server_time=None):
+    """
+    타임프레임별 capped 컬렉션 완성도(%) (보관 가능한 최근 max개 봉 기준)
+    Returns:
+        dict: {'1m': {...scan_collection 결과}, ...}
+    """
+    if server_time is None:
+        server_time = time.time()
+    reports = {}
+    for timeframe, minutes in (('1m', 1), ('3m', 3), ('5m', 5), ('15m', 15)):
+        collection_name = f'chart_{timeframe}'
+        interval_ms = minutes * 60 * 1000
+        end_ms = int(server_time * 1000) // interval_ms * interval_ms
+        start_ms = end_ms - (collections_config[collection_name]['max'] - 1) * interval_ms
+        reports[timeframe] = scan_collection(database[collection_name], interval_ms, start_ms, end_ms, refresh_last=False)
+    return reports
+
+
 def fetch_latest_ohlcv_and_update_db(symbol, timeframe, collection, max_check_time=240, check_interval=60):
     start_time = time.time()
     
     while (time.time() - start_time) < max_check_time:
         ohlcv = bybit.fetch_ohlcv(symbol, timeframe, limit=2)
         
-        saved_times = []  # 저장된 시간을 기록할 리스트
-        # 두 캔들 모두 저장
-        for candle in ohlcv:
-            timestamp = candle[0]
-            dt_object = datetime.utcfromtimestamp(timestamp / 1000)
-            saved_times.append(dt_object)  # 변환된 시간 저장
-            
-            data_dict = {
-                "timestamp": dt_object,
-                "open": candle[1],
-                "high": candle[2],
-                "low": candle[3],
-                "close": candle[4],
-                "volume": candle[5]
-            }
-            
-            collection.update_one(
-                {"timestamp": dt_object}, 
-                {"$set": data_dict}, 
-                upsert=True
-            )
+        # 두 캔들 모두 한 번의 bulk_write로 저장
+        saved_times = [datetime.utcfromtimestamp(candle[0] / 1000) for candle in ohlcv]  # 저장된 시간 기록
+        upsert_candles(collection, ohlcv)
+        archive_candles(timeframe, ohlcv)
+        cache_candles(symbol, timeframe, ohlcv)
             
         logger.info(f"최근 2개 캔들 업데이트 완료: {saved_times}")
         break
@@ -190,28 +246,10 @@ def chart_update_one(update, symbol, max_check_time=240, check_interval=60):
     server_time = None  # 기본값 설정
 
     try:
-        # Bybit 서버 시간 가져오기 (재시도 처리 추가)
-        max_retries = 3
-        retry_delay = 10
-        server_time = None
-
-        for attempt in range(max_retries):
-            try:
-                server_time = bybit.fetch_time() / 1000  # 밀리초를 초 단위로 변환
-                server_datetime = datetime.utcfromtimestamp(server_time)
-                print(f"바이비트 서버 시간 (UTC): {server_datetime}")
-                break  # 성공하면 루프 탈출
-            except Exception as e:
-                print(f"바이비트 서버 시간 가져오기 실패 (시도 {attempt+1}/{max_retries}): {str(e)}")
-                if attempt < max_retries - 1:  # 마지막 시도가 아니면 대기 후 재시도
-                    time.sleep(retry_delay)
-                else:
-                    print(f"바이비트 서버 시간 가져오기 최종 실패: {str(e)}")
-                    # 모든 재시도 실패 시 현재 시간으로 대체
-                    server_time = time.time()  # 이미 초 단위로 반환됨
-                    server_datetime = datetime.utcfromtimestamp(server_time)
-                    print(f"로컬 시간으로 대체 (UTC): {server_datetime}")
-                    print("주의: 로컬 시간은 바이비트 서버 시간과 약간의 차이가 있을 수 있습니다")
+        # Bybit 서버 시간 (공용 시계 오프셋으로 보정, 요청마다 fetch_time 하지 않음)
+        server_time = clock.now_ms() / 1000
+        server_datetime = datetime.utcfromtimestamp(server_time)
+        print(f"바이비트 서버 시간 (UTC): {server_datetime}")
 
         # collection 매핑
         collection = None
@@ -228,13 +266,19 @@ def chart_update_one(update, symbol, max_check_time=240, check_interval=60):
             raise ValueError(f"Invalid update value: {update}")
         
         # 업데이트 수행
-        fetch_latest_ohlcv_and_update_db(
-            symbol=symbol,
-            timeframe=update,
-            collection=collection,
-            max_check_time=max_check_time,
-            check_interval=check_interval
-        )
+        if RESAMPLE_FROM_1M and update != '1m':
+            # 마지막 1분봉 이후 누락분만 받아 저장한 뒤 상위 타임프레임 봉 집계
+            fetch_and_store_ohlcv(chart_collection_1m, '1m', symbol, limit=1440, minutes_per_unit=1,
+                                  time_description="1분봉", server_time=server_time)
+            resample_from_1m(update, symbol, server_time)
+        else:
+            fetch_latest_ohlcv_and_update_db(
+                symbol=symbol,
+                timeframe=update,
+                collection=collection,
+                max_check_time=max_check_time,
+                check_interval=check_interval
+            )
         
         # 업데이트 결과 확인
         result = collection.find_one(sort=[("timestamp", -1)])
@@ -265,4 +309,13 @@ if __name__ == "__main__":
         chart_update_one(update_type)
     else:
         print(f"유효하지 않은 업데이트 타입: {update_type}")
+
+    # 1분봉 집계 검증 모드
+    if RESAMPLE_FROM_1M:
+        for timeframe in ('3m', '5m', '15m'):
+            validate_resampled(timeframe, 'BTCUSDT')
+
+    # 타임프레임별 완성도
+    for timeframe, report in chart_completeness().items():
+        print(f"{timeframe}: {report['completeness']:.2f}%, 누락 구간 {len(report['gaps'])}개")
     pass
\ No newline at end of file
@@ -1,104 +1,121 @@
-import ccxt
-import os
-from dotenv import load_dotenv
-from datetime import datetime
 import json
 import time
-# 환경 변수 로드
-load_dotenv()
-
-# Bybit API 키와 시크릿 가져오기
-BYBIT_ACCESS_KEY = os.getenv("BYBIT_ACCESS_KEY")
-BYBIT_SECRET_KEY = os.getenv("BYBIT_SECRET_KEY")
-
-# Bybit 거래소 객체 생성
-bybit = ccxt.bybit({
-    'apiKey': BYBIT_ACCESS_KEY,
-    'secret': BYBIT_SECRET_KEY,
-    'options': {
-        'defaultType': 'swap',  # 무기한 선물 (perpetual swap) 용
-        'recvWindow': 10000  # recv_window를 10초로 증가
-    },
-    'enableRateLimit': True  # API 호출 속도 제한 관리 활성화
-})
-
-# 서버 시간을 클라이언트 시간과 동기화하는 방법
+from concurrent.futures import ThreadPoolExecutor
+from docs.utility.exchange_clock import clock
+from docs.exchange_gateway import get_exchange
+from docs.strategy.signal import Signal, label
+
+# 서버 시간을 클라이언트 시간과 동기화하는 방법 (공용 시계 오프셋 사용, 요청마다 측정하지 않음)
 def sync_time():
     try:
-        # Bybit 서버 시간 가져오기 (재시도 처리 추가)
-        max_retries = 3
-        retry_delay = 10
-        server_time = None
-
-        for attempt in range(max_retries):
-            try:
-                server_time = bybit.fetch_time() / 1000  # 밀리초를 초 단위로 변환
-                server_datetime = datetime.utcfromtimestamp(server_time)
-                print(f"바이비트 서버 시간 (UTC): {server_datetime}")
-                break  # 성공하면 루프 탈출
-            except Exception as e:
-                print(f"바이비트 서버 시간 가져오기 실패 (시도 {attempt+1}/{max_retries}): {str(e)}")
-                if attempt < max_retries - 1:  # 마지막 시도가 아니면 대기 후 재시도
-                    time.sleep(retry_delay)
-                else:
-                    print(f"바이비트 서버 시간 가져오기 최종 실패: {str(e)}")
-                    # 모든 재시도 실패 시 현재 시간으로 대체
-                    server_time = time.time()  # 이미 초 단위로 반환됨
-                    server_datetime = datetime.utcfromtimestamp(server_time)
-                    print(f"로컬 시간으로 대체 (UTC): {server_datetime}")
-                    print("주의: 로컬 시간은 바이비트 서버 시간과 약간의 차이가 있을 수 있습니다")
-        print(f"Bybit 서버 시간 (UTC): {server_datetime}")
-        return server_time
+        get_exchange()
+        return clock.now_ms() / 1000
     except Exception as e:
         print(f"서버 시간 동기화 중 오류 발생: {e}")
         return None
 
 
+class Position:
+    """열린 포지션 (ccxt fetch_positions 항목 요약)"""
 
-def fetch_investment_status():
+    __slots__ = ('symbol', 'side', 'contracts', 'entry_price', 'mark_price', 'unrealized_pnl', 'leverage', 'raw')
 
-    try:
-        # 서버 시간 동기화 시도
-        sync_time()
-        # 이전 거래 기록 가져오기
-        ledger = bybit.fetch_ledger()
-
-        # 현재 잔고 정보 가져오기
-        balance = bybit.fetch_balance()
-        # print("잔고 정보:")
-        # print(balance)
-
-        # 현재 포지션 정보 가져오기
-        positions = bybit.fetch_positions()
-        print("\n포지션 정보:")
-        active_positions = []  # 포지션이 있는 항목만 추가할 리스트
-
-        for position in positions:
-            if float(position['contracts']) > 0:  # 포지션이 있는 경우에만 처리
-                print(f"심볼: {position['symbol']}")
-                print(f"진입 가격: {position['entryPrice']}")
-                print(f"현재 수량: {position['contracts']}")
-                print(f"미실현 손익: {position['unrealizedPnl']}")
-                print(f"레버리지: {position['leverage']}")
-                print(f"현재 가격: {position['markPrice']}")
-                print(f"포지션 방향: {position['side']}")
-                print("------")
-
-                # 포지션이 있는 항목을 리스트에 추가
-                active_positions.append(position)
-
-        if not active_positions:
-            print('현재 포지션 없음')
-
-        # 포지션을 JSON으로 변환하여 반환
-        positions_json = json.dumps(active_positions)
+    def __init__(self, raw):
+        info = raw.get('info', {})
+        self.symbol = info.get('symbol', raw.get('symbol'))  # 거래소 심볼 (예: BTCUSDT)
+        self.side = info.get('side')  # 'Buy' / 'Sell'
+        self.contracts = float(raw['contracts'])
+        self.entry_price = raw.get('entryPrice')
+        self.mark_price = raw.get('markPrice')
+        self.unrealized_pnl = raw.get('unrealizedPnl')
+        self.leverage = raw.get('leverage')
+        self.raw = raw
+
+    @property
+    def direction(self):
+        """Signal.LONG / Signal.SHORT (전략 시그널과 같은 값)"""
+        return Signal.LONG if self.side == 'Buy' else Signal.SHORT
+
+    def __repr__(self):
+        return f"Position({self.symbol} {label(self.direction)} {self.contracts} @ {self.entry_price})"
+
+
+class AccountSnapshot:
+    """잔고/열린 포지션/(요청 시) 거래 기록 스냅샷"""
+
+    __slots__ = ('balance', 'positions', 'ledger', 'elapsed')
+
+    def __init__(self, balance, positions, ledger=None, elapsed=0.0):
+        self.balance = balance
+        self.positions = positions
+        self.ledger = ledger
+        self.elapsed = elapsed  # 조회에 걸린 시간(초)
+
+    @property
+    def has_position(self):
+        return bool(self.positions)
+
+    def position(self, symbol):
+        """symbol의 열린 포지션 (없으면 None)"""
+        for position in self.positions:
+            if position.symbol == symbol:
+                return position
+        return None
 
+    def positions_json(self):
+        return json.dumps([position.raw for position in self.positions])
+
+
+# 서로 독립적인 조회를 동시에 보내기 위한 스레드 풀 (요청은 공용 keep-alive 세션 사용)
+_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='account')
+
+
+def fetch_account_snapshot(include_ledger=False):
+    """
+    잔고/포지션(/거래 기록)을 동시에 조회
+    Returns:
+        AccountSnapshot, API 오류 시 None
+    """
+    start_time = time.perf_counter()
+    try:
+        exchange = get_exchange()  # 시계 오프셋 적용 + 마켓 정보는 미리 로드 (스레드마다 로드하지 않도록)
+        balance_future = _executor.submit(exchange.fetch_balance)
+        positions_future = _executor.submit(exchange.fetch_positions)
+        ledger_future = _executor.submit(exchange.fetch_ledger) if include_ledger else None
+
+        balance = balance_future.result()
+        positions = [Position(position) for position in positions_future.result()
+                     if float(position['contracts'] or 0) > 0]  # 포지션이 있는 항목만
+        ledger = ledger_future.result() if ledger_future else None
     except Exception as e:
         print(f"API 호출 중 오류 발생: {e}")
+        return None
+
+    print("\n포지션 정보:")
+    for position in positions:
+        print(f"심볼: {position.symbol}")
+        print(f"진입 가격: {position.entry_price}")
+        print(f"현재 수량: {position.contracts}")
+        print(f"미실현 손익: {position.unrealized_pnl}")
+        print(f"레버리지: {position.leverage}")
+        print(f"현재 가격: {position.mark_price}")
+        print(f"포지션 방향: {position.side}")
+        print("------")
+    if not positions:
+        print('현재 포지션 없음')
+
+    return AccountSnapshot(balance, positions, ledger, time.perf_counter() - start_time)
+
+
+def fetch_investment_status():
+    """이전 형식 (balance, positions_json, ledger) 반환, 오류 시 ('error', None, None)"""
+    snapshot = fetch_account_snapshot(include_ledger=True)
+    if snapshot is None:
         return 'error', None, None
-    pass
-    return balance, positions_json, ledger
+    return snapshot.balance, snapshot.positions_json(), snapshot.ledger
+
 
 if __name__ == "__main__":
-    fetch_investment_status()
-    pass
\ No newline at end of file
+    snapshot = fetch_account_snapshot()
+    if snapshot is not None:
+        print(f"포지션 {snapshot.positions}, 조회 {snapshot.elapsed * 1000:.0f}ms")
@@ -0,0 +1,264 @@
+"""
+Bybit 공개 WebSocket(kline/tickers) 수집기
+
+봉 마감(confirm=true) 이벤트가 오면 바로 차트 컬렉션에 저장하고
+결정 루프에 큐로 알려서 (이벤트의 start = 방금 마감된 봉 시작 시각), 봉 마감 후 고정 대기 + REST 폴링 없이 시그널 계산을 시작할 수 있게 한다.
+
+    stream = KlineStream('BTCUSDT', ('5m',))
+    stream.start()                                   # 백그라운드 스레드에서 asyncio 루프 실행
+    event = stream.wait_for_close('5m', after=..., timeout=...)
+
+테스트는 docs/utility/ws_replay_server.py의 재생 서버에 url을 맞춰서 실행한다.
+"""
+import asyncio
+import json
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+import websockets
+from logger import logger
+from docs.utility.mongo_client import get_database
+from docs.utility.candle_store import candle_to_document, archive_candles
+from docs.utility.candle_cache import append_candles
+
+BYBIT_PUBLIC_LINEAR_WS = "wss://stream.bybit.com/v5/public/linear"
+PING_INTERVAL = 20  # Bybit 권장 20초
+RECONNECT_DELAYS = (1, 2, 5, 10, 30)
+PRICE_MAX_AGE = 3  # 주문 기준가로 쓸 tickers 최근가의 최대 경과 시간(초)
+TIMEFRAME_INTERVALS = {'1m': '1', '3m': '3', '5m': '5', '15m': '15'}
+INTERVAL_TIMEFRAMES = {interval: timeframe for timeframe, interval in TIMEFRAME_INTERVALS.items()}
+EPOCH = datetime(1970, 1, 1)
+
+
+def parse_kline(item):
+    """kline 푸시 항목 -> ccxt 형식 캔들 [start(ms), open, high, low, close, volume]"""
+    return [int(item['start']), float(item['open']), float(item['high']),
+            float(item['low']), float(item['close']), float(item['volume'])]
+
+
+def store_closed_candle(symbol, timeframe, candle):
+    """
+    마감 봉 저장 (차트 컬렉션 upsert + 아카이브 + 로컬 캐시)
+    결정 루프는 이벤트의 봉 시작 시각을 load_data(last_closed=...)로 넘겨 이 봉까지 읽는다.
+    """
+    document = candle_to_document(candle)
+    get_database()[f'chart_{timeframe}'].update_one(
+        {"timestamp": document["timestamp"]}, {"$set": document}, upsert=True)
+
+    archive_candles(timeframe, [candle])
+    try:
+        append_candles(symbol, timeframe, [candle])
+    except Exception as e:
+        logger.warning(f"로컬 캔들 캐시 저장 실패: {e}")
+
+
+class KlineStream:
+    """kline.{interval}.{symbol} / tickers.{symbol} 구독 및 마감 봉 알림"""
+
+    def __init__(self, symbol='BTCUSDT', timeframes=('5m',), url=BYBIT_PUBLIC_LINEAR_WS,
+                 store=store_closed_candle, record_path=None):
+        self.symbol = symbol
+        self.timeframes = tuple(timeframes)
+        self.url = url
+        self.store = store
+        self.record_path = record_path
+
+        self.closed = queue.Queue()  # 결정 루프(동기 스레드)용 마감 이벤트
+        self.live = {}  # 진행 중인 봉
+        self.ticker = {}
+        self.last_price = None
+        self.last_price_time = None  # last_price 수신 시각 (time.monotonic)
+        self.connected = threading.Event()
+        self.stats = {'messages': 0, 'closed': 0, 'duplicates': 0, 'reconnects': 0, 'last_latency_ms': None}
+
+        self._last_confirmed = {}
+        self._stopping = False
+        self._thread = None
+        self._loop = None
+        self._record_file = None
+
+    def topics(self):
+        return ([f"kline.{TIMEFRAME_INTERVALS[tf]}.{self.symbol}" for tf in self.timeframes]
+                + [f"tickers.{self.symbol}"])
+
+    async def run(self):
+        """연결이 끊기면 지수적으로 늘어나는 간격으로 재연결"""
+        if self.record_path:
+            self._record_file = open(self.record_path, 'a', encoding='utf-8')
+        attempt = 0
+        try:
+            while not self._stopping:
+                try:
+                    async with websockets.connect(self.url, ping_interval=None) as websocket:
+                        attempt = 0
+                        await self._session(websocket)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"kline 스트림 연결 오류: {e}")
+                finally:
+                    self.connected.clear()
+
+                if self._stopping:
+                    break
+                self.stats['reconnects'] += 1
+                await asyncio.sleep(RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)])
+                attempt += 1
+        finally:
+            if self._record_file:
+                self._record_file.close()
+
+    async def _session(self, websocket):
+        await websocket.send(json.dumps({"op": "subscribe", "args": self.topics()}))
+        pinger = asyncio.ensure_future(self._ping(websocket))
+        try:
+            async for raw in websocket:
+                await self._handle_message(raw)
+        finally:
+            pinger.cancel()
+
+    async def _ping(self, websocket):
+        while True:
+            await asyncio.sleep(PING_INTERVAL)
+            await websocket.send(json.dumps({"op": "ping"}))
+
+    async def _handle_message(self, raw):
+        received_ms = time.time() * 1000
+        message = json.loads(raw)
+        self.stats['messages'] += 1
+        if self._record_file and 'topic' in message:
+            self._record_file.write(raw if isinstance(raw, str) else raw.decode())
+            self._record_file.write('\n')
+
+        if message.get('op') == 'subscribe':
+            if message.get('success'):
+                self.connected.set()
+                logger.info(f"kline 스트림 구독 완료: {self.topics()}")
+            else:
+                logger.error(f"kline 스트림 구독 실패: {message}")
+            return
+
+        topic = message.get('topic', '')
+        if topic.startswith('kline.'):
+            timeframe = INTERVAL_TIMEFRAMES.get(topic.split('.')[1])
+            for item in message.get('data', []):
+                await self._handle_kline(timeframe, item, received_ms)
+        elif topic.startswith('tickers.'):
+            data = message.get('data', {})
+            self.ticker.update(data)
+            if 'lastPrice' in data:
+                self.last_price = float(data['lastPrice'])
+                self.last_price_time = time.monotonic()
+
+    async def _handle_kline(self, timeframe, item, received_ms):
+        candle = parse_kline(item)
+        if not item.get('confirm'):
+            self.live[timeframe] = candle
+            return
+
+        if self._last_confirmed.get(timeframe) == candle[0]:
+            self.stats['duplicates'] += 1
+            return
+        self._last_confirmed[timeframe] = candle[0]
+
+        # DB 쓰기는 블로킹이므로 스레드에서 실행
+        await asyncio.to_thread(self.store, self.symbol, timeframe, candle)
+
+        close_ms = int(item['end']) + 1
+        event = {
+            'timeframe': timeframe,
+            'candle': candle,
+            'start': EPOCH + timedelta(milliseconds=candle[0]),
+            'close_time': close_ms / 1000,
+            'received_latency_ms': received_ms - close_ms,
+            'stored_latency_ms': time.time() * 1000 - close_ms,
+        }
+        self.stats['closed'] += 1
+        self.stats['last_latency_ms'] = event['stored_latency_ms']
+        self.closed.put(event)
+
+    def fresh_price(self, max_age=PRICE_MAX_AGE):
+        """max_age초 이내에 받은 최근가 (없거나 오래됐으면 None, 연결 끊김/재연결 중 포함)"""
+        if self.last_price is None or self.last_price_time is None:
+            return None
+        if time.monotonic() - self.last_price_time > max_age:
+            return None
+        return self.last_price
+
+    def start(self):
+        """백그라운드 스레드에서 실행"""
+        def runner():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.run())
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(target=runner, name='kline-stream', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stopping = True
+        if self._loop and self._loop.is_running():
+            for task in asyncio.all_tasks(self._loop):
+                self._loop.call_soon_threadsafe(task.cancel)
+        if self._thread:
+            self._thread.join(timeout)
+
+    def wait_for_close(self, timeframe, after=None, timeout=None):
+        """
+        timeframe 봉 마감 이벤트 대기
+        after(naive UTC datetime)보다 이전에 시작한 봉의 이벤트는 버린다.
+        Returns:
+            이벤트 dict, 시간 초과 시 None
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                event = self.closed.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            if event['timeframe'] != timeframe:
+                continue
+            if after is not None and event['start'] < after:
+                continue
+            return event
+
+
+if __name__ == "__main__":
+    from docs.utility.ws_replay_server import serve_replay, synthetic_frames
+
+    # 재생 서버로 수신 -> 저장 -> 알림 지연 측정 (DB 대신 메모리에 저장)
+    async def demo():
+        start_ms = 1_735_689_600_000
+        frames = synthetic_frames('BTCUSDT', '5', start_ms, bars=20)
+        server = await serve_replay(frames, interval=0.001)
+        port = server.sockets[0].getsockname()[1]
+
+        stored = []
+        stream = KlineStream('BTCUSDT', ('5m',), url=f"ws://127.0.0.1:{port}",
+                             store=lambda symbol, timeframe, candle: stored.append(candle))
+        runner = asyncio.ensure_future(stream.run())
+        latencies = []
+        for _ in range(20):
+            event = await asyncio.to_thread(stream.wait_for_close, '5m', timeout=5)
+            assert event is not None, "마감 봉 이벤트 시간 초과"
+            latencies.append(event['stored_latency_ms'] - event['received_latency_ms'])
+        stream._stopping = True
+        runner.cancel()
+        server.close()
+        await server.wait_closed()
+
+        assert [candle[0] for candle in stored] == [start_ms + i * 300000 for i in range(20)]
+        print(f"마감 봉 {len(stored)}개 수신, 중복 {stream.stats['duplicates']}개, "
+              f"최근가 {stream.last_price}, 수신 후 저장/알림까지 최대 {max(latencies):.2f}ms")
+
+    asyncio.run(demo())
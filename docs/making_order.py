@@ -1,62 +1,12 @@
-import os
-import requests
-import time
-import hashlib
-import hmac
-from dotenv import load_dotenv
 import math
-import ccxt
-from datetime import datetime
-import json
-# 환경 변수 로드
-load_dotenv()
-
-# Bybit API 키와 시크릿 가져오기
-BYBIT_ACCESS_KEY = os.getenv("BYBIT_ACCESS_KEY")
-BYBIT_SECRET_KEY = os.getenv("BYBIT_SECRET_KEY")
-
-# Bybit 거래소 객체 생성
-bybit = ccxt.bybit({
-    'apiKey': BYBIT_ACCESS_KEY,
-    'secret': BYBIT_SECRET_KEY,
-    'options': {
-        'defaultType': 'swap',  # 무기한 선물 (perpetual swap) 용
-        'recvWindow': 10000  # recv_window를 10초로 증가
-    },
-    'enableRateLimit': True  # API 호출 속도 제한 관리 활성화
-})
+from docs.utility.exchange_clock import clock
+from docs.exchange_gateway import exchange as bybit, get_exchange, private_get, private_post, public_get
 
 def sync_time():
+    """공용 서버 시계 오프셋을 ccxt 객체에 적용 (측정은 캐시/주기 갱신)"""
     try:
-
-        # Bybit 서버 시간 가져오기 (재시도 처리 추가)
-        max_retries = 3
-        retry_delay = 10
-        server_time = None
-
-        for attempt in range(max_retries):
-            try:
-                server_time = int(bybit.fetch_time())
-
-                break  # 성공하면 루프 탈출
-            except Exception as e:
-                print(f"바이비트 서버 시간 가져오기 실패 (시도 {attempt+1}/{max_retries}): {str(e)}")
-                if attempt < max_retries - 1:  # 마지막 시도가 아니면 대기 후 재시도
-                    time.sleep(retry_delay)
-                else:
-                    print(f"바이비트 서버 시간 가져오기 최종 실패: {str(e)}")
-                    # 모든 재시도 실패 시 현재 시간으로 대체
-                    server_time = int(time.time() * 1000) # 이미 초 단위로 반환됨
-                    print("주의: 로컬 시간은 바이비트 서버 시간과 약간의 차이가 있을 수 있습니다")
-
-
-
-
-
-        local_time = int(datetime.now().timestamp() * 1000)
-        time_offset = server_time - local_time
-        bybit.options['timeDifference'] = time_offset
-        return time_offset
+        get_exchange()
+        return clock.offset_ms()
     except Exception as e:
         print(f"서버 시간 동기화 중 오류 발생: {e}")
         return None
@@ -65,8 +15,7 @@ def sync_time():
 # Bybit V5 API 서버 시간 조회 함수
 def get_server_time():
     try:
-        url = "https://api.bybit.com/v5/market/time"
-        response = requests.get(url)
+        response = public_get("/v5/market/time")
         
         if response.status_code == 200:
             server_time = response.json()['time']  # 밀리초 단위 시간 사용
@@ -84,37 +33,16 @@ def get_server_time():
 
 # 현재 레버리지 조회 함수
 def get_leverage(symbol, category='linear'):
-    sync_time()
     try:
-        timestamp = str(int(time.time() * 1000))
-        
         # 요청 파라미터
         params = {
             'category': category,
             'symbol': symbol
         }
 
-        # GET 요청용 서명 생성
-        signature = create_signature_for_get(
-            timestamp=timestamp,
-            api_key=BYBIT_ACCESS_KEY,
-            api_secret=BYBIT_SECRET_KEY,
-            params=params
-        )
-
-        headers = {
-            'X-BAPI-API-KEY': BYBIT_ACCESS_KEY,
-            'X-BAPI-SIGN': signature,
-            'X-BAPI-TIMESTAMP': timestamp,
-            'X-BAPI-RECV-WINDOW': '5000'
-        }
-
-        url = "https://api.bybit.com/v5/position/list"
-        
-        print("요청 헤더:", headers)
         print("요청 데이터:", params)
         
-        response = requests.get(url, headers=headers, params=params)
+        response = private_get("/v5/position/list", params)
         print("응답:", response.text)
 
         if response.status_code == 200:
@@ -134,7 +62,6 @@ def get_leverage(symbol, category='linear'):
 
 # 레버리지 설정 함수 (V5 API)
 def set_leverage(symbol, leverage, category='linear'):
-   sync_time()
    # 현재 레버리지 확인
    current_leverage_data = get_leverage(symbol, category)
 
@@ -148,8 +75,6 @@ def set_leverage(symbol, leverage, category='linear'):
            return current_leverage
 
    try:
-       timestamp = str(int(time.time() * 1000))
-       
        # 요청 파라미터
        params = {
            'category': category,
@@ -158,29 +83,9 @@ def set_leverage(symbol, leverage, category='linear'):
            'sellLeverage': str(leverage)
        }
 
-       # 새로운 서명 생성 방식 적용
-       signature = create_signature(
-           timestamp=timestamp,
-           api_key=BYBIT_ACCESS_KEY,
-           api_secret=BYBIT_SECRET_KEY,
-           params=params
-       )
-
-       # 새로운 헤더 설정
-       headers = {
-           'X-BAPI-API-KEY': BYBIT_ACCESS_KEY,
-           'X-BAPI-SIGN': signature,
-           'X-BAPI-TIMESTAMP': timestamp,
-           'X-BAPI-RECV-WINDOW': '5000',
-           'Content-Type': 'application/json'
-       }
-
-       url = "https://api.bybit.com/v5/position/set-leverage"
-       
-       print("요청 헤더:", headers)
        print("요청 데이터:", params)
        
-       response = requests.post(url, headers=headers, json=params)
+       response = private_post("/v5/position/set-leverage", params)
        print("응답:", response.text)
 
        if response.status_code == 200:
@@ -218,49 +123,18 @@ def calculate_amount(usdt_amount, leverage, current_price):
         print(f"amount 계산 중 오류 발생: {e}")
         return None
     
-def create_signature(timestamp, api_key, api_secret, params):
-    """
-    Bybit V5 API 서명 생성 POST
-    """
-    # 파라미터를 JSON 문자열로 변환
-    params_json = json.dumps(params)
-    
-    # 서명 문자열 생성 (timestamp + api_key + recv_window + params_json)
-    signature_string = f"{timestamp}{api_key}5000{params_json}"
-    
-    # HMAC SHA256 서명 생성
-    signature = hmac.new(
-        api_secret.encode('utf-8'),
-        signature_string.encode('utf-8'),
-        hashlib.sha256
-    ).hexdigest()
-    
-    return signature
-
-def create_signature_for_get(timestamp, api_key, api_secret, params):
-    """
-    GET 요청을 위한 서명 생성
-    """
-    # 파라미터를 알파벳 순으로 정렬
-    sorted_params = dict(sorted(params.items()))
-    
-    # 쿼리 문자열 생성
-    query_string = '&'.join([f"{key}={value}" for key, value in sorted_params.items()])
-    
-    # 서명 문자열 생성
-    signature_string = f"{timestamp}{api_key}5000{query_string}"
-    
-    # HMAC SHA256 서명 생성
-    signature = hmac.new(
-        api_secret.encode('utf-8'),
-        signature_string.encode('utf-8'),
-        hashlib.sha256
-    ).hexdigest()
-    
-    return signature
+def format_price(price):
+    """주문 가격 문자열 (float 오차 자리 제거, 예: 105044.90000000001 -> '105044.9')"""
+    return f"{price:.8f}".rstrip('0').rstrip('.')
+
+def calculate_tp_sl(side, base_price, stop_loss, take_profit):
+    """기준 가격에서 TP/SL 가격 계산 (Buy: 위가 TP, Sell: 아래가 TP)"""
+    if side == 'Buy':
+        return base_price + take_profit, base_price - stop_loss
+    return base_price - take_profit, base_price + stop_loss
 
 def create_order_with_tp_sl(symbol, side, usdt_amount, leverage, current_price, stop_loss, take_profit):
-    sync_time()
+    sync_time()  # fetch_balance(ccxt) 서명용
     try:
         balance = bybit.fetch_balance()
         current_have = balance['USDT']['total']
@@ -279,8 +153,10 @@ def create_order_with_tp_sl(symbol, side, usdt_amount, leverage, current_price,
             print("BTC 수량이 유효하지 않습니다. 주문을 생성하지 않습니다.")
             return None
 
-        timestamp = str(int(time.time() * 1000))
-        
+        # TP/SL은 주문 요청에 같이 보내 체결과 동시에 포지션이 보호되도록 한다
+        # (체결 후 포지션 재조회 -> trading-stop 요청 사이에 손절 없는 구간이 생기지 않게)
+        tp_price, sl_price = calculate_tp_sl(side.capitalize(), current_price, stop_loss, take_profit)
+
         # 주문 파라미터
         params = {
             'category': 'linear',
@@ -289,45 +165,23 @@ def create_order_with_tp_sl(symbol, side, usdt_amount, leverage, current_price,
             'orderType': 'Market',
             'qty': str(amount),
             'timeInForce': 'IOC',
-            'positionIdx': 0
-        }
-
-        # 새로운 서명 생성 방식
-        signature = create_signature(
-            timestamp=timestamp,
-            api_key=BYBIT_ACCESS_KEY,
-            api_secret=BYBIT_SECRET_KEY,
-            params=params
-        )
-
-        # 새로운 헤더 설정
-        headers = {
-            'X-BAPI-API-KEY': BYBIT_ACCESS_KEY,
-            'X-BAPI-SIGN': signature,
-            'X-BAPI-TIMESTAMP': timestamp,
-            'X-BAPI-RECV-WINDOW': '5000',
-            'Content-Type': 'application/json'
+            'positionIdx': 0,
+            'tpslMode': 'Full',
+            'takeProfit': format_price(tp_price),
+            'stopLoss': format_price(sl_price)
         }
 
-        url = "https://api.bybit.com/v5/order/create"
-        
         # 디버깅을 위한 출력
-        print("요청 헤더:", headers)
         print("요청 데이터:", params)
         
         # 요청 보내기
-        response = requests.post(url, headers=headers, json=params)
+        response = private_post("/v5/order/create", params)
         print("응답:", response.text)
 
         if response.status_code == 200:
             result = response.json()
             if result['retCode'] == 0:
                 print("주문 성공:", result)
-                
-                # 이 부분은 기존 코드 유지
-                amount, side, avgPrice,pnl = get_position_amount(symbol)
-                if avgPrice:
-                    set_tp_sl(symbol, stop_loss, take_profit, avgPrice, side)
                 return result
             else:
                 print("API 오류:", result)
@@ -341,25 +195,14 @@ def create_order_with_tp_sl(symbol, side, usdt_amount, leverage, current_price,
         return None
 
 def set_tp_sl(symbol, stop_loss, take_profit, current_price, side):
-    sync_time()
     try:
         # TP 및 SL 가격 계산
-        tp_price = None
-        sl_price = None
-
-        if side == 'Buy':
-            sl_price = current_price - stop_loss  
-            tp_price = current_price + take_profit
-        else:  # Sell
-            sl_price = current_price + stop_loss  
-            tp_price = current_price - take_profit
-            
+        tp_price, sl_price = calculate_tp_sl(side, current_price, stop_loss, take_profit)
+
         print(f"현재 가격: {current_price}")
         print(f"계산된 sl_price: {sl_price}")
         print(f"계산된 tp_price: {tp_price}")
 
-        timestamp = str(int(time.time() * 1000))
-
         params = {
             'category': 'linear',
             'symbol': symbol,
@@ -368,31 +211,13 @@ def set_tp_sl(symbol, stop_loss, take_profit, current_price, side):
         }
 
         if tp_price is not None:
-            params['takeProfit'] = str(tp_price)  # round() 제거
+            params['takeProfit'] = format_price(tp_price)  # round() 없이 float 오차만 제거
         if sl_price is not None:
-            params['stopLoss'] = str(sl_price)    # round() 제거
-
-        signature = create_signature(
-            timestamp=timestamp,
-            api_key=BYBIT_ACCESS_KEY,
-            api_secret=BYBIT_SECRET_KEY,
-            params=params
-        )
-
-        headers = {
-            'X-BAPI-API-KEY': BYBIT_ACCESS_KEY,
-            'X-BAPI-SIGN': signature,
-            'X-BAPI-TIMESTAMP': timestamp,
-            'X-BAPI-RECV-WINDOW': '5000',
-            'Content-Type': 'application/json'
-        }
+            params['stopLoss'] = format_price(sl_price)
 
-        url = "https://api.bybit.com/v5/position/trading-stop"
-        
-        print("요청 헤더:", headers)
         print("요청 데이터:", params)
         
-        response = requests.post(url, headers=headers, json=params)
+        response = private_post("/v5/position/trading-stop", params)
         print("응답:", response.text)
 
         if response.status_code == 200:
@@ -417,38 +242,17 @@ def set_tp_sl(symbol, stop_loss, take_profit, current_price, side):
 
 # 현재 포지션 정보 조회 함수 (Bybit V5 API)
 def get_position_amount(symbol):
-    sync_time()
     try:
-        timestamp = str(int(time.time() * 1000))
-        
         # 요청 파라미터
         params = {
             'category': 'linear',
             'symbol': symbol
         }
 
-        # GET 요청용 서명 생성
-        signature = create_signature_for_get(
-            timestamp=timestamp,
-            api_key=BYBIT_ACCESS_KEY,
-            api_secret=BYBIT_SECRET_KEY,
-            params=params
-        )
-
-        headers = {
-            'X-BAPI-API-KEY': BYBIT_ACCESS_KEY,
-            'X-BAPI-SIGN': signature,
-            'X-BAPI-TIMESTAMP': timestamp,
-            'X-BAPI-RECV-WINDOW': '5000'
-        }
-
-        url = "https://api.bybit.com/v5/position/list"
-        
-        print("요청 헤더:", headers)
         print("요청 데이터:", params)
         
         # GET 요청은 params로 전달
-        response = requests.get(url, headers=headers, params=params)
+        response = private_get("/v5/position/list", params)
         print("응답:", response.text)
 
         if response.status_code == 200:
@@ -474,7 +278,6 @@ def get_position_amount(symbol):
 
 
 def close_position(symbol):
-    sync_time()
     try:
         # 현재 포지션의 방향, 수량 조회
         amount, side, avgPrice, PnL = get_position_amount(symbol)
@@ -483,8 +286,6 @@ def close_position(symbol):
             return None
 
         # 타임스탬프 생성
-        timestamp = str(int(time.time() * 1000))
-
         # 반대 포지션으로 설정하여 청산 주문 생성
         opposite_side = 'Sell' if side == 'Buy' else 'Buy'
         
@@ -499,29 +300,9 @@ def close_position(symbol):
             'positionIdx': 0
         }
 
-        # 새로운 서명 생성 방식 적용
-        signature = create_signature(
-            timestamp=timestamp,
-            api_key=BYBIT_ACCESS_KEY,
-            api_secret=BYBIT_SECRET_KEY,
-            params=params
-        )
-
-        # 새로운 헤더 설정
-        headers = {
-            'X-BAPI-API-KEY': BYBIT_ACCESS_KEY,
-            'X-BAPI-SIGN': signature,
-            'X-BAPI-TIMESTAMP': timestamp,
-            'X-BAPI-RECV-WINDOW': '5000',
-            'Content-Type': 'application/json'
-        }
-
-        url = "https://api.bybit.com/v5/order/create"
-        
-        print("요청 헤더:", headers)
         print("요청 데이터:", params)
         
-        response = requests.post(url, headers=headers, json=params)
+        response = private_post("/v5/order/create", params)
         print("응답:", response.text)
 
         if response.status_code == 200:
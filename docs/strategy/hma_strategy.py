@@ -1,5 +1,7 @@
 import numpy as np
 
+from docs.strategy.signal import to_codes
+
 def check_hma_signals(df):
     """
     HMA 기반 매수/매도 신호를 DataFrame에 추가하는 함수
@@ -25,9 +27,7 @@ def check_hma_signals(df):
         (df['hma2'] > df['hma1'])
     ]
     
-    choices = ['Long', 'Short']
-    
-    # 신호를 DataFrame에 추가 (unique한 컬럼명 사용)
-    df['signal_hma'] = np.select(conditions, choices, default=None)
+    # 신호를 DataFrame에 추가 (unique한 컬럼명 사용, int8 시그널)
+    df['signal_hma'] = to_codes(conditions[0].to_numpy(), conditions[1].to_numpy())
     
     return df
\ No newline at end of file
@@ -1,3 +1,56 @@
+import numpy as np
+
+from docs.strategy.signal import SIGNAL_DTYPE, Signal, column, rolling_all, to_signal_column, last_of
+
+
+def line_reg_masks(df, STG_CONFIG):
+    """
+    선형회귀 채널 반등 조건을 배열 연산으로 계산
+    Returns:
+        long_mask, short_mask (bool ndarray)
+    """
+    # 파라미터 설정
+    rsi_lower = STG_CONFIG['LINEAR_REG']['RSI_LOWER_BOUND']
+    rsi_upper = STG_CONFIG['LINEAR_REG']['RSI_UPPER_BOUND']
+    min_slope_filter = STG_CONFIG['LINEAR_REG']['MIN_SLOPE_VALUE']
+    min_trend_bars = STG_CONFIG['LINEAR_REG']['MIN_TREND_DURATION']
+    bounce_strength = STG_CONFIG['LINEAR_REG']['MIN_BOUNCE_BARS']
+
+    close = column(df, 'close')
+    low = column(df, 'low')
+    high = column(df, 'high')
+    lower_band = column(df, 'lower_band')
+    upper_band = column(df, 'upper_band')
+    slope = column(df, 'slope')
+    rsi = column(df, 'rsi_stg4')
+    trend_duration = column(df, 'trend_duration')
+    prev_close = np.r_[np.nan, close[:-1]]
+
+    # RSI 필터, 기울기 강도 필터, 추세 지속성 확인
+    is_valid = ((rsi_lower <= rsi) & (rsi <= rsi_upper) &
+                (np.abs(slope) >= min_slope_filter) &
+                (np.abs(trend_duration) >= min_trend_bars))
+
+    # 추세 방향
+    is_uptrend = slope >= 0
+    is_downtrend = slope < 0
+
+    touch_lower = low <= lower_band
+    touch_upper = high >= upper_band
+
+    # 반등 확인: 최근 bounce_strength개 봉 모두 밴드 터치 + 종가 반대 방향 진행
+    bounce_up = rolling_all(touch_lower & (close < prev_close), bounce_strength)
+    bounce_down = rolling_all(touch_upper & (close > prev_close), bounce_strength)
+
+    long_mask = is_valid & is_uptrend & touch_lower & bounce_up
+    short_mask = is_valid & is_downtrend & touch_upper & bounce_down
+
+    # 초기 데이터는 건너뛰기
+    long_mask[:bounce_strength] = False
+    short_mask[:bounce_strength] = False
+    return long_mask, short_mask
+
+
 def check_line_reg_signal(df,STG_CONFIG):
     """
     진입 시그널을 계산하여 데이터프레임에 새로운 컬럼으로 추가하는 함수
@@ -6,78 +59,30 @@ def check_line_reg_signal(df,STG_CONFIG):
     Returns:
         시그널 컬럼이 추가된 데이터프레임
     """
-    df = df.copy()  # 원본 데이터 보호
     # 결과를 저장할 새로운 컬럼 초기화
-    df['line_reg_signal'] = None
-    
+    df['line_reg_signal'] = np.zeros(len(df), dtype=SIGNAL_DTYPE)
+
     if len(df) < 2:  # 최소 2개의 데이터 필요
         return df
-        
-    # 파라미터 설정
-    rsi_lower = STG_CONFIG['LINEAR_REG']['RSI_LOWER_BOUND'] 
-    rsi_upper = STG_CONFIG['LINEAR_REG']['RSI_UPPER_BOUND']
-    min_slope_filter = STG_CONFIG['LINEAR_REG']['MIN_SLOPE_VALUE']
-    min_trend_bars = STG_CONFIG['LINEAR_REG']['MIN_TREND_DURATION']
+
+    long_mask, short_mask = line_reg_masks(df, STG_CONFIG)
+    df['line_reg_signal'] = to_signal_column(long_mask, short_mask, df.index)
+    return df
+
+
+def last_signal(df_or_state, STG_CONFIG):
+    """
+    마지막 봉의 시그널만 계산 (라이브용)
+    반등 확인에 필요한 최근 MIN_BOUNCE_BARS + 1개 행만 사용한다.
+    Parameters:
+        df_or_state: 지표 데이터프레임 또는 IndicatorState
+    Returns:
+        Signal (LONG / SHORT / NONE)
+    """
     bounce_strength = STG_CONFIG['LINEAR_REG']['MIN_BOUNCE_BARS']
+    df = df_or_state.tail(max(bounce_strength + 1, 2))
+    if len(df) < 2:  # 최소 2개의 데이터 필요
+        return Signal.NONE
 
-    # 시그널 컬럼 인덱스 미리 저장
-    signal_column_idx = df.columns.get_loc('line_reg_signal')
-
-    def check_bounce(idx):
-        count = 0
-        
-        for i in range(1, bounce_strength + 1):
-            if idx - i < 0 or idx - (i-1) < 0:  # 인덱스 범위 체크
-                return False
-            
-            curr_price = df['close'].iloc[idx - (i-1)]
-            prev_price = df['close'].iloc[idx - i]
-            
-            if df['slope'].iloc[idx] >= 0:  # 상승추세
-                if (df['low'].iloc[idx - (i-1)] <= df['lower_band'].iloc[idx - (i-1)] and 
-                    curr_price < prev_price):
-                    count += 1
-            else:  # 하락추세
-                if (df['high'].iloc[idx - (i-1)] >= df['upper_band'].iloc[idx - (i-1)] and 
-                    curr_price > prev_price):
-                    count += 1
-
-        return count >= bounce_strength
-    
-    # 각 행에 대해 시그널 계산
-    for i in range(len(df)):
-        if i < bounce_strength:  # 초기 데이터는 건너뛰기
-            continue
-            
-        current = df.iloc[i]
-        
-        # RSI 필터
-        is_valid_rsi = rsi_lower <= current['rsi_stg4'] <= rsi_upper
-        
-        # 기울기 강도 필터
-        is_valid_slope = abs(current['slope']) >= min_slope_filter
-        
-        # 추세 방향
-        is_uptrend = current['slope'] >= 0
-        is_downtrend = current['slope'] < 0
-        
-        # 추세 지속성 확인
-        is_valid_trend_duration = abs(current['trend_duration']) >= min_trend_bars
-        
-        # 모든 진입 조건 확인
-        if not (is_valid_rsi and is_valid_slope and is_valid_trend_duration):
-            continue
-        
-        # 롱 포지션 조건
-        if (is_uptrend and 
-            current['low'] <= current['lower_band'] and 
-            check_bounce(i)):
-            df.iloc[i, signal_column_idx] = 'Long'
-            
-        # 숏 포지션 조건
-        elif (is_downtrend and 
-              current['high'] >= current['upper_band'] and 
-              check_bounce(i)):
-            df.iloc[i, signal_column_idx] = 'Short'
-    
-    return df
\ No newline at end of file
+    long_mask, short_mask = line_reg_masks(df, STG_CONFIG)
+    return last_of(long_mask, short_mask)
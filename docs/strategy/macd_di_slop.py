@@ -1,6 +1,9 @@
+from docs.strategy.signal import Signal
+
+
 def generate_macd_di_rsi_signal(df,STG_CONFIG, debug=False):
     if len(df) < 5:
-        return None
+        return Signal.NONE
 
     # 파라미터 설정
     required_signals = STG_CONFIG['MACD_DI_SLOPE']['REQUIRED_CONSECUTIVE_SIGNALS']
@@ -24,7 +27,7 @@ def generate_macd_di_rsi_signal(df,STG_CONFIG, debug=False):
     if not (rsi_lower < current_rsi < rsi_upper):
         if debug:
             print("신호: 없음 (RSI 범위 초과)")
-        return None
+        return Signal.NONE
 
     # MACD 방향 확인
     macd_conditions = []
@@ -83,13 +86,13 @@ def generate_macd_di_rsi_signal(df,STG_CONFIG, debug=False):
         if abs(df['slope_diff_stg5'].iloc[-1]) > min_slope_threshold * 2:
             if debug:
                 print("\n최종 신호: 매수")
-            return "Long"
+            return Signal.LONG
     elif bear_count == required_signals:
         if abs(df['slope_diff_stg5'].iloc[-1]) > min_slope_threshold * 2:
             if debug:
                 print("\n최종 신호: 매도")
-            return "Short"
+            return Signal.SHORT
    
     if debug:
        print("\n최종 신호: 없음")
-    return None
\ No newline at end of file
+    return Signal.NONE
\ No newline at end of file
@@ -1,7 +1,45 @@
+import numpy as np
+
+from docs.strategy.signal import SIGNAL_DTYPE, Signal, column, rolling_all, to_signal_column, last_of
+
+
+def macd_dive_masks(df, STG_CONFIG):
+    """
+    MACD 히스토그램과 가격의 다이버전스 조건을 배열 연산으로 계산
+    Returns:
+        long_mask, short_mask (bool ndarray)
+    """
+    hist_upper = STG_CONFIG['MACD_DIVE']['HISTOGRAM_UPPER_LIMIT']
+    hist_lower = STG_CONFIG['MACD_DIVE']['HISTOGRAM_LOWER_LIMIT']
+    price_threshold = STG_CONFIG['MACD_DIVE']['PRICE_MOVEMENT_THRESHOLD']
+    lookback = STG_CONFIG['MACD_DIVE']['LOOKBACK_PERIOD']
+
+    close = column(df, 'close')
+    hist = column(df, 'hist_stg2')
+    prev_close = np.r_[np.nan, close[:-1]]
+    prev_hist = np.r_[np.nan, hist[:-1]]
+
+    price_change_pct = (close - prev_close) / prev_close * 100
+    hist_direction = hist - prev_hist
+
+    # 히스토그램이 범위 안이면 제외
+    in_range = (hist_lower <= hist) & (hist <= hist_upper)
+
+    # Bearish: 히스토그램 상승 + 가격 하락 / Bullish: 히스토그램 하락 + 가격 상승
+    bearish = (hist_direction > 0) & (price_change_pct < -price_threshold)
+    bullish = (hist_direction < 0) & (price_change_pct > price_threshold)
+
+    short_mask = ~in_range & bearish & rolling_all(bearish, lookback)
+    long_mask = ~in_range & bullish & rolling_all(bullish, lookback)
+
+    long_mask[:lookback + 1] = False
+    short_mask[:lookback + 1] = False
+    return long_mask, short_mask
+
+
 def generate_macd_dive_signal(df,STG_CONFIG):
-    df = df.copy()
-    df['macd_dive_signal'] = None
-    
+    df['macd_dive_signal'] = np.zeros(len(df), dtype=SIGNAL_DTYPE)
+
     hist_upper = STG_CONFIG['MACD_DIVE']['HISTOGRAM_UPPER_LIMIT']
     hist_lower = STG_CONFIG['MACD_DIVE']['HISTOGRAM_LOWER_LIMIT']
     price_threshold = STG_CONFIG['MACD_DIVE']['PRICE_MOVEMENT_THRESHOLD']
@@ -9,51 +47,23 @@ def generate_macd_dive_signal(df,STG_CONFIG):
 
     # 중간값 확인을 위한 출력
     print(f"파라미터: hist_upper={hist_upper}, hist_lower={hist_lower}, price_threshold={price_threshold}, lookback={lookback}")
-    
-    for i in range(lookback + 1, len(df)):
-        current_price = df['close'].iloc[i]
-        prev_price = df['close'].iloc[i-1]
-        price_change_pct = (current_price - prev_price) / prev_price * 100
-        
-        # hist_stg2 사용
-        current_hist = df['hist_stg2'].iloc[i]
-        if hist_lower <= current_hist <= hist_upper:
-            continue
-            
-        hist_direction = current_hist - df['hist_stg2'].iloc[i-1]
-        
-        # Bearish Divergence
-        if hist_direction > 0 and price_change_pct < -price_threshold:
-            bearish_count = 0
-            for j in range(lookback):
-                check_idx = i - j
-                prev_check_idx = check_idx - 1
-                
-                if prev_check_idx >= 0:
-                    hist_diff = df['hist_stg2'].iloc[check_idx] - df['hist_stg2'].iloc[prev_check_idx]
-                    price_diff_pct = ((df['close'].iloc[check_idx] - df['close'].iloc[prev_check_idx])
-                                    / df['close'].iloc[prev_check_idx] * 100)
-                    if hist_diff > 0 and price_diff_pct < -price_threshold:
-                        bearish_count += 1
-            
-            if bearish_count >= lookback:
-                df.iloc[i, df.columns.get_loc('macd_dive_signal')] = 'Short'
-        
-        # Bullish Divergence
-        elif hist_direction < 0 and price_change_pct > price_threshold:
-            bullish_count = 0
-            for j in range(lookback):
-                check_idx = i - j
-                prev_check_idx = check_idx - 1
-                
-                if prev_check_idx >= 0:
-                    hist_diff = df['hist_stg2'].iloc[check_idx] - df['hist_stg2'].iloc[prev_check_idx]
-                    price_diff_pct = ((df['close'].iloc[check_idx] - df['close'].iloc[prev_check_idx])
-                                    / df['close'].iloc[prev_check_idx] * 100)
-                    if hist_diff < 0 and price_diff_pct > price_threshold:
-                        bullish_count += 1
-            
-            if bullish_count >= lookback:
-                df.iloc[i, df.columns.get_loc('macd_dive_signal')] = 'Long'
-    
-    return df
\ No newline at end of file
+
+    long_mask, short_mask = macd_dive_masks(df, STG_CONFIG)
+    df['macd_dive_signal'] = to_signal_column(long_mask, short_mask, df.index)
+    return df
+
+
+def last_signal(df_or_state, STG_CONFIG):
+    """
+    마지막 봉의 시그널만 계산 (라이브용)
+    이전 봉 대비 변화를 LOOKBACK_PERIOD개 봉에 대해 봐야 하므로 최근 LOOKBACK_PERIOD + 2개 행만 사용한다.
+    Parameters:
+        df_or_state: 지표 데이터프레임 또는 IndicatorState
+    Returns:
+        Signal (LONG / SHORT / NONE)
+    """
+    lookback = STG_CONFIG['MACD_DIVE']['LOOKBACK_PERIOD']
+    df = df_or_state.tail(lookback + 2)
+
+    long_mask, short_mask = macd_dive_masks(df, STG_CONFIG)
+    return last_of(long_mask, short_mask)
@@ -0,0 +1,99 @@
+"""
+전략 시그널 공용 정의
+
+시그널은 전략/포지션 계산/백테스트 전체에서 int8 값(+1 롱 / -1 숏 / 0 없음)으로 다룬다.
+'Long'/'Short' 문자열은 로그 출력과 화면(스냅샷 JSON, 차트) 경계에서만 label()로 만든다.
+"""
+from enum import IntEnum
+
+import numpy as np
+import pandas as pd
+
+
+class Signal(IntEnum):
+    """전략 시그널 (시그널 컬럼의 int8 값과 같음, NONE은 거짓으로 평가)"""
+    SHORT = -1
+    NONE = 0
+    LONG = 1
+
+
+SIGNAL_DTYPE = np.int8
+_LABELS = {Signal.LONG: 'Long', Signal.SHORT: 'Short'}
+_FROM_LABEL = {'long': Signal.LONG, 'short': Signal.SHORT}
+
+
+def to_signal(value):
+    """
+    단일 값 -> Signal
+    (int/numpy 정수, 과거 로그의 'Long'/'Short'/'long'/'short', None 모두 허용)
+    """
+    if value is None:
+        return Signal.NONE
+    if isinstance(value, str):
+        return _FROM_LABEL.get(value.lower(), Signal.NONE)
+    try:
+        return Signal(int(np.sign(value)))
+    except (TypeError, ValueError):  # NaN 등
+        return Signal.NONE
+
+
+def label(value):
+    """Signal -> 'Long'/'Short'/None (로그/화면 출력용)"""
+    return _LABELS.get(to_signal(value))
+
+
+def signal_codes(values):
+    """시그널 배열 -> int8 (이미 int8이면 그대로, 'Long'/'Short'/None 문자열 배열은 변환)"""
+    values = np.asarray(values)
+    if values.dtype == SIGNAL_DTYPE:
+        return values
+    if values.dtype.kind in 'iuf':
+        return np.sign(np.nan_to_num(values)).astype(SIGNAL_DTYPE)
+    values = values.astype(object)
+    return np.where(values == 'Long', 1, np.where(values == 'Short', -1, 0)).astype(SIGNAL_DTYPE)
+
+
+def to_codes(long_mask, short_mask):
+    """롱/숏 마스크 -> int8 시그널 배열 (롱 우선)"""
+    return np.where(long_mask, Signal.LONG, np.where(short_mask, Signal.SHORT, Signal.NONE)).astype(SIGNAL_DTYPE)
+
+
+def column(df, name):
+    """
+    지표 컬럼의 읽기 전용 float 배열 (복사 없이 df 메모리를 그대로 보는 뷰)
+    전략 함수가 공유 지표 행렬을 실수로 수정하지 못하게 쓰기 금지로 넘긴다
+    """
+    values = df[name].to_numpy(dtype=float)
+    if values.flags.writeable:
+        values = values.view()
+        values.flags.writeable = False
+    return values
+
+
+def rolling_all(cond, window):
+    """
+    각 봉에서 직전 window개 봉(현재 포함)의 조건이 모두 참인지 여부
+    ("N개 연속 봉" 조건을 누적합으로 계산)
+    """
+    cond = np.asarray(cond, dtype=bool)
+    if window <= 0:
+        return np.ones(len(cond), dtype=bool)
+    counts = np.cumsum(cond, dtype=np.int64)
+    counts[window:] = counts[window:] - counts[:-window]
+    return counts >= window
+
+
+def to_signal_column(long_mask, short_mask, index):
+    """롱/숏 마스크를 int8 시그널 컬럼으로 변환 (롱 우선)"""
+    return pd.Series(to_codes(long_mask, short_mask), index=index)
+
+
+def last_of(long_mask, short_mask):
+    """마스크의 마지막 봉 시그널 (Signal)"""
+    if len(long_mask) == 0:
+        return Signal.NONE
+    if long_mask[-1]:
+        return Signal.LONG
+    if short_mask[-1]:
+        return Signal.SHORT
+    return Signal.NONE
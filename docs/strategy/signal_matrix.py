@@ -0,0 +1,117 @@
+"""
+백테스트용 전략 시그널 행렬
+
+process_chart_data로 한 번 계산한 지표 df를 읽기 전용 컬럼 뷰로만 읽어
+전략별 시그널을 int8(Signal: +1 롱 / -1 숏 / 0 없음) 컬럼 하나씩으로 모은다.
+(전략마다 df를 복사하거나 지표 df에 중간 컬럼을 기록하지 않음)
+"""
+import numpy as np
+import pandas as pd
+
+from docs.strategy.signal import SIGNAL_DTYPE, Signal, column, to_codes
+from docs.strategy.supertrend import supertrend_bands, trend_change_codes
+from docs.strategy.line_reg import line_reg_masks
+from docs.strategy.macd_size_di import macd_size_masks
+from docs.strategy.macd_divergence import macd_dive_masks
+
+# 전략 태그 -> 시그널 컬럼 (cal_position 우선순위 순: 슈퍼트렌드 -> 선형회귀 -> MACD 크기 -> MACD 다이버전스)
+SIGNAL_COLUMNS = {
+    'st': 'filtered_position',
+    'lr': 'line_reg_signal',
+    'sz': 'macd_size_signal',
+    'dv': 'macd_dive_signal',
+}
+STRATEGY_ORDER = tuple(SIGNAL_COLUMNS)
+
+
+def filtered_supertrend_codes(df, STG_CONFIG):
+    """슈퍼트렌드 전환 시그널에 DI 차이 평균 필터 적용 (cal_position의 filtered_position과 같은 조건)"""
+    _, _, _, _, trend = supertrend_bands(df, STG_CONFIG)
+    codes = trend_change_codes(trend)
+
+    di_diff_filter = STG_CONFIG['SUPERTREND']['DI_DIFFERENCE_FILTER']
+    di_diff_lookback = STG_CONFIG['SUPERTREND']['DI_DIFFERENCE_LOOKBACK_PERIOD']
+    di_diff = pd.Series(column(df, 'DI+_stg3') - column(df, 'DI-_stg3'))
+    avg_di_diff = di_diff.rolling(window=di_diff_lookback).mean().to_numpy()
+
+    codes[(codes == Signal.LONG) & ~(avg_di_diff > di_diff_filter)] = Signal.NONE
+    codes[(codes == Signal.SHORT) & ~(avg_di_diff < -di_diff_filter)] = Signal.NONE
+    return codes
+
+
+def strategy_codes(df, STG_CONFIG):
+    """
+    전략별 시그널 배열
+    Returns:
+        dict: 'st'/'lr'/'sz'/'dv' -> int8 ndarray
+    """
+    return {
+        'st': filtered_supertrend_codes(df, STG_CONFIG),
+        'lr': to_codes(*line_reg_masks(df, STG_CONFIG)),
+        'sz': to_codes(*macd_size_masks(df, STG_CONFIG)),
+        'dv': to_codes(*macd_dive_masks(df, STG_CONFIG)),
+    }
+
+
+def blend(codes):
+    """봉마다 STRATEGY_ORDER에서 우선순위가 가장 높은 전략의 시그널"""
+    combined = np.zeros(len(codes[STRATEGY_ORDER[0]]), dtype=SIGNAL_DTYPE)
+    for tag in reversed(STRATEGY_ORDER):
+        combined = np.where(codes[tag] != Signal.NONE, codes[tag], combined).astype(SIGNAL_DTYPE)
+    return combined
+
+
+def signal_matrix(df, STG_CONFIG):
+    """
+    시그널 컬럼(SIGNAL_COLUMNS 이름)만 모은 int8 DataFrame
+    """
+    codes = strategy_codes(df, STG_CONFIG)
+    return pd.DataFrame({SIGNAL_COLUMNS[tag]: codes[tag] for tag in STRATEGY_ORDER}, index=df.index)
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import time
+    import tracemalloc
+
+    from docs.cal_chart import process_chart_data
+    from docs.utility.bench_strategies import make_ohlcv
+
+    # cal_position/전략 함수 경로(df 복사 + 시그널 컬럼 기록)와 결과/시간/최대 메모리 비교 (2,100개 5분봉)
+    df, stg_config = process_chart_data(make_ohlcv(2100, 1))
+
+    def measure(func):
+        tracemalloc.start()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result, elapsed, peak
+
+    def column_path():
+        # 슈퍼트렌드는 운영 경로 cal_position의 filtered_position (DI 필터 포함)과 비교한다.
+        # cal_position은 슈퍼트렌드 마지막 봉이 NONE일 때만 대체 전략 컬럼을 만들므로 빠진 컬럼은 전략 함수로 채운다
+        from docs.cal_position import cal_position
+        from docs.strategy.line_reg import check_line_reg_signal
+        from docs.strategy.macd_size_di import generate_macd_size_signal
+        from docs.strategy.macd_divergence import generate_macd_dive_signal
+        _, frame, _ = cal_position(df.copy(), stg_config, enable_path=None)
+        for name, func in (('line_reg_signal', check_line_reg_signal),
+                           ('macd_dive_signal', generate_macd_dive_signal),
+                           ('macd_size_signal', generate_macd_size_signal)):
+            if name not in frame:
+                frame = func(frame, stg_config)
+        return frame
+
+    expected, column_time, column_peak = measure(column_path)
+    matrix, matrix_time, matrix_peak = measure(lambda: signal_matrix(df, stg_config))
+    for name in SIGNAL_COLUMNS.values():
+        assert (expected[name].to_numpy() == matrix[name].to_numpy()).all(), name
+    print("시그널 일치")
+    print(f"cal_position 경로(df 복사): {column_time * 1000:.1f}ms, 최대 메모리 {column_peak / 1e6:.1f}MB")
+    print(f"시그널 행렬: {matrix_time * 1000:.1f}ms, 최대 메모리 {matrix_peak / 1e6:.2f}MB")
+    print(f"시그널 행렬 크기: {matrix.memory_usage(index=False).sum() / 1e3:.1f}KB "
+          f"(object 'Long'/'Short' 컬럼이면 {matrix.size * 8 / 1e3:.1f}KB)")
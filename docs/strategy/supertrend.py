@@ -1,56 +1,93 @@
-def supertrend(df,STG_CONFIG):
+import numpy as np
+
+from docs.strategy.signal import SIGNAL_DTYPE, Signal, column
+
+
+def supertrend_kernel(close, basic_upper, basic_lower):
+    """
+    밴드 래칫과 추세 전환을 한 번의 루프로 계산
+    (판다스 인덱싱 없이 파이썬 float 리스트 위에서 동작)
+
+    Returns:
+        up, down (float ndarray), trend (int64 ndarray)
+    """
+    close = np.asarray(close, dtype=float).tolist()
+    basic_upper = np.asarray(basic_upper, dtype=float).tolist()
+    basic_lower = np.asarray(basic_lower, dtype=float).tolist()
+    n = len(close)
+
+    up = basic_upper[:]
+    down = basic_lower[:]
+    trend = [1] * n
+    if n == 0:
+        return np.array(up), np.array(down), np.array(trend, dtype=np.int64)
+
+    # 첫 번째 트렌드 설정
+    trend[0] = 1 if close[0] > down[0] else -1
+
+    for i in range(1, n):
+        prev_close = close[i-1]
+        prev_up = up[i-1]
+        prev_down = down[i-1]
+
+        # Final Bands (파이썬 max/min과 동일한 NaN 처리)
+        if prev_close > prev_up:
+            curr_up = basic_upper[i]
+            up[i] = prev_up if prev_up > curr_up else curr_up
+        if prev_close < prev_down:
+            curr_down = basic_lower[i]
+            down[i] = prev_down if prev_down < curr_down else curr_down
+
+        # Trend - 이전 봉의 up/down 사용
+        prev_trend = trend[i-1]
+        if prev_trend == -1 and close[i] > prev_down:
+            trend[i] = 1
+        elif prev_trend == 1 and close[i] < prev_up:
+            trend[i] = -1
+        else:
+            trend[i] = prev_trend
+
+    return np.array(up), np.array(down), np.array(trend, dtype=np.int64)
+
+
+def supertrend_bands(df, STG_CONFIG):
+    """
+    밴드와 추세를 읽기 전용 컬럼 뷰에서 계산 (df에 기록하지 않음)
+    Returns:
+        basic_upper, basic_lower, up, down, trend
+    """
     # 소스 hl2 유지
-    src = (df['high'] + df['low']) / 2
-    atr = df['atr_stg3']  
+    src = (column(df, 'high') + column(df, 'low')) / 2
+    atr = column(df, 'atr_stg3')
     multiplier = STG_CONFIG['SUPERTREND']['ATR_MULTIPLIER']
-    
+
     # Basic Bands 계산
-    df['basic_upper'] = src - (multiplier * atr)
-    df['basic_lower'] = src + (multiplier * atr)
-    
-    # Final Bands 계산을 위한 초기화
-    df['up'] = df['basic_upper']
-    df['down'] = df['basic_lower']
-    
-    # Final Bands 계산 (기존 유지)
-    for i in range(1, len(df)):
-        if df['close'].iloc[i-1] > df['up'].iloc[i-1]:
-            df.loc[df.index[i], 'up'] = max(df['basic_upper'].iloc[i], df['up'].iloc[i-1])
-        else:
-            df.loc[df.index[i], 'up'] = df['basic_upper'].iloc[i]
-            
-        if df['close'].iloc[i-1] < df['down'].iloc[i-1]:
-            df.loc[df.index[i], 'down'] = min(df['basic_lower'].iloc[i], df['down'].iloc[i-1])
-        else:
-            df.loc[df.index[i], 'down'] = df['basic_lower'].iloc[i]
-    
-    # Trend 초기화
-    df['st_trend'] = 1
-
-    # 첫 번째 트렌드 설정 (기존 유지)
-    if df['close'].iloc[0] > df['down'].iloc[0]:
-        df.loc[df.index[0], 'st_trend'] = 1
-    else:
-        df.loc[df.index[0], 'st_trend'] = -1
-
-    # Trend 계산 수정 - 이전 봉의 up/down 사용
-    for i in range(1, len(df)):
-        prev_trend = df['st_trend'].iloc[i-1]
-        
-        if prev_trend == -1 and df['close'].iloc[i] > df['down'].iloc[i-1]:  # i-1로 변경
-            curr_trend = 1
-        elif prev_trend == 1 and df['close'].iloc[i] < df['up'].iloc[i-1]:   # i-1로 변경
-            curr_trend = -1
-        else:
-            curr_trend = prev_trend
-            
-        df.loc[df.index[i], 'st_trend'] = curr_trend
-    
-    # Position 시그널 계산 (기존 유지)
-    df['st_position'] = None
-    trend_change = df['st_trend'] != df['st_trend'].shift(1)
-    
-    df.loc[(trend_change) & (df['st_trend'] == 1), 'st_position'] = 'Long'
-    df.loc[(trend_change) & (df['st_trend'] == -1), 'st_position'] = 'Short'
-    
-    return df
\ No newline at end of file
+    basic_upper = src - (multiplier * atr)
+    basic_lower = src + (multiplier * atr)
+
+    # Final Bands 및 Trend 계산 (배열 위에서 한 번에 계산)
+    up, down, trend = supertrend_kernel(column(df, 'close'), basic_upper, basic_lower)
+    return basic_upper, basic_lower, up, down, trend
+
+
+def trend_change_codes(trend):
+    """추세가 바뀐 봉에서만 Signal.LONG(상승 전환)/Signal.SHORT(하락 전환), 나머지 NONE (int8)"""
+    trend = np.asarray(trend)
+    if len(trend) == 0:
+        return np.zeros(0, dtype=SIGNAL_DTYPE)
+    trend_change = np.r_[True, trend[1:] != trend[:-1]]
+    return np.where(trend_change, trend, Signal.NONE).astype(SIGNAL_DTYPE)
+
+
+def supertrend(df,STG_CONFIG):
+    basic_upper, basic_lower, up, down, trend = supertrend_bands(df, STG_CONFIG)
+    df['basic_upper'] = basic_upper
+    df['basic_lower'] = basic_lower
+    df['up'] = up
+    df['down'] = down
+    df['st_trend'] = trend
+
+    # Position 시그널 계산 (추세 전환 봉만, int8)
+    df['st_position'] = trend_change_codes(trend)
+
+    return df
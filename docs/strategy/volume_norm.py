@@ -1,12 +1,15 @@
+from docs.strategy.signal import Signal
+
+
 def check_VSTG_signal(df,STG_CONFIG):
     """시그널 체크 함수
     Returns:
-        str: 'long', 'short', 또는 None
+        Signal (LONG / SHORT / NONE)
     """
     # 마지막 두 봉 데이터만 필요
     last_two = df.tail(2)
     if len(last_two) < 2:
-        return None
+        return Signal.NONE
         
     prev_norm_trend = last_two['norm_trend'].iloc[0]
     curr_norm_trend = last_two['norm_trend'].iloc[1]
@@ -20,11 +23,11 @@ def check_VSTG_signal(df,STG_CONFIG):
     if (prev_norm_trend < prev_signal_line and 
         curr_norm_trend > curr_signal_line and 
         trend_diff >= threshold):
-        return 'Long'
+        return Signal.LONG
         
     elif (prev_norm_trend > prev_signal_line and 
           curr_norm_trend < curr_signal_line and 
           trend_diff >= threshold):
-        return 'Short'
+        return Signal.SHORT
         
-    return None
\ No newline at end of file
+    return Signal.NONE
\ No newline at end of file
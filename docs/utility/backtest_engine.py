@@ -0,0 +1,242 @@
+"""
+NumPy 백테스트 엔진 (back_test.evaluate_strategy와 같은 규칙)
+
+- 신호 봉 다음 봉 시가에 진입, TP/SL = 진입가 ± trigger_amount
+- 진입 봉부터 TP/SL 도달을 확인하고, 같은 봉에서 둘 다 닿으면 봉 방향으로 판단
+  (롱: 양봉이면 TP / 숏: 양봉이 아니면 TP)
+- 청산한 봉의 신호로는 진입하지 않고 다음 봉부터 다시 신호를 찾는다
+- 진입/청산마다 수수료 차감, 마지막 봉은 확인하지 않음
+
+봉마다 도는 대신 신호 봉 위치에서 다음 신호로, 진입 봉에서 첫 TP/SL 도달 봉으로 바로 건너뛴다.
+가격 배열은 한 번만 만들어 모든 전략 컬럼이 같이 쓴다.
+"""
+import numpy as np
+
+from docs.strategy.signal import Signal, signal_codes
+
+INITIAL_CAPITAL = 10000000  # 1천만 달러 시작
+COMMISSION_RATE = 0.00044  # 0.044%
+TRIGGER_AMOUNT = 800  # 트리거 가격차이 800달러
+POSITION_SIZE = 1
+SEARCH_CHUNK = 64  # TP/SL 탐색 첫 구간 길이 (못 찾으면 4배씩 늘림)
+REVERSE_WIN_RATE = 50  # 최근 5거래 승률이 이 값 미만이면 리버스
+
+
+def price_arrays(df):
+    """백테스트용 (open, high, low, close) float 배열"""
+    return tuple(df[column].to_numpy(dtype=float) for column in ('open', 'high', 'low', 'close'))
+
+
+def _first_exit(high, low, start, stop, tp_price, sl_price, side):
+    """[start, stop) 봉 중 TP 또는 SL에 처음 닿는 봉 (없으면 -1)"""
+    chunk = SEARCH_CHUNK
+    while start < stop:
+        end = min(start + chunk, stop)
+        if side > 0:
+            hit = (high[start:end] >= tp_price) | (low[start:end] <= sl_price)
+        else:
+            hit = (low[start:end] <= tp_price) | (high[start:end] >= sl_price)
+        index = np.flatnonzero(hit)
+        if len(index):
+            return start + int(index[0])
+        start = end
+        chunk *= 4
+    return -1
+
+
+def simulate(prices, codes, trigger_amount=TRIGGER_AMOUNT):
+    """
+    한 전략의 거래 목록
+    Returns:
+        list of (신호 봉, 진입 봉, 청산 봉(-1: 미청산), 방향(+1/-1), 진입가, 청산가, 승리 여부)
+    """
+    open_, high, low, close = prices
+    n = len(codes)
+    signal_bars = np.flatnonzero(np.asarray(codes[:max(n - 1, 0)]) != 0)
+    trades = []
+    position = 0
+
+    while True:
+        k = np.searchsorted(signal_bars, position)
+        if k >= len(signal_bars):
+            break
+        signal_bar = int(signal_bars[k])
+        side = int(codes[signal_bar])
+        entry_bar = signal_bar + 1
+        entry_price = open_[entry_bar]
+        if side > 0:
+            tp_price = entry_price + trigger_amount
+            sl_price = entry_price - trigger_amount
+        else:
+            tp_price = entry_price - trigger_amount
+            sl_price = entry_price + trigger_amount
+
+        exit_bar = _first_exit(high, low, entry_bar, n - 1, tp_price, sl_price, side)
+        if exit_bar < 0:
+            trades.append((signal_bar, entry_bar, -1, side, entry_price, None, None))
+            break
+
+        if side > 0:
+            tp_hit = high[exit_bar] >= tp_price
+            sl_hit = low[exit_bar] <= sl_price
+            up = close[exit_bar] > open_[exit_bar]
+            win = up if (tp_hit and sl_hit) else tp_hit
+        else:
+            tp_hit = low[exit_bar] <= tp_price
+            sl_hit = high[exit_bar] >= sl_price
+            up = close[exit_bar] > open_[exit_bar]
+            win = (not up) if (tp_hit and sl_hit) else tp_hit
+
+        exit_price = tp_price if win else sl_price
+        trades.append((signal_bar, entry_bar, exit_bar, side, entry_price, exit_price, bool(win)))
+        position = exit_bar + 1
+
+    return trades
+
+
+def _win_rate(winloss_list):
+    # 0이 승리, 1이 패배
+    return winloss_list.count(0) / len(winloss_list) * 100 if winloss_list else 0
+
+
+def summarize(trades, initial_capital=INITIAL_CAPITAL, commission_rate=COMMISSION_RATE, position_size=POSITION_SIZE):
+    """거래 목록 -> evaluate_strategy와 같은 순서로 자본/승패 집계 (부동소수 결과까지 동일)"""
+    capital = initial_capital
+    winloss = []
+    for _, _, exit_bar, side, entry_price, exit_price, win in trades:
+        capital -= position_size * entry_price * commission_rate
+        if exit_bar < 0:
+            continue
+        capital += (exit_price - entry_price) if side > 0 else (entry_price - exit_price)
+        capital -= position_size * exit_price * commission_rate
+        winloss.append(0 if win else 1)
+
+    wins = winloss.count(0)
+    total_trades = len(winloss)
+    return {
+        'initial_capital': initial_capital,
+        'capital': capital,
+        'total_pnl': capital - initial_capital,
+        'total_trades': total_trades,
+        'wins': wins,
+        'losses': total_trades - wins,
+        'win_rate': wins / total_trades * 100 if total_trades > 0 else 0,
+        'last_5_win_rate': _win_rate(winloss[-5:]),
+        'winloss': winloss,
+        'trades': trades,
+    }
+
+
+def trade_pnl(trade, commission_rate=COMMISSION_RATE, position_size=POSITION_SIZE):
+    """거래 하나의 손익 (summarize와 같은 수수료 규칙, 미청산이면 진입 수수료만)"""
+    _, _, exit_bar, side, entry_price, exit_price, _ = trade
+    pnl = -position_size * entry_price * commission_rate
+    if exit_bar < 0:
+        return pnl
+    pnl += (exit_price - entry_price) if side > 0 else (entry_price - exit_price)
+    return pnl - position_size * exit_price * commission_rate
+
+
+def should_reverse(result):
+    """리버스 여부 (거래가 있고 최근 5거래 승률이 REVERSE_WIN_RATE 미만)"""
+    return result['total_trades'] > 0 and result['last_5_win_rate'] < REVERSE_WIN_RATE
+
+
+def backtest_columns(df, columns, trigger_amount=TRIGGER_AMOUNT, signals=None):
+    """
+    여러 전략 신호 컬럼을 같은 가격 배열로 한 번에 평가
+    Parameters:
+        signals: 신호 컬럼을 담은 별도 프레임 (signal_matrix 결과 등, 없으면 df에서 읽음)
+    Returns:
+        dict: 컬럼 -> summarize() 결과
+    """
+    prices = price_arrays(df)
+    source = df if signals is None else signals
+    results = {}
+    for column in columns:
+        codes = signal_codes(source[column].to_numpy())
+        results[column] = summarize(simulate(prices, codes, trigger_amount))
+    return results
+
+
+def simulate_loop(df, signal_column, trigger_amount=TRIGGER_AMOUNT):
+    """기존 evaluate_strategy 봉 단위 루프 (비교/검증용)"""
+    positions = signal_codes(df[signal_column].to_numpy()).tolist()
+    current_position = None
+    capital = INITIAL_CAPITAL
+    winloss = []
+
+    for i in range(len(df) - 1):
+        if current_position is None and positions[i] != Signal.NONE:
+            current_position = positions[i]
+            entry_price = df['open'].iloc[i + 1]
+            if current_position == Signal.LONG:
+                tp_price, sl_price = entry_price + trigger_amount, entry_price - trigger_amount
+            else:
+                tp_price, sl_price = entry_price - trigger_amount, entry_price + trigger_amount
+            capital -= POSITION_SIZE * entry_price * COMMISSION_RATE
+        elif current_position:
+            high, low = df['high'].iloc[i], df['low'].iloc[i]
+            close, open_price = df['close'].iloc[i], df['open'].iloc[i]
+            if current_position == Signal.LONG and (high >= tp_price and low <= sl_price):
+                win = close > open_price
+            elif current_position == Signal.SHORT and (low <= tp_price and high >= sl_price):
+                win = not (close > open_price)
+            elif (current_position == Signal.LONG and high >= tp_price) or (current_position == Signal.SHORT and low <= tp_price):
+                win = True
+            elif (current_position == Signal.LONG and low <= sl_price) or (current_position == Signal.SHORT and high >= sl_price):
+                win = False
+            else:
+                continue
+            exit_price = tp_price if win else sl_price
+            capital += (exit_price - entry_price) if current_position == Signal.LONG else (entry_price - exit_price)
+            capital -= POSITION_SIZE * exit_price * COMMISSION_RATE
+            winloss.append(0 if win else 1)
+            current_position = None
+
+    return capital - INITIAL_CAPITAL, winloss
+
+
+if __name__ == "__main__":
+    import time
+
+    import pandas as pd
+
+    from docs.strategy.signal import to_codes
+
+    # 합성 5분봉 + 무작위 신호로 기존 루프와 결과/속도 비교
+    def make_frame(n, seed):
+        rng = np.random.default_rng(seed)
+        close = 100000 + np.cumsum(rng.standard_normal(n) * 150)
+        open_ = np.r_[close[0], close[:-1]] + rng.standard_normal(n) * 20
+        high = np.maximum(open_, close) + rng.random(n) * 400
+        low = np.minimum(open_, close) - rng.random(n) * 400
+        df = pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close},
+                          index=pd.date_range('2025-01-01', periods=n, freq='5min'))
+        for j, density in enumerate((0.02, 0.1, 0.4)):
+            draw = rng.random(n)
+            df[f'signal_{j}'] = to_codes(draw < density / 2, (draw >= density / 2) & (draw < density))
+        # 시가 = 종가 봉 (동일 봉 TP/SL 방향 판단 경계)
+        df.iloc[::7, df.columns.get_loc('close')] = df['open'].iloc[::7]
+        return df
+
+    columns = ['signal_0', 'signal_1', 'signal_2']
+    for seed in range(5):
+        df = make_frame(2100, seed)
+        results = backtest_columns(df, columns)
+        for column in columns:
+            pnl, winloss = simulate_loop(df, column)
+            assert results[column]['winloss'] == winloss, (seed, column)
+            assert results[column]['total_pnl'] == pnl, (seed, column, results[column]['total_pnl'], pnl)
+    print("5개 시드 x 3개 신호 컬럼: 승패 목록/PnL 일치")
+
+    for n in (2100, 105120):  # 7일 / 1년치 5분봉
+        df = make_frame(n, 0)
+        t0 = time.perf_counter()
+        backtest_columns(df, columns)
+        engine_time = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for column in columns:
+            simulate_loop(df, column)
+        loop_time = time.perf_counter() - t0
+        print(f"{n}개 봉 x {len(columns)}개 전략: 루프 {loop_time * 1000:.0f}ms, 엔진 {engine_time * 1000:.1f}ms")
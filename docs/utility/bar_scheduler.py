@@ -0,0 +1,165 @@
+"""
+봉 마감 스케줄러 (봉마다 정확히 한 번 실행)
+
+봉 마감 시각은 UTC epoch 기준 (5분봉 = 00:00, 00:05, ...)으로 계산하고,
+대기는 monotonic 시계 기준 데드라인까지 잠들어 벽시계 보정(NTP)으로 늦거나 일찍 깨지 않게 한다.
+처리가 길어져 다음 봉 마감을 넘기면 그 봉을 바로 처리하고, 두 봉 이상 밀리면 놓친 봉을 기록한 뒤 최신 봉으로 건너뛴다.
+
+    scheduler = BarScheduler(5, delay=5)
+    while True:
+        bar = scheduler.next_bar()
+        scheduler.sleep_until(bar)        # 봉 마감 + delay 초까지 대기
+        ...                               # 결정 로직
+        scheduler.complete(bar)           # 마감 -> 결정 지연 기록
+"""
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+
+from logger import logger
+
+LATENCY_WINDOW = 288  # 5분봉 하루치
+
+
+class Bar:
+    """처리할 봉 (close: 마감 epoch 초)"""
+
+    __slots__ = ('close', 'interval', 'missed', 'late')
+
+    def __init__(self, close, interval, missed=0, late=False):
+        self.close = close
+        self.interval = interval
+        self.missed = missed  # 이 봉 앞에서 건너뛴 봉 수
+        self.late = late  # 스케줄러가 불렸을 때 이미 마감된 봉
+
+    @property
+    def close_time(self):
+        return datetime.fromtimestamp(self.close, timezone.utc)
+
+    @property
+    def start_time(self):
+        return datetime.fromtimestamp(self.close - self.interval, timezone.utc)
+
+    def __repr__(self):
+        return f"Bar(close={self.close_time:%Y-%m-%d %H:%M}, missed={self.missed}, late={self.late})"
+
+
+class BarScheduler:
+    def __init__(self, interval_minutes, delay=0.0, clock=time.time, monotonic=time.monotonic, sleep=time.sleep):
+        self.interval = interval_minutes * 60
+        self.delay = delay
+        self._clock = clock
+        self._monotonic = monotonic
+        self._sleep = sleep
+        self.last_close = None  # 마지막으로 처리 완료한 봉의 마감 시각
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.stats = {'processed': 0, 'missed': 0, 'duplicates': 0, 'late': 0}
+
+    def latest_closed(self, now=None):
+        """now 시점에 마지막으로 마감된 봉의 마감 시각"""
+        now = self._clock() if now is None else now
+        return int(now // self.interval * self.interval)
+
+    def next_bar(self):
+        """다음에 처리할 봉 (처음에는 다음 마감 봉)"""
+        latest = self.latest_closed()
+        if self.last_close is None:
+            return Bar(latest + self.interval, self.interval)
+
+        expected = self.last_close + self.interval
+        if expected > latest:
+            return Bar(expected, self.interval)
+        if expected == latest:
+            return Bar(expected, self.interval, late=True)
+
+        missed = (latest - expected) // self.interval
+        logger.warning(f"봉 {missed}개 놓침: {Bar(expected, self.interval).close_time} ~ "
+                       f"{Bar(latest - self.interval, self.interval).close_time}, 최신 봉으로 건너뜀")
+        return Bar(latest, self.interval, missed=missed, late=True)
+
+    def seconds_until(self, bar, delay=None):
+        """bar 마감 + delay 까지 남은 시간(초)"""
+        delay = self.delay if delay is None else delay
+        return bar.close + delay - self._clock()
+
+    def sleep_until(self, bar, delay=None):
+        """
+        bar 마감 + delay 까지 대기
+        남은 시간을 한 번만 벽시계로 계산하고 이후는 monotonic 데드라인으로 잠든다.
+        """
+        deadline = self._monotonic() + self.seconds_until(bar, delay)
+        while True:
+            remaining = deadline - self._monotonic()
+            if remaining <= 0:
+                return
+            self._sleep(min(remaining, 1.0))
+
+    def complete(self, bar):
+        """
+        bar 처리 완료 기록
+        Returns:
+            bool: 처음 처리한 봉이면 True, 이미 처리한 봉(중복)이면 False
+        """
+        if self.last_close is not None and bar.close <= self.last_close:
+            self.stats['duplicates'] += 1
+            logger.warning(f"이미 처리한 봉 중복 처리: {bar.close_time}")
+            return False
+
+        latency = self._clock() - bar.close
+        self.latencies.append(latency)
+        self.last_close = bar.close
+        self.stats['processed'] += 1
+        self.stats['missed'] += bar.missed
+        self.stats['late'] += bar.late
+        logger.info(f"봉 {bar.close_time:%H:%M} 처리 완료, 마감 후 {latency * 1000:.0f}ms")
+        return True
+
+    def latency_summary(self):
+        """최근 봉들의 마감 -> 결정 지연(ms) 요약"""
+        if not self.latencies:
+            return {}
+        values = np.asarray(self.latencies) * 1000
+        return {
+            'count': len(values),
+            'mean_ms': float(values.mean()),
+            'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95)),
+            'max_ms': float(values.max()),
+        }
+
+
+if __name__ == "__main__":
+    # 가짜 시계로 동작 확인: 정상 / 한 봉 지연 / 여러 봉 밀림 / 중복
+    class FakeClock:
+        def __init__(self, now):
+            self.now = now
+
+        def time(self):
+            return self.now
+
+        def sleep(self, seconds):
+            self.now += seconds
+
+    clock = FakeClock(1_735_689_600 + 130.5)
+    scheduler = BarScheduler(5, delay=0.2, clock=clock.time, monotonic=clock.time, sleep=clock.sleep)
+
+    bar = scheduler.next_bar()
+    scheduler.sleep_until(bar)
+    assert abs(clock.now - (bar.close + 0.2)) < 1e-9 and not bar.late
+    clock.now += 0.3
+    assert scheduler.complete(bar)
+
+    clock.now = bar.close + 300 + 12  # 처리 지연으로 다음 마감 이후 호출
+    late_bar = scheduler.next_bar()
+    assert late_bar.close == bar.close + 300 and late_bar.late and late_bar.missed == 0
+    scheduler.complete(late_bar)
+    assert not scheduler.complete(late_bar)
+
+    clock.now = late_bar.close + 3 * 300 + 1  # 세 봉 밀림
+    skipped = scheduler.next_bar()
+    assert skipped.missed == 2 and skipped.close == late_bar.close + 900
+    scheduler.complete(skipped)
+
+    print(scheduler.stats, {k: round(v, 1) for k, v in scheduler.latency_summary().items()})
@@ -0,0 +1,65 @@
+"""
+전략별 시그널 계산 시간 측정 (합성 5분봉 데이터 사용)
+
+python -m docs.utility.bench_strategies
+"""
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from docs.cal_chart import process_chart_data
+from docs.strategy.supertrend import supertrend
+from docs.strategy.line_reg import check_line_reg_signal
+from docs.strategy.line_reg import last_signal as line_reg_last_signal
+from docs.strategy.macd_size_di import generate_macd_size_signal
+from docs.strategy.macd_size_di import last_signal as macd_size_last_signal
+from docs.strategy.macd_divergence import generate_macd_dive_signal
+from docs.strategy.macd_divergence import last_signal as macd_dive_last_signal
+
+
+STRATEGIES = (
+    ('supertrend', supertrend),
+    ('line_reg', check_line_reg_signal),
+    ('macd_size', generate_macd_size_signal),
+    ('macd_dive', generate_macd_dive_signal),
+    ('line_reg.last_signal', line_reg_last_signal),
+    ('macd_size.last_signal', macd_size_last_signal),
+    ('macd_dive.last_signal', macd_dive_last_signal),
+)
+
+
+def make_ohlcv(n, seed=0):
+    """랜덤워크 기반 합성 OHLCV"""
+    rng = np.random.default_rng(seed)
+    close = 100000 + np.cumsum(rng.standard_normal(n) * 80)
+    open_ = np.r_[close[0], close[:-1]] + rng.standard_normal(n) * 5
+    high = np.maximum(open_, close) + np.abs(rng.standard_normal(n)) * 60
+    low = np.minimum(open_, close) - np.abs(rng.standard_normal(n)) * 60
+    volume = np.abs(rng.standard_normal(n)) * 100 + 1
+    index = pd.date_range('2025-01-01', periods=n, freq='5min', name='timestamp')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}, index=index)
+
+
+def bench(n, repeat=20):
+    df, stg_config = process_chart_data(make_ohlcv(n))
+    results = {}
+    for name, func in STRATEGIES:
+        times = []
+        for _ in range(repeat):
+            # supertrend는 입력 df에 직접 기록하므로 매번 복사본 사용
+            source = df.copy()
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                func(source, stg_config)
+                times.append(time.perf_counter() - start)
+        results[name] = min(times)
+    return results
+
+
+if __name__ == "__main__":
+    for n in (300, 2100):
+        for name, seconds in bench(n).items():
+            print(f"{n}봉 {name}: {seconds * 1000:.3f}ms")
@@ -0,0 +1,228 @@
+"""
+로컬 OHLCV 캐시 (Arrow IPC, 심볼/타임프레임/일 단위 파일)
+
+    {CANDLE_CACHE_DIR}/{symbol}/{timeframe}/YYYY-MM-DD.arrow
+
+chart_update 수집 경로에서 캔들을 일 단위 파일에 이어 쓰고(같은 timestamp는 새 값으로 교체),
+백테스트에서는 필요한 날짜 파일만 메모리 맵으로 열어 NumPy 기반 DataFrame으로 만든다.
+압축 없이 저장해야 메모리 맵 읽기가 복사 없이 동작한다.
+일 단위 파일의 읽기-병합-쓰기는 파일별 잠금(스레드 Lock + fcntl.flock) 안에서 한다
+(kline 스트림 저장 스레드, REST 수집, back_test 프로세스의 sync가 같은 날 파일을 동시에 갱신할 수 있음).
+"""
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 스레드 잠금만 사용
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+CACHE_DIR = os.getenv(
+    "CANDLE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data', 'candles')
+)
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+EPOCH = datetime(1970, 1, 1)
+DAY_MS = 24 * 60 * 60 * 1000
+SCHEMA = pa.schema([('timestamp', pa.timestamp('ms'))] + [(name, pa.float64()) for name in PRICE_COLUMNS])
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def day_path(symbol, timeframe, day, cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, symbol, timeframe, f"{day:%Y-%m-%d}.arrow")
+
+
+def _read_table(path):
+    """메모리 맵으로 Arrow IPC 파일 읽기 (버퍼는 맵을 그대로 참조)"""
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+
+@contextmanager
+def _file_lock(path):
+    """일 단위 파일 잠금 (같은 프로세스의 스레드끼리는 Lock, 프로세스끼리는 {path}.lock의 flock)"""
+    with _thread_locks_guard:
+        lock = _thread_locks.setdefault(path, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _write_table(path, table):
+    """고유한 임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix=f"{os.path.basename(path)}.",
+                                     suffix='.tmp', delete=False) as tmp:
+        tmp_path = tmp.name
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, SCHEMA) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _merge_day(path, timestamps, columns):
+    """기존 일 단위 파일과 병합해 다시 쓰기 (_file_lock 안에서 호출)"""
+    if os.path.exists(path):
+        existing = _read_table(path)
+        timestamps = np.concatenate([existing.column('timestamp').cast(pa.int64()).to_numpy(), timestamps])
+        columns = [np.concatenate([existing.column(name).to_numpy(), values])
+                   for name, values in zip(PRICE_COLUMNS, columns)]
+
+    # 같은 timestamp는 나중 값(새 데이터) 우선, 시간순 정렬
+    _, last_index = np.unique(timestamps[::-1], return_index=True)
+    keep = len(timestamps) - 1 - last_index
+
+    table = pa.Table.from_arrays(
+        [pa.array(timestamps[keep], type=pa.int64()).cast(pa.timestamp('ms'))]
+        + [pa.array(values[keep], type=pa.float64()) for values in columns],
+        schema=SCHEMA
+    )
+    _write_table(path, table)
+
+
+def append_candles(symbol, timeframe, ohlcv, cache_dir=None):
+    """
+    ccxt OHLCV 리스트를 일 단위 파일에 병합 저장
+    Returns:
+        int: 갱신한 파일 수
+    """
+    if not ohlcv:
+        return 0
+
+    by_day = {}
+    for candle in ohlcv:
+        by_day.setdefault(int(candle[0]) // DAY_MS, []).append(candle)
+
+    for day_number, candles in by_day.items():
+        path = day_path(symbol, timeframe, EPOCH + timedelta(days=day_number), cache_dir)
+        new_values = np.array([candle[:6] for candle in candles], dtype=float)
+        timestamps = new_values[:, 0].astype(np.int64)
+        columns = [new_values[:, i + 1] for i in range(len(PRICE_COLUMNS))]
+        with _file_lock(path):
+            _merge_day(path, timestamps, columns)
+
+    return len(by_day)
+
+
+def _day_files(symbol, timeframe, start=None, end=None, cache_dir=None):
+    directory = os.path.join(cache_dir or CACHE_DIR, symbol, timeframe)
+    if not os.path.isdir(directory):
+        return []
+    files = sorted(name for name in os.listdir(directory) if name.endswith('.arrow'))
+    # 파일명(YYYY-MM-DD)은 사전순 = 시간순
+    if start is not None:
+        files = [name for name in files if name[:10] >= f"{start:%Y-%m-%d}"]
+    if end is not None:
+        files = [name for name in files if name[:10] <= f"{end:%Y-%m-%d}"]
+    return [os.path.join(directory, name) for name in files]
+
+
+def load_candles(symbol, timeframe, start=None, end=None, cache_dir=None):
+    """
+    캐시에서 [start, end) 구간 캔들을 DataFrame(timestamp 인덱스)으로 로드
+    Returns:
+        DataFrame 또는 캐시가 없으면 None
+    """
+    paths = _day_files(symbol, timeframe, start, end, cache_dir)
+    if not paths:
+        return None
+
+    table = pa.concat_tables([_read_table(path) for path in paths]).combine_chunks()
+    timestamps = table.column('timestamp').to_numpy()
+    mask = np.ones(len(timestamps), dtype=bool)
+    if start is not None:
+        mask &= timestamps >= np.datetime64(start, 'ms')
+    if end is not None:
+        mask &= timestamps < np.datetime64(end, 'ms')
+
+    index = pd.DatetimeIndex(timestamps[mask].astype('datetime64[ns]'), name='timestamp')
+    columns = {name: table.column(name).to_numpy()[mask] for name in PRICE_COLUMNS}
+    if len(index) == 0:
+        return None
+    return pd.DataFrame(columns, index=index)
+
+
+def last_cached_time(symbol, timeframe, cache_dir=None):
+    """캐시에 저장된 마지막 캔들 시간 (없으면 None)"""
+    paths = _day_files(symbol, timeframe, cache_dir=cache_dir)
+    if not paths:
+        return None
+    timestamps = _read_table(paths[-1]).column('timestamp')
+    if len(timestamps) == 0:
+        return None
+    return timestamps[-1].as_py()
+
+
+def sync_from_collection(symbol, timeframe, collection, cache_dir=None):
+    """
+    Mongo 차트 컬렉션에서 캐시 이후 캔들만 가져와 캐시에 추가
+    (다른 프로세스가 수집한 데이터를 캐시에 반영할 때 사용)
+    Returns:
+        int: 추가한 캔들 수
+    """
+    last_time = last_cached_time(symbol, timeframe, cache_dir)
+    # 마지막 캔들은 미완성이었을 수 있으므로 다시 가져와 덮어쓴다
+    query = {} if last_time is None else {"timestamp": {"$gte": last_time}}
+    documents = collection.find(query, {'_id': 0}).sort("timestamp", 1)
+
+    ohlcv = [[(doc['timestamp'].replace(tzinfo=None) - EPOCH) // timedelta(milliseconds=1)]
+             + [doc[name] for name in PRICE_COLUMNS] for doc in documents]
+    append_candles(symbol, timeframe, ohlcv, cache_dir)
+    return len(ohlcv)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    # 1분봉 90일치 합성 데이터로 캐시 로드 시간 측정 (dict 리스트 -> DataFrame 변환과 비교)
+    n = 90 * 24 * 60
+    rng = np.random.default_rng(0)
+    close = 100000 + np.cumsum(rng.standard_normal(n) * 20)
+    start_ms = int((datetime(2025, 1, 1) - EPOCH).total_seconds() * 1000)
+    ohlcv = [[start_ms + i * 60000, c, c + 10, c - 10, c, 1.0] for i, c in enumerate(close.tolist())]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        t0 = time.perf_counter()
+        files = append_candles('BTCUSDT', '1m', ohlcv, cache_dir)
+        write_time = time.perf_counter() - t0
+
+        # 증분 추가 (마지막 캔들 갱신 + 새 캔들)
+        append_candles('BTCUSDT', '1m', [ohlcv[-1][:5] + [2.0], [ohlcv[-1][0] + 60000] + ohlcv[-1][1:]], cache_dir)
+
+        load_times = []
+        for _ in range(5):
+            t0 = time.perf_counter()
+            df = load_candles('BTCUSDT', '1m', cache_dir=cache_dir)
+            load_times.append(time.perf_counter() - t0)
+
+        documents = [{'timestamp': datetime.utcfromtimestamp(row[0] / 1000), 'open': row[1], 'high': row[2],
+                      'low': row[3], 'close': row[4], 'volume': row[5]} for row in ohlcv]
+        t0 = time.perf_counter()
+        df_dicts = pd.DataFrame(documents).set_index('timestamp')
+        dict_time = time.perf_counter() - t0
+
+        assert len(df) == n + 1 and df['volume'].iloc[-2] == 2.0
+        assert np.array_equal(df['close'].to_numpy()[:n], df_dicts['close'].to_numpy())
+        print(f"{n}개 1분봉, {files}개 파일 쓰기 {write_time * 1000:.0f}ms")
+        print(f"로드: 캐시 {min(load_times) * 1000:.1f}ms, dict 리스트 -> DataFrame {dict_time * 1000:.1f}ms")
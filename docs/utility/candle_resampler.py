@@ -0,0 +1,129 @@
+"""
+1분봉으로 상위 타임프레임(3m/5m/15m) 캔들 만들기
+
+거래소와 같이 UTC epoch 기준으로 버킷을 나눈다 (예: 5분봉 = 00:00, 00:05, ...).
+open=첫 1분봉 시가, high=최고가, low=최저가, close=마지막 1분봉 종가, volume=합계
+캔들은 ccxt와 같은 [timestamp(ms), open, high, low, close, volume] 리스트로 다룬다.
+"""
+import numpy as np
+import pandas as pd
+
+TIMEFRAME_MINUTES = {'1m': 1, '3m': 3, '5m': 5, '15m': 15}
+MINUTE_MS = 60 * 1000
+
+
+def bucket_start(timestamp_ms, minutes):
+    """timestamp가 속한 버킷의 시작 시간(ms)"""
+    interval_ms = minutes * MINUTE_MS
+    return timestamp_ms // interval_ms * interval_ms
+
+
+def resample_ohlcv(ohlcv, minutes, include_partial=False):
+    """
+    1분봉 리스트를 minutes 분봉으로 집계
+    1분봉이 모두 있는 버킷만 만들고, include_partial=True 이면 마지막(진행 중) 버킷도 포함한다.
+    중간에 1분봉이 빠진 버킷은 잘못된 값이 되므로 항상 제외한다.
+    """
+    if len(ohlcv) == 0:
+        return []
+
+    values = np.asarray([candle[:6] for candle in ohlcv], dtype=float)
+    timestamps = values[:, 0].astype(np.int64)
+    # 시간순 정렬 + 같은 timestamp는 마지막 값 사용
+    _, last_index = np.unique(timestamps[::-1], return_index=True)
+    keep = len(timestamps) - 1 - last_index
+    values = values[keep]
+    timestamps = timestamps[keep]
+
+    buckets = bucket_start(timestamps, minutes)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+    counts = ends - starts + 1
+
+    result = np.column_stack([
+        buckets[starts].astype(float),
+        values[starts, 1],
+        np.maximum.reduceat(values[:, 2], starts),
+        np.minimum.reduceat(values[:, 3], starts),
+        values[ends, 4],
+        np.add.reduceat(values[:, 5], starts),
+    ])
+
+    complete = counts == minutes
+    if include_partial:
+        complete[-1] = True
+    result = result[complete]
+    return [[int(row[0])] + row[1:].tolist() for row in result]
+
+
+def resample_frame(df, minutes, include_partial=False):
+    """1분봉 DataFrame(timestamp 인덱스, naive UTC)을 minutes 분봉 DataFrame으로 집계"""
+    timestamps = df.index.values.astype('datetime64[ms]').astype(np.int64)
+    ohlcv = np.column_stack([timestamps] + [df[c].to_numpy(dtype=float) for c in ('open', 'high', 'low', 'close', 'volume')])
+    candles = resample_ohlcv(ohlcv, minutes, include_partial)
+    if not candles:
+        return df.iloc[0:0]
+    values = np.asarray(candles, dtype=float)
+    index = pd.DatetimeIndex(values[:, 0].astype('datetime64[ms]'), name='timestamp')
+    return pd.DataFrame(values[:, 1:], index=index, columns=['open', 'high', 'low', 'close', 'volume'])
+
+
+def compare_candles(expected, actual, rel_tol=1e-9, volume_rel_tol=1e-6):
+    """
+    거래소 캔들(expected)과 집계 캔들(actual)을 timestamp 기준으로 비교 (검증 모드)
+    Returns:
+        dict: compared, mismatched, missing, 필드별 최대 상대 오차, 불일치 timestamp 목록
+    """
+    actual_map = {int(candle[0]): candle for candle in actual}
+    fields = ('open', 'high', 'low', 'close', 'volume')
+    max_error = dict.fromkeys(fields, 0.0)
+    mismatched = []
+    missing = 0
+    compared = 0
+
+    for candle in expected:
+        other = actual_map.get(int(candle[0]))
+        if other is None:
+            missing += 1
+            continue
+        compared += 1
+        bad = False
+        for i, field in enumerate(fields, start=1):
+            scale = max(abs(candle[i]), 1e-12)
+            error = abs(candle[i] - other[i]) / scale
+            max_error[field] = max(max_error[field], error)
+            if error > (volume_rel_tol if field == 'volume' else rel_tol):
+                bad = True
+        if bad:
+            mismatched.append(int(candle[0]))
+
+    return {
+        'compared': compared,
+        'mismatched': len(mismatched),
+        'missing': missing,
+        'max_rel_error': max_error,
+        'mismatched_timestamps': mismatched,
+    }
+
+
+if __name__ == "__main__":
+    # pandas resample과 비교 (1분봉 3일치, 중간 누락 포함)
+    rng = np.random.default_rng(0)
+    n = 3 * 24 * 60
+    start_ms = 1_735_689_600_000 + 2 * MINUTE_MS  # 버킷 중간에서 시작
+    close = 100000 + np.cumsum(rng.standard_normal(n) * 20)
+    ohlcv = [[start_ms + i * MINUTE_MS, c - 3, c + 10, c - 10, c, float(v)]
+             for i, (c, v) in enumerate(zip(close.tolist(), rng.random(n) * 5))]
+    del ohlcv[1000]
+
+    frame = pd.DataFrame([row[1:] for row in ohlcv], columns=['open', 'high', 'low', 'close', 'volume'],
+                         index=pd.DatetimeIndex(np.array([row[0] for row in ohlcv], dtype='datetime64[ms]'), name='timestamp'))
+    for timeframe, minutes in TIMEFRAME_MINUTES.items():
+        if minutes == 1:
+            continue
+        grouped = frame.resample(f'{minutes}min')
+        expected = grouped.agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+        expected = expected[grouped.size() == minutes]
+        result = resample_frame(frame, minutes)
+        pd.testing.assert_frame_equal(result, expected, check_freq=False, check_index_type=False)
+        print(f"{timeframe}: {len(result)}개 봉 일치")
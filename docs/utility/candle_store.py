@@ -0,0 +1,157 @@
+"""
+차트 캔들 저장소
+
+- 실시간용 capped 컬렉션(chart_1m/3m/5m/15m)에 timestamp 유니크 인덱스 보장
+- 캔들 upsert (bulk_write)
+- 장기 보관용 월별 파티션 컬렉션 (chart_{timeframe}_archive_YYYYMM)
+
+capped 컬렉션은 최대 2,100개(약 7일)만 유지하므로 백테스트용 과거 데이터는
+같은 수집 경로에서 아카이브에도 함께 기록하고 기간 조회로 꺼내 쓴다.
+"""
+import time
+from datetime import datetime
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import OperationFailure
+
+from docs.utility.mongo_client import get_database
+from docs.utility.load_data import documents_to_frame
+
+# bulk_write 한 번에 보낼 upsert 개수
+BULK_CHUNK_SIZE = 500
+
+ARCHIVE_PREFIX = 'chart_{timeframe}_archive_'
+
+_indexed_collections = set()
+
+
+def candle_to_document(candle):
+    """ccxt OHLCV 리스트를 차트 문서로 변환"""
+    return {
+        "timestamp": datetime.utcfromtimestamp(candle[0] / 1000),
+        "open": candle[1],
+        "high": candle[2],
+        "low": candle[3],
+        "close": candle[4],
+        "volume": candle[5]
+    }
+
+
+def ensure_timestamp_index(collection):
+    """
+    timestamp 유니크 인덱스 생성 (프로세스당 컬렉션별 한 번만 요청)
+    기존 중복 데이터로 생성에 실패하면 False
+    """
+    key = collection.full_name
+    if key in _indexed_collections:
+        return True
+    try:
+        collection.create_index([("timestamp", ASCENDING)], unique=True, name="timestamp_unique")
+    except OperationFailure as e:
+        print(f"{collection.name} timestamp 유니크 인덱스 생성 실패 (중복 데이터 확인 필요): {e}")
+        return False
+    _indexed_collections.add(key)
+    return True
+
+
+def upsert_candles(collection, ohlcv, chunk_size=BULK_CHUNK_SIZE):
+    """
+    캔들을 timestamp 기준 UpdateOne upsert로 묶어 bulk_write (ordered=False)
+    Returns:
+        dict: inserted/matched/modified/upserted 건수, 요청 수, 소요 시간(초)
+    """
+    start_time = time.time()
+    result = {'candles': len(ohlcv), 'requests': 0, 'inserted': 0, 'matched': 0, 'modified': 0, 'upserted': 0}
+
+    for offset in range(0, len(ohlcv), chunk_size):
+        operations = []
+        for candle in ohlcv[offset:offset + chunk_size]:
+            data_dict = candle_to_document(candle)
+            operations.append(UpdateOne({"timestamp": data_dict["timestamp"]}, {"$set": data_dict}, upsert=True))
+
+        bulk_result = collection.bulk_write(operations, ordered=False)
+        result['requests'] += 1
+        result['inserted'] += bulk_result.inserted_count
+        result['matched'] += bulk_result.matched_count
+        result['modified'] += bulk_result.modified_count
+        result['upserted'] += bulk_result.upserted_count
+
+    result['elapsed'] = time.time() - start_time
+    return result
+
+
+def archive_collection_name(timeframe, when):
+    return ARCHIVE_PREFIX.format(timeframe=timeframe) + when.strftime('%Y%m')
+
+
+def archive_collection(timeframe, when, database=None):
+    """해당 월의 아카이브 컬렉션 (유니크 인덱스 보장)"""
+    database = database if database is not None else get_database()
+    collection = database[archive_collection_name(timeframe, when)]
+    ensure_timestamp_index(collection)
+    return collection
+
+
+def archive_candles(timeframe, ohlcv, database=None):
+    """
+    캔들을 월별 아카이브 컬렉션에 upsert
+    Returns:
+        dict: 월(YYYYMM)별 upsert_candles 결과
+    """
+    by_month = {}
+    for candle in ohlcv:
+        month = datetime.utcfromtimestamp(candle[0] / 1000).strftime('%Y%m')
+        by_month.setdefault(month, []).append(candle)
+
+    results = {}
+    for month, candles in by_month.items():
+        collection = archive_collection(timeframe, datetime.strptime(month, '%Y%m'), database)
+        results[month] = upsert_candles(collection, candles)
+    return results
+
+
+def _month_starts(start, end):
+    """[start, end) 구간에 걸친 각 월의 1일"""
+    current = datetime(start.year, start.month, 1)
+    while current < end:
+        yield current
+        current = datetime(current.year + current.month // 12, current.month % 12 + 1, 1)
+
+
+def load_archive_range(timeframe, start, end, database=None):
+    """
+    아카이브에서 [start, end) 구간 캔들 조회 (월별 파티션을 시간순으로 이어 붙임)
+    Returns:
+        DataFrame (timestamp 인덱스) 또는 데이터가 없으면 None
+    """
+    database = database if database is not None else get_database()
+    existing = set(database.list_collection_names())
+
+    documents = []
+    for month in _month_starts(start, end):
+        name = archive_collection_name(timeframe, month)
+        if name not in existing:
+            continue
+        cursor = database[name].find(
+            {"timestamp": {"$gte": start, "$lt": end}}, {'_id': 0}
+        ).sort("timestamp", 1)
+        documents.extend(cursor)
+
+    if not documents:
+        return None
+    return documents_to_frame(documents)
+
+
+if __name__ == "__main__":
+    from datetime import timedelta
+
+    # 최근 90일 5분봉 아카이브 조회
+    end = datetime.utcnow()
+    start = end - timedelta(days=90)
+    t0 = time.perf_counter()
+    df = load_archive_range('5m', start, end)
+    elapsed = (time.perf_counter() - t0) * 1000
+    if df is None:
+        print("아카이브 데이터 없음")
+    else:
+        print(f"{len(df)}개 봉 ({df.index[0]} ~ {df.index[-1]}), {elapsed:.1f}ms")
@@ -1,10 +1,11 @@
-import requests
 import hmac
 import hashlib
 import time
 import json
 from dotenv import load_dotenv
 import os
+from docs.utility.exchange_clock import clock
+from docs.exchange_gateway import session, REQUEST_TIMEOUT
 
 # 환경 변수 로드
 load_dotenv()
@@ -21,7 +22,7 @@ def get_win_rate(api_key, api_secret, start_time=None, end_time=None, limit=100)
     url = "https://api.bybit.com/v5/position/closed-pnl"
     
     # 타임스탬프
-    timestamp = int(time.time() * 1000)
+    timestamp = clock.now_ms()
     
     # 파라미터 설정
     params = {
@@ -44,7 +45,7 @@ def get_win_rate(api_key, api_secret, start_time=None, end_time=None, limit=100)
     params['sign'] = signature
     
     # API 요청
-    response = requests.get(url, params=params)
+    response = session.get(url, params=params, timeout=REQUEST_TIMEOUT)
     data = response.json()
     
     if data['retCode'] != 0:
@@ -70,7 +71,7 @@ def get_7win_rate(api_key, api_secret, start_time=None, end_time=None, limit=100
     url = "https://api.bybit.com/v5/position/closed-pnl"
     
     # 타임스탬프
-    timestamp = int(time.time() * 1000)
+    timestamp = clock.now_ms()
     
     # 파라미터 설정
     params = {
@@ -93,7 +94,7 @@ def get_7win_rate(api_key, api_secret, start_time=None, end_time=None, limit=100
     params['sign'] = signature
     
     # API 요청
-    response = requests.get(url, params=params)
+    response = session.get(url, params=params, timeout=REQUEST_TIMEOUT)
     data = response.json()
     
     if data['retCode'] != 0:
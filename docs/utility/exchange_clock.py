@@ -0,0 +1,169 @@
+"""
+Bybit 서버 시계 오프셋 (서명 timestamp 보정용)
+
+요청마다 fetch_time을 부르지 않고, 주기적으로 여러 번 측정해 왕복 시간(RTT)이 가장 짧은 표본으로
+offset = 서버 시간 - (요청 시각 + 응답 시각) / 2 를 추정해 캐시한다.
+오프셋 불확실성(RTT/2 + 경과 시간 x 드리프트)이 한도를 넘거나 갱신 주기가 지나면 다시 측정한다.
+
+    from docs.utility.exchange_clock import clock
+    timestamp = clock.timestamp()      # X-BAPI-TIMESTAMP 값
+    clock.apply(bybit)                 # ccxt 객체의 timeDifference 설정
+"""
+import threading
+import time
+
+import requests
+
+from logger import logger
+
+BYBIT_TIME_URL = "https://api.bybit.com/v5/market/time"
+CLOCK_REFRESH_SECONDS = 300  # 오프셋 재측정 주기
+CLOCK_SAMPLES = 5  # 측정 1회당 표본 수 (최소 RTT 표본 사용)
+DRIFT_PPM = 100  # 측정 사이 로컬 시계 드리프트 상한 (100ppm = 초당 0.1ms)
+MAX_UNCERTAINTY_MS = 1000  # 이보다 불확실하면 사용 전에 재측정 (recv_window 5000ms 기준)
+MAX_OFFSET_JUMP_MS = 500  # 측정 간 오프셋 변화가 이보다 크면 경고 (로컬 시계 조정 등)
+
+
+def fetch_bybit_time_ms(session=None, timeout=5):
+    """Bybit 서버 시간(ms, 소수점 포함)"""
+    response = (session or requests).get(BYBIT_TIME_URL, timeout=timeout)
+    response.raise_for_status()
+    result = response.json()['result']
+    return int(result['timeNano']) / 1e6
+
+
+class ExchangeClock:
+    def __init__(self, fetch_server_ms=None, refresh_seconds=CLOCK_REFRESH_SECONDS, samples=CLOCK_SAMPLES,
+                 local_ms=None, monotonic=time.monotonic):
+        self._session = requests.Session()
+        self._fetch = fetch_server_ms or (lambda: fetch_bybit_time_ms(self._session))
+        self._local_ms = local_ms or (lambda: time.time() * 1000)
+        self._monotonic = monotonic
+        self.refresh_seconds = refresh_seconds
+        self.samples = samples
+
+        self.offset = None  # 서버 - 로컬 (ms)
+        self.rtt = None  # 채택한 표본의 RTT (ms)
+        self.drift_rate = 0.0  # 측정 간 오프셋 변화율 (ms/s)
+        self.measured_at = None  # monotonic 초
+        self.measurements = 0
+        self._lock = threading.Lock()
+        self._refresher = None
+
+    def measure(self):
+        """
+        표본 여러 개 중 RTT가 가장 짧은 표본으로 오프셋 갱신
+        Returns:
+            float: 오프셋(ms), 모든 표본 실패 시 None (기존 값 유지)
+        """
+        best = None
+        for _ in range(self.samples):
+            try:
+                t0 = self._local_ms()
+                server_ms = self._fetch()
+                t1 = self._local_ms()
+            except Exception as e:
+                logger.warning(f"서버 시간 측정 실패: {e}")
+                continue
+            rtt = t1 - t0
+            if best is None or rtt < best[0]:
+                best = (rtt, server_ms - (t0 + t1) / 2)
+
+        if best is None:
+            return None
+
+        rtt, offset = best
+        now = self._monotonic()
+        with self._lock:
+            if self.offset is not None:
+                jump = offset - self.offset
+                elapsed = now - self.measured_at
+                if abs(jump) > MAX_OFFSET_JUMP_MS:
+                    logger.warning(f"서버 시계 오프셋 급변: {self.offset:.1f}ms -> {offset:.1f}ms")
+                elif elapsed > 0:
+                    self.drift_rate = jump / elapsed
+            self.offset = offset
+            self.rtt = rtt
+            self.measured_at = now
+            self.measurements += 1
+        logger.debug(f"서버 시계 오프셋 {offset:.1f}ms (RTT {rtt:.1f}ms)")
+        return offset
+
+    def uncertainty_ms(self):
+        """현재 오프셋 추정의 오차 상한 (측정 전이면 inf)"""
+        if self.offset is None:
+            return float('inf')
+        age = self._monotonic() - self.measured_at
+        return self.rtt / 2 + (abs(self.drift_rate) + DRIFT_PPM / 1000) * age
+
+    def offset_ms(self):
+        """캐시된 오프셋 (오래됐거나 불확실하면 먼저 재측정, 측정 실패 시 0)"""
+        if (self.offset is None
+                or self._monotonic() - self.measured_at >= self.refresh_seconds
+                or self.uncertainty_ms() > MAX_UNCERTAINTY_MS):
+            self.measure()
+        if self.offset is None:
+            return 0.0
+        # 측정 후 경과 시간만큼 추정 드리프트 반영
+        return self.offset + self.drift_rate * (self._monotonic() - self.measured_at)
+
+    def now_ms(self):
+        """보정된 서버 시간 (ms)"""
+        return int(self._local_ms() + self.offset_ms())
+
+    def timestamp(self):
+        """서명용 timestamp 문자열"""
+        return str(self.now_ms())
+
+    def apply(self, exchange):
+        """ccxt 객체에 오프셋 적용 (ccxt nonce = 로컬 시간 - timeDifference)"""
+        exchange.options['timeDifference'] = int(round(-self.offset_ms()))
+        return exchange
+
+    def start(self):
+        """백그라운드에서 주기적으로 재측정 (요청 경로에서 측정하지 않도록)"""
+        if self._refresher is not None:
+            return self
+
+        def refresh_loop():
+            while True:
+                self.measure()
+                time.sleep(self.refresh_seconds)
+
+        self._refresher = threading.Thread(target=refresh_loop, name='exchange-clock', daemon=True)
+        self._refresher.start()
+        return self
+
+
+# 프로세스 공용 시계
+clock = ExchangeClock()
+
+
+if __name__ == "__main__":
+    # 가짜 서버(오프셋 +250ms, 비대칭 지연)로 추정 오차 확인
+    import random
+
+    true_offset = 250.0
+    state = {'local': 1_735_689_600_000.0}
+
+    def local_ms():
+        return state['local']
+
+    def fake_server():
+        up, down = random.uniform(5, 80), random.uniform(5, 80)
+        state['local'] += up
+        server = state['local'] + true_offset
+        state['local'] += down
+        return server
+
+    random.seed(0)
+    fake = ExchangeClock(fetch_server_ms=fake_server, local_ms=local_ms, monotonic=lambda: state['local'] / 1000)
+    fake.measure()
+    print(f"추정 오프셋 {fake.offset:.1f}ms (실제 {true_offset}ms), RTT {fake.rtt:.1f}ms, "
+          f"불확실성 {fake.uncertainty_ms():.1f}ms")
+    assert abs(fake.offset - true_offset) <= fake.rtt / 2
+
+    calls = fake.measurements
+    for _ in range(100):
+        fake.timestamp()
+    assert fake.measurements == calls  # 캐시된 오프셋 사용
@@ -0,0 +1,117 @@
+"""
+저장된 캔들 timestamp의 누락 구간 탐지와 최소 백필 요청 계획
+
+시간은 모두 UTC epoch 밀리초(ccxt와 동일)로 다룬다.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1)
+
+# Bybit kline 한 번 요청의 최대 캔들 수
+FETCH_PAGE_LIMIT = 1000
+
+
+def to_ms(dt):
+    """naive UTC datetime -> epoch ms"""
+    return int((dt.replace(tzinfo=None) - EPOCH).total_seconds() * 1000)
+
+
+def find_gaps(timestamps, interval_ms, start_ms, end_ms):
+    """
+    [start_ms, end_ms] 구간에서 빠진 봉의 연속 구간
+    Returns:
+        list of (첫 누락 봉 ms, 마지막 누락 봉 ms)
+    """
+    if end_ms < start_ms:
+        return []
+    expected = np.arange(start_ms, end_ms + 1, interval_ms, dtype=np.int64)
+    present = np.asarray(timestamps, dtype=np.int64)
+    missing = expected[~np.isin(expected, present)]
+    if len(missing) == 0:
+        return []
+
+    # 연속된 누락 봉을 하나의 구간으로 묶기
+    breaks = np.flatnonzero(np.diff(missing) != interval_ms)
+    starts = np.r_[missing[0], missing[breaks + 1]]
+    ends = np.r_[missing[breaks], missing[-1]]
+    return [(int(a), int(b)) for a, b in zip(starts, ends)]
+
+
+def completeness(timestamps, interval_ms, start_ms, end_ms):
+    """[start_ms, end_ms] 구간에 있어야 할 봉 중 저장된 비율(%)"""
+    expected = (end_ms - start_ms) // interval_ms + 1
+    if expected <= 0:
+        return 100.0
+    present = np.asarray(timestamps, dtype=np.int64)
+    in_range = present[(present >= start_ms) & (present <= end_ms)]
+    on_grid = np.unique(in_range[(in_range - start_ms) % interval_ms == 0])
+    return len(on_grid) / expected * 100
+
+
+def plan_fetches(gaps, interval_ms, page_limit=FETCH_PAGE_LIMIT):
+    """
+    누락 구간을 덮는 최소 개수의 (since_ms, limit) 요청 목록
+    한 페이지(page_limit개) 안에 들어오는 인접 구간은 같은 요청으로 합친다.
+    """
+    requests = []
+    for gap_start, gap_end in gaps:
+        current = gap_start
+        while current <= gap_end:
+            if requests:
+                since, _ = requests[-1]
+                page_end = since + (page_limit - 1) * interval_ms
+                if current <= page_end:
+                    covered_to = min(gap_end, page_end)
+                    requests[-1] = (since, (covered_to - since) // interval_ms + 1)
+                    current = covered_to + interval_ms
+                    continue
+            count = min(page_limit, (gap_end - current) // interval_ms + 1)
+            requests.append((current, count))
+            current += count * interval_ms
+    return requests
+
+
+def scan_collection(collection, interval_ms, start_ms, end_ms, refresh_last=True):
+    """
+    Mongo 차트 컬렉션의 [start_ms, end_ms] 구간 점검 (timestamp만 조회)
+    refresh_last=True 이면 마지막 저장 봉은 미완성 상태로 저장됐을 수 있으므로 다시 받을 대상에 포함한다.
+    Returns:
+        dict: expected, present, completeness(%), gaps, last_ms
+    """
+    window_start = EPOCH + timedelta(milliseconds=start_ms)
+    cursor = collection.find({'timestamp': {'$gte': window_start}}, {'_id': 0, 'timestamp': 1})
+    timestamps = np.array([to_ms(doc['timestamp']) for doc in cursor], dtype=np.int64)
+    timestamps.sort()
+
+    last_ms = int(timestamps[-1]) if len(timestamps) else None
+    check = timestamps[:-1] if (refresh_last and len(timestamps)) else timestamps
+    gaps = find_gaps(check, interval_ms, start_ms, end_ms)
+    expected = max((end_ms - start_ms) // interval_ms + 1, 0)
+    percent = completeness(timestamps, interval_ms, start_ms, end_ms)
+    return {
+        'expected': expected,
+        'present': int(round(percent * expected / 100)),
+        'completeness': percent,
+        'gaps': gaps,
+        'last_ms': last_ms,
+    }
+
+
+if __name__ == "__main__":
+    # 누락 구간/요청 계획 예시 (5분봉 3,000개 중 일부 누락)
+    interval = 5 * 60 * 1000
+    start = 1_735_689_600_000
+    end = start + 2999 * interval
+    stored = np.arange(start, end + 1, interval)
+    stored = np.delete(stored, np.r_[10:15, 400:401, 402:404, 1500:2800])
+    gaps = find_gaps(stored, interval, start, end)
+    requests = plan_fetches(gaps, interval)
+    print(f"완성도 {completeness(stored, interval, start, end):.2f}%, 누락 구간 {len(gaps)}개")
+    print(f"요청 {len(requests)}회: {[(since, limit) for since, limit in requests]}")
+    covered = set()
+    for since, limit in requests:
+        covered.update(range(since, since + limit * interval, interval))
+    assert all(ts in covered for a, b in gaps for ts in range(a, b + 1, interval))
+    assert all(limit <= FETCH_PAGE_LIMIT for _, limit in requests)
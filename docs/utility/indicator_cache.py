@@ -0,0 +1,60 @@
+import ta
+
+from docs.utility.recursive_filter import ema_with_sma_init, wilder_smoothing, rma
+
+
+class IndicatorCache:
+    """
+    한 틱(한 번의 process_chart_data 호출) 안에서 기본 지표 시리즈를 공유하는 캐시
+
+    (소스 컬럼, 지표 종류, 기간) 을 키로 결과를 저장해 EMA(close, 12) 처럼
+    여러 전략이 같은 값을 요구할 때 한 번만 계산한다.
+    소스 컬럼 값이 바뀌면 캐시가 맞지 않으므로 틱마다 새로 만들어 사용한다.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._store = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, source, kind, period, compute):
+        key = (source, kind, period)
+        if key in self._store:
+            self.hits += 1
+            return self._store[key]
+        self.misses += 1
+        result = compute()
+        self._store[key] = result
+        return result
+
+    def _series(self, source, series):
+        return self.df[source] if series is None else series
+
+    def ema(self, source, period, series=None):
+        """ema_with_sma_init. 컬럼에 없는 가공 시리즈는 series와 구분 가능한 source 이름을 함께 넘긴다"""
+        return self._get(source, 'ema', period, lambda: ema_with_sma_init(self._series(source, series), period))
+
+    def wilder(self, source, period, series=None):
+        return self._get(source, 'wilder', period, lambda: wilder_smoothing(self._series(source, series), period))
+
+    def rma(self, source, period, series=None):
+        return self._get(source, 'rma', period, lambda: rma(self._series(source, series), period))
+
+    def rolling_mean(self, source, window, series=None):
+        return self._get(source, 'rolling_mean', window,
+                         lambda: self._series(source, series).rolling(window=window).mean())
+
+    def rsi(self, source, window, series=None):
+        return self._get(source, 'rsi', window,
+                         lambda: ta.momentum.rsi(self._series(source, series), window=window).fillna(50))
+
+    def stats(self):
+        """캐시 적중 통계"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._store),
+            'hit_rate': (self.hits / total) if total else 0.0,
+        }
@@ -0,0 +1,555 @@
+import itertools
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from docs.cal_chart import STG_CONFIG as DEFAULT_STG_CONFIG
+
+NAN = float('nan')
+
+# process_chart_data 결과와 동일한 컬럼 순서
+OUTPUT_COLUMNS = [
+    'open', 'high', 'low', 'close', 'volume',
+    'EMA_fast_stg1', 'EMA_slow_stg1', 'macd_stg1', 'macd_signal_stg1', 'hist_stg1',
+    'hist_size', 'candle_size', 'candle_size_ma', 'normalized_candle_size', 'hist_size_ma', 'normalized_hist_size',
+    'DI+_stg1', 'DI-_stg1', 'DIPlus_stg1', 'DIMinus_stg1',
+    'EMA_fast_stg2', 'EMA_slow_stg2', 'macd_stg2', 'macd_signal_stg2', 'hist_stg2', 'hist_direction_dive',
+    'atr_stg3', 'DI+_stg3', 'DI-_stg3',
+    'slope', 'intercept', 'average', 'middle_line', 'std_dev', 'upper_band', 'lower_band', 'trend_duration', 'rsi_stg4',
+    'EMA_fast_stg5', 'EMA_slow_stg5', 'macd_stg5', 'macd_signal_stg5', 'hist_stg5', 'hist_direction_stg5',
+    'Smoothed_TR_stg5', 'Smoothed_DM+_stg5', 'Smoothed_DM-_stg5', 'DI+_stg5', 'DI-_stg5',
+    'DIPlus_stg5', 'DIMinus_stg5', 'slope_diff_stg5', 'rsi_stg5',
+    'vol_ma', 'up_vol', 'down_vol', 'up_vol_ma', 'down_vol_ma', 'vol_strength', 'vol_trend',
+    'vt_highest', 'vt_lowest', 'norm_trend', 'signal_line', 'trend_diff',
+]
+
+# 배치 계산(process_chart_data)과의 허용 오차
+PARITY_RTOL = 1e-8
+PARITY_ATOL = 1e-6
+
+
+def _isnan(x):
+    return x != x
+
+
+def _div(a, b):
+    """pandas와 동일한 0 나누기 처리 (0/0 -> NaN, x/0 -> inf)"""
+    if b == 0 or _isnan(a) or _isnan(b):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return float(np.float64(a) / np.float64(b))
+    return a / b
+
+
+class _SeedEma:
+    """cal_chart의 ema_with_sma_init: 첫 값으로 시작, NaN이면 이전 값 유지"""
+
+    def __init__(self, period):
+        self.multiplier = 2 / (period + 1)
+        self.value = None
+
+    def update(self, x):
+        if self.value is None:
+            self.value = x if not _isnan(x) else 0.0
+        elif not _isnan(x):
+            self.value = (x * self.multiplier) + (self.value * (1 - self.multiplier))
+        return self.value
+
+
+class _Wilder:
+    """cal_chart의 wilder_smoothing: 첫 유효값부터 시작, NaN이면 이전 값 유지"""
+
+    def __init__(self, period):
+        self.period = period
+        self.value = NAN
+
+    def update(self, x):
+        if _isnan(self.value):
+            self.value = x
+        elif not _isnan(x):
+            self.value = (self.value * (self.period - 1) + x) / self.period
+        return self.value
+
+
+class _Ewm:
+    """pandas ewm(adjust=False).mean()과 동일한 재귀 (ignore_na=False)"""
+
+    def __init__(self, alpha, min_periods=0):
+        self.alpha = alpha
+        self.min_periods = max(min_periods, 1)
+        self.weighted = None
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, x):
+        is_observation = not _isnan(x)
+        self.nobs += is_observation
+        if self.weighted is None:
+            self.weighted = x
+        elif not _isnan(self.weighted):
+            self.old_wt *= 1 - self.alpha
+            if is_observation:
+                if self.weighted != x:
+                    self.weighted = (self.old_wt * self.weighted + self.alpha * x) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        elif is_observation:
+            self.weighted = x
+        return self.weighted if self.nobs >= self.min_periods else NAN
+
+
+class _RollingMean:
+    """rolling(window).mean() - 누적합 갱신, window마다 재합산으로 오차 누적 방지"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.nan_count = 0
+        self.since_resum = 0
+
+    def update(self, x):
+        if len(self.values) == self.window:
+            old = self.values[0]
+            if _isnan(old):
+                self.nan_count -= 1
+            else:
+                self.total -= old
+        self.values.append(x)
+        if _isnan(x):
+            self.nan_count += 1
+        else:
+            self.total += x
+
+        self.since_resum += 1
+        if self.since_resum >= self.window:
+            self.total = math.fsum(v for v in self.values if not _isnan(v))
+            self.since_resum = 0
+
+        if len(self.values) < self.window or self.nan_count:
+            return NAN
+        return self.total / self.window
+
+
+class _RollingExtreme:
+    """rolling(window).max()/min() - 단조 덱으로 O(1) 분할상환"""
+
+    def __init__(self, window, mode='max'):
+        self.window = window
+        self.is_max = mode == 'max'
+        self.candidates = deque()  # (위치, 값)
+        self.flags = deque(maxlen=window)  # NaN 여부
+        self.nan_count = 0
+        self.position = 0
+
+    def update(self, x):
+        if len(self.flags) == self.window and self.flags[0]:
+            self.nan_count -= 1
+        is_nan = _isnan(x)
+        self.flags.append(is_nan)
+        self.nan_count += is_nan
+
+        if not is_nan:
+            while self.candidates and (
+                self.candidates[-1][1] <= x if self.is_max else self.candidates[-1][1] >= x
+            ):
+                self.candidates.pop()
+            self.candidates.append((self.position, x))
+        while self.candidates and self.candidates[0][0] <= self.position - self.window:
+            self.candidates.popleft()
+        self.position += 1
+
+        if len(self.flags) < self.window or self.nan_count:
+            return NAN
+        return self.candidates[0][1]
+
+
+class _Lag:
+    """series.shift(k)"""
+
+    def __init__(self, k):
+        self.values = deque(maxlen=k + 1)
+
+    def update(self, x):
+        self.values.append(x)
+        if len(self.values) < self.values.maxlen:
+            return NAN
+        return self.values[0]
+
+
+class _Rsi:
+    """ta.momentum.rsi(close, window).fillna(50)"""
+
+    def __init__(self, window):
+        self.prev_close = None
+        self.up = _Ewm(1 / window, min_periods=window)
+        self.down = _Ewm(1 / window, min_periods=window)
+
+    def update(self, close):
+        diff = close - self.prev_close if self.prev_close is not None else NAN
+        self.prev_close = close
+        ema_up = self.up.update(diff if diff > 0 else 0.0)
+        ema_down = self.down.update(-diff if diff < 0 else -0.0)
+        if ema_down == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + _div(ema_up, ema_down)))
+        return 50.0 if _isnan(rsi) else rsi
+
+
+class _DirectionalIndex:
+    """Wilder 평활 TR/DM+/DM- 와 DI+/DI-"""
+
+    def __init__(self, period):
+        self.tr = _Wilder(period)
+        self.dm_plus = _Wilder(period)
+        self.dm_minus = _Wilder(period)
+
+    def update(self, tr, dm_plus, dm_minus):
+        smoothed_tr = self.tr.update(tr)
+        smoothed_plus = self.dm_plus.update(dm_plus)
+        smoothed_minus = self.dm_minus.update(dm_minus)
+        di_plus = 100 * _div(smoothed_plus, smoothed_tr)
+        di_minus = 100 * _div(smoothed_minus, smoothed_tr)
+        return smoothed_tr, smoothed_plus, smoothed_minus, di_plus, di_minus
+
+
+class _Macd:
+    def __init__(self, fast, slow, signal, ffill=False):
+        self.fast = _SeedEma(fast)
+        self.slow = _SeedEma(slow)
+        self.signal = _SeedEma(signal)
+        self.ffill = ffill
+        self.last_macd = NAN
+
+    def update(self, close):
+        ema_fast = self.fast.update(close)
+        ema_slow = self.slow.update(close)
+        macd = ema_fast - ema_slow
+        signal_source = macd
+        if self.ffill:
+            if _isnan(macd):
+                signal_source = self.last_macd
+            else:
+                self.last_macd = macd
+        signal = self.signal.update(signal_source)
+        return ema_fast, ema_slow, macd, signal, macd - signal
+
+
+class _RegressionChannel:
+    """
+    파인스크립트 방식 선형회귀 (rolling_linreg와 동일한 정의)
+    Σy, Σxy, Σy² 를 윈도우 이동 시 O(1)로 갱신하고, length번마다 기준가를 옮겨 재합산한다
+    """
+
+    def __init__(self, length):
+        self.length = length
+        self.values = deque(maxlen=length)
+        x = np.arange(length, dtype=float)
+        self.sum_x = float(x.sum())
+        self.sum_x2 = float((x * x).sum())
+        self.denom = length * self.sum_x2 - self.sum_x * self.sum_x
+        self.base = None
+        self.since_resum = 0
+        self._reset_sums()
+
+    def _reset_sums(self):
+        self.sum_y = 0.0
+        self.sum_xy = 0.0
+        self.sum_y2 = 0.0
+
+    def _resum(self):
+        self.base = self.values[-1]
+        self._reset_sums()
+        for x, price in enumerate(self.values):
+            y = price - self.base
+            self.sum_y += y
+            self.sum_xy += x * y
+            self.sum_y2 += y * y
+        self.since_resum = 0
+
+    def update(self, close):
+        if self.base is None:
+            self.base = close
+
+        y = close - self.base
+        if len(self.values) == self.length:
+            oldest = self.values[0] - self.base
+            self.sum_xy -= self.sum_y - oldest
+            self.sum_xy += (self.length - 1) * y
+            self.sum_y += y - oldest
+            self.sum_y2 += y * y - oldest * oldest
+        else:
+            self.sum_xy += len(self.values) * y
+            self.sum_y += y
+            self.sum_y2 += y * y
+        self.values.append(close)
+
+        self.since_resum += 1
+        if self.since_resum >= self.length:
+            self._resum()
+
+        if len(self.values) < self.length:
+            return NAN, NAN, NAN, NAN
+
+        n = float(self.length)
+        slope = _div(n * self.sum_xy - self.sum_x * self.sum_y, self.denom)
+        shifted_intercept = (self.sum_y - slope * self.sum_x) / n
+        # 표준편차는 최신 봉부터 j=0,1,2... 로 기대값과 비교 (기존 구현과 동일)
+        sum_jy = (self.length - 1) * self.sum_y - self.sum_xy
+        sum_sq = (self.sum_y2 - 2 * shifted_intercept * self.sum_y - 2 * slope * sum_jy
+                  + n * shifted_intercept * shifted_intercept
+                  + 2 * shifted_intercept * slope * self.sum_x
+                  + slope * slope * self.sum_x2)
+        std_dev = math.sqrt(max(sum_sq, 0.0) / n)
+        return slope, shifted_intercept + self.base, self.sum_y / n + self.base, std_dev
+
+
+class IndicatorState:
+    """
+    process_chart_data 지표를 봉 단위로 갱신하는 상태 객체
+
+    히스토리로 한 번 시드한 뒤 마감 봉마다 update()를 호출하면 최신 행만 O(1)로 계산한다.
+    결과는 같은 히스토리 전체를 process_chart_data로 계산한 값과 PARITY_RTOL 이내에서 일치한다.
+    전략 계산용으로 최근 keep개 행을 보관하며 frame()으로 DataFrame을 돌려준다.
+    """
+
+    def __init__(self, stg_config=None, keep=300):
+        config = stg_config or DEFAULT_STG_CONFIG
+        self.stg_config = config
+        self.keep = keep
+        self.rows = deque(maxlen=keep)
+        self.timestamps = deque(maxlen=keep)
+        self.last_timestamp = None
+
+        size = config['MACD_SIZE']
+        dive = config['MACD_DIVE']
+        st = config['SUPERTREND']
+        lr = config['LINEAR_REG']
+        slope_cfg = config['MACD_DI_SLOPE']
+        vol = config['VOLUME_TREND']
+
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.prev_close = NAN
+
+        # STG 1
+        self.macd_stg1 = _Macd(size['MACD_FAST_LENGTH'], size['MACD_SLOW_LENGTH'], size['MACD_SIGNAL_LENGTH'])
+        self.candle_size_ma = _RollingMean(size['MACD_SLOW_LENGTH'])
+        self.hist_size_ma = _RollingMean(size['MACD_SLOW_LENGTH'])
+        self.di_stg1 = _DirectionalIndex(size['DI_LENGTH'])
+        self.di_plus_lag_stg1 = _Lag(size['DI_SLOPE_LENGTH'])
+        self.di_minus_lag_stg1 = _Lag(size['DI_SLOPE_LENGTH'])
+
+        # STG 2
+        self.macd_stg2 = _Macd(dive['FAST_LENGTH'], dive['SLOW_LENGTH'], dive['SIGNAL_LENGTH'])
+        self.hist_lag_stg2 = _Lag(1)
+
+        # STG 3
+        self.atr_stg3 = _Ewm(1 / st['ATR_PERIOD'])
+        self.di_stg3 = _DirectionalIndex(st['ADX_LENGTH'])
+
+        # STG 4
+        self.channel = _RegressionChannel(lr['LENGTH'])
+        self.up_multiplier = lr['UPPER_MULTIPLIER']
+        self.lw_multiplier = lr['LOWER_MULTIPLIER']
+        self.trend_duration = None
+        self.rsi_stg4 = _Rsi(lr['RSI_LENGTH'])
+
+        # STG 5
+        self.macd_stg5 = _Macd(slope_cfg['FAST_LENGTH'], slope_cfg['SLOW_LENGTH'], slope_cfg['SIGNAL_LENGTH'], ffill=True)
+        self.hist_lag_stg5 = _Lag(1)
+        self.di_stg5 = _DirectionalIndex(slope_cfg['DI_LENGTH'])
+        self.di_plus_lag_stg5 = _Lag(slope_cfg['SLOPE_LENGTH'])
+        self.di_minus_lag_stg5 = _Lag(slope_cfg['SLOPE_LENGTH'])
+        self.rsi_stg5 = _Rsi(slope_cfg['RSI_LENGTH'])
+
+        # STG 6
+        trend_alpha = 2 / (vol['TREND_PERIOD'] + 1)
+        self.vol_ma = _RollingMean(vol['VOLUME_MA_LENGTH'])
+        self.up_vol_ma = _RollingMean(vol['VOLUME_MA_LENGTH'])
+        self.down_vol_ma = _RollingMean(vol['VOLUME_MA_LENGTH'])
+        self.vol_trend = _Ewm(trend_alpha)
+        self.vt_highest = _RollingExtreme(vol['NORM_PERIOD'], 'max')
+        self.vt_lowest = _RollingExtreme(vol['NORM_PERIOD'], 'min')
+        self.signal_line = _Ewm(trend_alpha)
+
+    @classmethod
+    def from_history(cls, df, stg_config=None, keep=300):
+        """OHLCV 히스토리(load_data 결과)로 상태 시드"""
+        state = cls(stg_config=stg_config, keep=keep)
+        state.extend(df)
+        return state
+
+    def extend(self, df):
+        """
+        마지막으로 반영한 봉 이후의 행만 순서대로 반영
+        Returns:
+            bool: 새 데이터가 기존 상태와 이어지면 True, 중간이 비어 있으면 False (재시드 필요)
+        """
+        if df is None or df.empty:
+            return True
+
+        if self.last_timestamp is not None:
+            if df.index[0] > self.last_timestamp:
+                return False  # 겹치는 봉이 없으면 사이에 빠진 봉이 있는지 알 수 없음
+            df = df[df.index > self.last_timestamp]
+
+        columns = [df[c].to_numpy(dtype=float) for c in ('open', 'high', 'low', 'close', 'volume')]
+        for timestamp, open_, high, low, close, volume in zip(df.index, *columns):
+            self.update(timestamp, open_, high, low, close, volume)
+        return True
+
+    def update(self, timestamp, open_, high, low, close, volume):
+        """마감된 봉 하나를 반영하고 최신 행(dict)을 반환"""
+        row = {'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}
+
+        # TR / DM (첫 봉은 0)
+        prev_close = self.prev_close
+        if _isnan(prev_close):
+            tr = 0.0
+        else:
+            tr = max(high - low, max(abs(high - prev_close), abs(low - prev_close)))
+        up_move = high - self.prev_high
+        down_move = self.prev_low - low
+        dm_plus = max(up_move, 0) if up_move > down_move else 0
+        dm_minus = max(down_move, 0) if down_move > up_move else 0
+        if dm_plus > 0:
+            dm_minus = 0
+        if dm_minus > 0:
+            dm_plus = 0
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+
+        # STG 1 - MACD_SIZE
+        ema_fast, ema_slow, macd, signal, hist = self.macd_stg1.update(close)
+        row.update({'EMA_fast_stg1': ema_fast, 'EMA_slow_stg1': ema_slow, 'macd_stg1': macd,
+                    'macd_signal_stg1': signal, 'hist_stg1': hist})
+        hist_size = abs(hist)
+        candle_size = abs(close - open_)
+        candle_size_ma = self.candle_size_ma.update(candle_size)
+        hist_size_ma = self.hist_size_ma.update(hist_size)
+        row.update({'hist_size': hist_size, 'candle_size': candle_size, 'candle_size_ma': candle_size_ma,
+                    'normalized_candle_size': _div(candle_size, candle_size_ma), 'hist_size_ma': hist_size_ma,
+                    'normalized_hist_size': _div(hist_size, hist_size_ma)})
+        _, _, _, di_plus, di_minus = self.di_stg1.update(tr, dm_plus, dm_minus)
+        row.update({'DI+_stg1': di_plus, 'DI-_stg1': di_minus,
+                    'DIPlus_stg1': di_plus - self.di_plus_lag_stg1.update(di_plus),
+                    'DIMinus_stg1': di_minus - self.di_minus_lag_stg1.update(di_minus)})
+
+        # STG 2 - MACD_DIVE
+        ema_fast, ema_slow, macd, signal, hist = self.macd_stg2.update(close)
+        row.update({'EMA_fast_stg2': ema_fast, 'EMA_slow_stg2': ema_slow, 'macd_stg2': macd,
+                    'macd_signal_stg2': signal, 'hist_stg2': hist,
+                    'hist_direction_dive': hist - self.hist_lag_stg2.update(hist)})
+
+        # STG 3 - SUPERTREND
+        _, _, _, di_plus, di_minus = self.di_stg3.update(tr, dm_plus, dm_minus)
+        row.update({'atr_stg3': self.atr_stg3.update(tr), 'DI+_stg3': di_plus, 'DI-_stg3': di_minus})
+
+        # STG 4 - LINEAR_REG
+        slope, intercept, average, std_dev = self.channel.update(close)
+        middle_line = intercept + slope * ((close + open_) / 2)
+        if self.trend_duration is None:
+            duration = 1 if slope >= 0 else -1
+        elif slope >= 0:
+            duration = self.trend_duration + 1 if self.trend_duration >= 0 else 1
+        elif slope < 0:
+            duration = self.trend_duration - 1 if self.trend_duration <= 0 else -1
+        else:
+            duration = 0
+        self.trend_duration = duration
+        row.update({'slope': slope, 'intercept': intercept, 'average': average, 'middle_line': middle_line,
+                    'std_dev': std_dev, 'upper_band': middle_line + self.up_multiplier * std_dev,
+                    'lower_band': middle_line - self.lw_multiplier * std_dev, 'trend_duration': duration,
+                    'rsi_stg4': self.rsi_stg4.update(close)})
+
+        # STG 5 - MACD_DI_SLOPE
+        ema_fast, ema_slow, macd, signal, hist = self.macd_stg5.update(close)
+        row.update({'EMA_fast_stg5': ema_fast, 'EMA_slow_stg5': ema_slow, 'macd_stg5': macd,
+                    'macd_signal_stg5': signal, 'hist_stg5': hist,
+                    'hist_direction_stg5': hist - self.hist_lag_stg5.update(hist)})
+        smoothed_tr, smoothed_plus, smoothed_minus, di_plus, di_minus = self.di_stg5.update(tr, dm_plus, dm_minus)
+        di_plus_slope = di_plus - self.di_plus_lag_stg5.update(di_plus)
+        di_minus_slope = di_minus - self.di_minus_lag_stg5.update(di_minus)
+        row.update({'Smoothed_TR_stg5': smoothed_tr, 'Smoothed_DM+_stg5': smoothed_plus,
+                    'Smoothed_DM-_stg5': smoothed_minus, 'DI+_stg5': di_plus, 'DI-_stg5': di_minus,
+                    'DIPlus_stg5': di_plus_slope, 'DIMinus_stg5': di_minus_slope,
+                    'slope_diff_stg5': di_plus_slope - di_minus_slope, 'rsi_stg5': self.rsi_stg5.update(close)})
+
+        # STG 6 - VOLUME_TREND
+        up_vol = volume if close >= open_ else 0.0
+        down_vol = volume if close < open_ else 0.0
+        vol_ma = self.vol_ma.update(volume)
+        up_vol_ma = self.up_vol_ma.update(up_vol)
+        down_vol_ma = self.down_vol_ma.update(down_vol)
+        vol_strength = _div(up_vol_ma - down_vol_ma, vol_ma) * 100
+        vol_trend = self.vol_trend.update(vol_strength)
+        vt_highest = self.vt_highest.update(vol_trend)
+        vt_lowest = self.vt_lowest.update(vol_trend)
+        norm_trend = _div(vol_trend - vt_lowest, vt_highest - vt_lowest) * 2 - 1
+        signal_line = self.signal_line.update(norm_trend)
+        row.update({'vol_ma': vol_ma, 'up_vol': up_vol, 'down_vol': down_vol, 'up_vol_ma': up_vol_ma,
+                    'down_vol_ma': down_vol_ma, 'vol_strength': vol_strength, 'vol_trend': vol_trend,
+                    'vt_highest': vt_highest, 'vt_lowest': vt_lowest, 'norm_trend': norm_trend,
+                    'signal_line': signal_line, 'trend_diff': abs(norm_trend - signal_line)})
+
+        self.rows.append(row)
+        self.timestamps.append(timestamp)
+        self.last_timestamp = timestamp
+        return row
+
+    def latest(self):
+        """최신 행 (pd.Series)"""
+        if not self.rows:
+            return None
+        return pd.Series(self.rows[-1], name=self.last_timestamp)[OUTPUT_COLUMNS]
+
+    def frame(self):
+        """보관 중인 최근 keep개 행을 process_chart_data와 같은 컬럼 구성의 DataFrame으로 반환"""
+        return self._to_frame(list(self.rows), list(self.timestamps))
+
+    def tail(self, n):
+        """최근 n개 행만 DataFrame으로 반환 (DataFrame.tail과 같은 용도)"""
+        start = max(len(self.rows) - n, 0)
+        rows = list(itertools.islice(self.rows, start, None))
+        timestamps = list(itertools.islice(self.timestamps, start, None))
+        return self._to_frame(rows, timestamps)
+
+    @staticmethod
+    def _to_frame(rows, timestamps):
+        index = pd.DatetimeIndex(timestamps, name='timestamp')
+        df = pd.DataFrame.from_records(rows, index=index, columns=OUTPUT_COLUMNS)
+        df['trend_duration'] = df['trend_duration'].astype('int64')
+        return df
+
+
+if __name__ == "__main__":
+    import time
+    from docs.cal_chart import process_chart_data
+
+    # 배치 계산과의 일치 여부 및 봉당 갱신 시간 확인
+    rng = np.random.default_rng(0)
+    n = 2100
+    close = 100000 + np.cumsum(rng.standard_normal(n) * 80)
+    open_ = np.r_[close[0], close[:-1]]
+    history = pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + np.abs(rng.standard_normal(n)) * 60,
+        'low': np.minimum(open_, close) - np.abs(rng.standard_normal(n)) * 60,
+        'close': close,
+        'volume': np.abs(rng.standard_normal(n)) * 100 + 1,
+    }, index=pd.date_range('2025-01-01', periods=n, freq='5min', name='timestamp'))
+
+    expected, _ = process_chart_data(history.copy())
+
+    seed = 300
+    state = IndicatorState.from_history(history.iloc[:seed], keep=n)
+    start = time.perf_counter()
+    state.extend(history)
+    per_bar = (time.perf_counter() - start) / (n - seed)
+
+    result = state.frame()
+    for column in OUTPUT_COLUMNS:
+        np.testing.assert_allclose(result[column].to_numpy(float), expected[column].to_numpy(float),
+                                   rtol=PARITY_RTOL, atol=PARITY_ATOL, equal_nan=True, err_msg=column)
+    print(f"배치 결과와 일치 ({len(OUTPUT_COLUMNS)}개 컬럼, {n}봉), 봉당 갱신 {per_bar * 1e6:.0f}µs")
@@ -1,16 +1,21 @@
-from pymongo import MongoClient
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from logger import logger
+from docs.utility.mongo_client import get_database
 import sys
 import os
 # 프로젝트 루트 디렉토리 추가
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-def load_data(set_timevalue, period=300, server_time=None):
-    # MongoDB에 접속
-    mongoClient = MongoClient("mongodb://mongodb:27017")
-    database = mongoClient["bitcoin"]
+def load_data(set_timevalue, period=300, server_time=None, last_closed=None):
+    """
+    최근 마감 봉 period개 (timestamp 인덱스, 시간 오름차순)
+    last_closed: 마감이 확인된 봉의 시작 시각(naive UTC, 스트림 마감 이벤트의 start).
+                 주어지면 그 봉까지 읽고, 없으면 가장 최근 문서를 미완성 봉으로 보고 제외한다.
+    """
+    # 공유 MongoDB 연결 사용
+    database = get_database()
 
     # set_timevalue 값에 따라 적절한 차트 컬렉션 선택
     if set_timevalue == '1m':
@@ -28,8 +33,13 @@ def load_data(set_timevalue, period=300, server_time=None):
     else:
         raise ValueError(f"Invalid time value: {set_timevalue}")
     
-    # 최신 데이터부터 과거 데이터까지 모두 가져오기
-    data_cursor = chart_collection.find().sort("timestamp", -1)
+    # 최신 period+1개만 조회 (마지막 하나는 미완성 봉), _id는 제외
+    # last_closed가 있으면 그 봉 이하 period개 (모두 마감 봉)
+    if last_closed is not None:
+        query, limit = {'timestamp': {'$lte': last_closed}}, period
+    else:
+        query, limit = {}, period + 1
+    data_cursor = chart_collection.find(query, {'_id': 0}).sort("timestamp", -1).limit(limit)
     data_list = list(data_cursor)
 
     if not data_list:
@@ -53,33 +63,80 @@ def load_data(set_timevalue, period=300, server_time=None):
             logger.warning(f"최신 데이터 시간 불일치: 예상={expected_time}, 실제={latest_data_time}")
             return None  # None을 반환하면 메인에서 재시도하도록
 
+    if last_closed is not None:
+        if data_list[0]['timestamp'] != last_closed:
+            logger.warning(f"마감 봉 없음: 예상={last_closed}, 실제={data_list[0]['timestamp']}")
+            return None
+        df = documents_to_frame(data_list[::-1])
+        if len(df) < period:
+            logger.warning(f"요청된 기간({period})보다 적은 데이터({len(df)})가 있습니다")
+            return None
+        return df
+
+    # 마지막 데이터(미완성 봉) 제외하고, 최신 period 개수만큼의 데이터만 반환
+    if len(data_list) > 1:
+        df = documents_to_frame(data_list[:0:-1])  # 미완성 봉 제외 후 시간순(오름차순)으로 뒤집기
+        if len(df) < period:  # 데이터가 충분한지 확인
+            logger.warning(f"요청된 기간({period})보다 적은 데이터({len(df)})가 있습니다")
+            return None
+    else:
+        logger.warning("데이터가 충분하지 않습니다")
+        return None
 
+    return df
 
 
-    # MongoDB 데이터를 DataFrame으로 변환
-    df = pd.DataFrame(data_list)
+def documents_to_frame(documents):
+    """
+    차트 문서 리스트(시간 오름차순)를 timestamp 인덱스 DataFrame으로 변환
+    행 단위 dict 대신 필드별 배열을 만들어 한 번에 구성한다.
+    """
+    fields = [key for key in documents[0] if key not in ('_id', 'timestamp')]
+    index = pd.DatetimeIndex(pd.to_datetime([doc['timestamp'] for doc in documents]), name='timestamp')
+    columns = {field: np.array([doc[field] for doc in documents]) for field in fields}
+    return pd.DataFrame(columns, index=index)
 
-    # 타임스탬프를 datetime 형식으로 변환
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
 
-    # 불필요한 ObjectId 필드 제거
+def _load_data_full_scan(data_list, period):
+    """기존 방식 (전체 조회 후 클라이언트에서 정렬/슬라이스) - 벤치마크 비교용"""
+    df = pd.DataFrame(data_list)
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
     if '_id' in df.columns:
         df.drop('_id', axis=1, inplace=True)
-
-    # 인덱스를 타임스탬프로 설정
     df.set_index('timestamp', inplace=True)
-
-    # 시간순으로 정렬 (오름차순으로 변환)
     df.sort_index(inplace=True)
+    return df.iloc[-(period+1):-1]
 
-    # 마지막 데이터(미완성 봉) 제외하고, 최신 period 개수만큼의 데이터만 반환
-    if len(df) > 1:
-        df = df.iloc[-(period+1):-1]  # period+1개를 가져와서 마지막 하나 제외
-        if len(df) < period:  # 데이터가 충분한지 확인
-            logger.warning(f"요청된 기간({period})보다 적은 데이터({len(df)})가 있습니다")
-            return None
-    else:
-        logger.warning("데이터가 충분하지 않습니다")
-        return None
 
-    return df
+if __name__ == "__main__":
+    import time
+    from datetime import timedelta
+    import bson
+
+    # 2,100개 capped 컬렉션 기준 전송 바이트와 DataFrame 구성 시간 비교 (합성 문서)
+    total, period = 2100, 300
+    rng = np.random.default_rng(0)
+    start = datetime(2025, 1, 1)
+    close = 100000 + np.cumsum(rng.standard_normal(total) * 80)
+    full_docs = [{'_id': bson.ObjectId(), 'timestamp': start + timedelta(minutes=5 * i),
+                  'open': float(c), 'high': float(c + 50), 'low': float(c - 50), 'close': float(c), 'volume': 12.345}
+                 for i, c in enumerate(close)]
+    full_desc = full_docs[::-1]
+    limited_desc = [{k: v for k, v in doc.items() if k != '_id'} for doc in full_desc[:period + 1]]
+
+    full_bytes = sum(len(bson.encode(doc)) for doc in full_desc)
+    limited_bytes = sum(len(bson.encode(doc)) for doc in limited_desc)
+    print(f"전송 바이트: 전체 {full_bytes:,} -> limit+projection {limited_bytes:,} ({full_bytes / limited_bytes:.1f}배 감소)")
+
+    def best_of(func, *args, repeat=20):
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            result = func(*args)
+            times.append(time.perf_counter() - t0)
+        return result, min(times)
+
+    expected, full_time = best_of(_load_data_full_scan, full_desc, period)
+    result, limited_time = best_of(documents_to_frame, limited_desc[:0:-1])
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+    print(f"DataFrame 구성: 전체 {full_time * 1000:.2f}ms -> 컬럼 배열 {limited_time * 1000:.2f}ms ({full_time / limited_time:.1f}배)")
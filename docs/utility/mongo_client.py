@@ -0,0 +1,159 @@
+"""
+프로세스 전체에서 공유하는 MongoDB 연결
+
+MongoClient는 내부에 커넥션 풀을 가지고 있으므로 호출마다 새로 만들지 않고
+URI별로 하나만 만들어 재사용한다. 풀 크기와 서버 선택 타임아웃은 환경 변수로 조정한다.
+
+    MONGO_URI                         (기본 mongodb://mongodb:27017)
+    MONGO_MAX_POOL_SIZE               (기본 10)
+    MONGO_MIN_POOL_SIZE               (기본 1)
+    MONGO_SERVER_SELECTION_TIMEOUT_MS (기본 5000)
+"""
+import os
+import threading
+import time
+
+from pymongo import MongoClient
+from pymongo import monitoring
+
+DEFAULT_MONGO_URI = os.getenv("MONGO_URI", "mongodb://mongodb:27017")
+DEFAULT_DB_NAME = "bitcoin"
+MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "10"))
+MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "1"))
+SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+
+_clients = {}
+_lock = threading.Lock()
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """커넥션 풀 이벤트 카운터 (새 연결 생성 대비 재사용 비율 확인용)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.clients_created = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkins = 0
+
+    def _incr(self, name):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._incr('connections_created')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr('connections_closed')
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._incr('checkout_failures')
+
+    def connection_checked_out(self, event):
+        self._incr('checkouts')
+
+    def connection_checked_in(self, event):
+        self._incr('checkins')
+
+    def snapshot(self):
+        with self.lock:
+            reused = max(self.checkouts - self.connections_created, 0)
+            return {
+                'clients_created': self.clients_created,
+                'connections_created': self.connections_created,
+                'connections_closed': self.connections_closed,
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'checkins': self.checkins,
+                'reuse_rate': (reused / self.checkouts) if self.checkouts else 0.0,
+            }
+
+
+metrics = PoolMetrics()
+
+
+def get_client(uri=None):
+    """URI별 공유 MongoClient (최초 호출 시 생성)"""
+    uri = uri or DEFAULT_MONGO_URI
+    client = _clients.get(uri)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(uri)
+        if client is None:
+            client = MongoClient(
+                uri,
+                maxPoolSize=MAX_POOL_SIZE,
+                minPoolSize=MIN_POOL_SIZE,
+                serverSelectionTimeoutMS=SERVER_SELECTION_TIMEOUT_MS,
+                event_listeners=[metrics],
+            )
+            _clients[uri] = client
+            with metrics.lock:
+                metrics.clients_created += 1
+    return client
+
+
+def get_database(name=DEFAULT_DB_NAME, uri=None):
+    return get_client(uri)[name]
+
+
+def health_check(uri=None):
+    """
+    ping으로 연결 상태 확인
+    Returns:
+        (bool, 응답 시간 ms 또는 None)
+    """
+    try:
+        start = time.perf_counter()
+        get_client(uri).admin.command('ping')
+        return True, (time.perf_counter() - start) * 1000
+    except Exception:
+        return False, None
+
+
+def pool_metrics():
+    """공유 클라이언트의 커넥션 재사용 통계"""
+    return metrics.snapshot()
+
+
+def close_clients():
+    """프로세스 종료 시 모든 공유 클라이언트 정리"""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+if __name__ == "__main__":
+    # 같은 클라이언트를 반복 사용할 때 새 연결이 생기지 않는지 확인
+    ok, latency = health_check()
+    print(f"health_check: {ok}, {latency}")
+    if ok:
+        for _ in range(20):
+            get_database()['config'].find_one({'name': 'reverse_settings'})
+    print(pool_metrics())
@@ -0,0 +1,339 @@
+"""
+STG_CONFIG 파라미터 탐색 (그리드 / 랜덤)
+
+    from docs.utility.param_sweep import grid_space, run_sweep
+    candidates = grid_space({
+        'SUPERTREND.ATR_MULTIPLIER': [4, 5, 6, 7],
+        'LINEAR_REG.LENGTH': [80, 100, 120],
+        'MACD_SIZE.SIZE_RATIO_THRESHOLD': [0.8, 0.9, 1.0],
+    })
+    ranking = run_sweep(df, candidates)
+
+- 캔들 배열은 공유 메모리에 한 번만 올리고 워커는 이름으로 붙어서 사용한다
+  (작업마다 넘기는 것은 작은 설정 dict 뿐, DataFrame을 피클링하지 않음)
+- 지표 계산에 쓰이지 않는 시그널 단계 키(SIGNAL_KEYS)만 다른 후보끼리는
+  워커가 계산해 둔 지표를 그대로 재사용한다 (후보를 지표 설정 순으로 정렬해 나눠 줌)
+- 전략별(st/lr/sz/dv) 결과와 cal_position 우선순위로 합친 combined 결과를
+  backtest_engine으로 평가하고 PnL, 승률 순으로 정렬한다
+"""
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from docs.cal_chart import merge_config, process_chart_data
+from docs.strategy.signal_matrix import STRATEGY_ORDER, blend, strategy_codes
+from docs.utility.backtest_engine import TRIGGER_AMOUNT, simulate, summarize
+
+CANDLE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# 지표가 아니라 시그널 판단에만 쓰이는 키 (바뀌어도 process_chart_data 결과는 같음)
+SIGNAL_KEYS = {
+    'SUPERTREND.ATR_MULTIPLIER',
+    'SUPERTREND.DI_DIFFERENCE_FILTER',
+    'SUPERTREND.DI_DIFFERENCE_LOOKBACK_PERIOD',
+    'LINEAR_REG.RSI_LOWER_BOUND',
+    'LINEAR_REG.RSI_UPPER_BOUND',
+    'LINEAR_REG.MIN_BOUNCE_BARS',
+    'LINEAR_REG.MIN_SLOPE_VALUE',
+    'LINEAR_REG.MIN_TREND_DURATION',
+    'MACD_SIZE.SIZE_RATIO_THRESHOLD',
+    'MACD_SIZE.MIN_SLOPE_THRESHOLD',
+    'MACD_SIZE.REQUIRED_CONSECUTIVE_CANDLES',
+    'MACD_DIVE.HISTOGRAM_UPPER_LIMIT',
+    'MACD_DIVE.HISTOGRAM_LOWER_LIMIT',
+    'MACD_DIVE.LOOKBACK_PERIOD',
+    'MACD_DIVE.PRICE_MOVEMENT_THRESHOLD',
+}
+
+
+# ---- 탐색 공간 ----
+
+def to_overrides(params):
+    """{'SUPERTREND.ATR_MULTIPLIER': 5} -> {'SUPERTREND': {'ATR_MULTIPLIER': 5}}"""
+    overrides = {}
+    for dotted, value in params.items():
+        section, key = dotted.split('.', 1)
+        overrides.setdefault(section, {})[key] = value
+    return overrides
+
+
+def grid_space(space):
+    """
+    모든 조합 (itertools.product)
+    Parameters:
+        space: {'SECTION.KEY': [값, ...], ...}
+    Returns:
+        list of {'SECTION.KEY': 값}
+    """
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+
+def random_space(space, n, seed=None):
+    """
+    무작위 조합 n개 (중복 제외)
+    Parameters:
+        space: {'SECTION.KEY': [후보 값, ...] 또는 (최소, 최대)}
+               튜플 범위는 둘 다 int면 정수, 아니면 실수로 뽑는다
+    """
+    rng = random.Random(seed)
+    keys = list(space)
+    candidates = []
+    seen = set()
+    for _ in range(n * 20):  # 조합 수가 n보다 작을 때 무한 반복 방지
+        if len(candidates) >= n:
+            break
+        params = {}
+        for key in keys:
+            choices = space[key]
+            if isinstance(choices, tuple):
+                low, high = choices
+                if isinstance(low, int) and isinstance(high, int):
+                    params[key] = rng.randint(low, high)
+                else:
+                    params[key] = round(rng.uniform(low, high), 6)
+            else:
+                params[key] = rng.choice(list(choices))
+        marker = tuple(params[key] for key in keys)
+        if marker not in seen:
+            seen.add(marker)
+            candidates.append(params)
+    return candidates
+
+
+def indicator_key(params):
+    """지표 계산에 영향을 주는 키만 모은 정렬 키 (같으면 지표 재사용 가능)"""
+    return tuple(sorted((key, value) for key, value in params.items() if key not in SIGNAL_KEYS))
+
+
+# ---- 공유 메모리 캔들 ----
+
+class SharedCandles:
+    """
+    OHLCV 배열을 공유 메모리 한 블록에 올려 두고 워커가 이름으로 붙어 쓰게 한다
+    (블록 구성: timestamp int64[n] + open/high/low/close/volume float64[5, n])
+    """
+
+    def __init__(self, df):
+        n = len(df)
+        self.length = n
+        timestamps = np.asarray(df.index.values)
+        self.index_dtype = timestamps.dtype.str  # datetime64 단위(ns/us/ms) 유지
+        self.shm = SharedMemory(create=True, size=max(8 * n * (1 + len(CANDLE_COLUMNS)), 1))
+        index, values = _views(self.shm.buf, n)
+        index[:] = timestamps.view(np.int64)
+        for row, column in enumerate(CANDLE_COLUMNS):
+            values[row] = df[column].to_numpy(dtype=float)
+
+    @property
+    def spec(self):
+        """워커에 넘기는 접속 정보 (이름, 길이, 시간 dtype)"""
+        return self.shm.name, self.length, self.index_dtype
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _views(buf, n):
+    index = np.ndarray((n,), dtype=np.int64, buffer=buf)
+    values = np.ndarray((len(CANDLE_COLUMNS), n), dtype=np.float64, buffer=buf, offset=8 * n)
+    return index, values
+
+
+def attach_candles(spec):
+    """
+    공유 메모리에 붙어 캔들 DataFrame 생성
+    Returns:
+        (SharedMemory, DataFrame) - 다 쓰면 SharedMemory.close() (unlink는 만든 쪽에서)
+    """
+    name, n, index_dtype = spec
+    try:
+        shm = SharedMemory(name=name, track=False)
+    except TypeError:  # Python 3.12 이하: 붙은 쪽이 종료하면서 블록을 지우지 않도록 추적 해제
+        shm = SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    index, values = _views(shm.buf, n)
+    df = pd.DataFrame({column: values[row] for row, column in enumerate(CANDLE_COLUMNS)},
+                      index=pd.DatetimeIndex(index.view(index_dtype), name='timestamp'), copy=False)
+    return shm, df
+
+
+# ---- 평가 ----
+
+def compact(result):
+    """워커 -> 부모로 돌려줄 요약 (거래 목록 제외)"""
+    return {key: value for key, value in result.items() if key not in ('trades', 'winloss')}
+
+
+# 워커 프로세스 상태 (initializer에서 한 번 붙고 작업 사이에 유지)
+_worker = {}
+
+
+def _init_worker(spec, trigger_amount):
+    shm, base = attach_candles(spec)
+    _worker.clear()
+    _worker.update({
+        'shm': shm,
+        'base': base,
+        'prices': tuple(base[column].to_numpy() for column in ('open', 'high', 'low', 'close')),
+        'trigger_amount': trigger_amount,
+        'indicator_key': None,
+        'calculated': None,
+        'codes_key': None,
+        'codes': None,
+    })
+
+
+def _release_worker():
+    shm = _worker.pop('shm', None)
+    _worker.clear()
+    if shm is not None:
+        shm.close()
+
+
+def candidate_codes(params):
+    """
+    워커에서 후보 설정의 전체 구간 시그널 배열 (지표는 같은 지표 설정끼리, 시그널은 같은 후보끼리 재사용)
+    Returns:
+        signal_matrix.strategy_codes() 결과 + 'combined'(우선순위 합성)
+    """
+    params_key = tuple(sorted(params.items()))
+    if _worker['codes_key'] == params_key:
+        return _worker['codes']
+
+    key = indicator_key(params)
+    if _worker['indicator_key'] != key or _worker['calculated'] is None:
+        overrides = to_overrides({name: value for name, value in key})
+        _worker['calculated'], _ = process_chart_data(_worker['base'].copy(), config=overrides)
+        _worker['indicator_key'] = key
+
+    codes = strategy_codes(_worker['calculated'], merge_config(to_overrides(params)))
+    codes['combined'] = blend(codes)
+    _worker['codes'] = codes
+    _worker['codes_key'] = params_key
+    return _worker['codes']
+
+
+def worker_prices():
+    """워커의 (open, high, low, close) 배열과 TP/SL 트리거 금액"""
+    return _worker['prices'], _worker['trigger_amount']
+
+
+def map_candles(df, func, tasks, workers=None, trigger_amount=TRIGGER_AMOUNT, chunksize=None):
+    """
+    df를 공유 메모리에 올리고 워커 프로세스에서 func(task)를 실행 (결과는 tasks 순서)
+    workers=1이면 현재 프로세스에서 순차 실행
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (workers * 4))
+
+    with SharedCandles(df) as candles:
+        if workers == 1:
+            _init_worker(candles.spec, trigger_amount)
+            try:
+                return [func(task) for task in tasks]
+            finally:
+                _release_worker()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(candles.spec, trigger_amount)) as executor:
+            return list(executor.map(func, tasks, chunksize=chunksize))
+
+
+def _evaluate(task):
+    position, params = task
+    start = time.perf_counter()
+    codes = candidate_codes(params)
+    prices, trigger_amount = worker_prices()
+    results = {tag: compact(summarize(simulate(prices, code, trigger_amount)))
+               for tag, code in codes.items()}
+    return {'index': position, 'params': params, 'results': results, 'elapsed': time.perf_counter() - start}
+
+
+def rank(rows, target='combined', min_trades=0):
+    """target 전략 기준 PnL, 승률 내림차순 (거래 수가 min_trades 미만인 조합 제외)"""
+    eligible = [row for row in rows if row['results'][target]['total_trades'] >= min_trades]
+    return sorted(eligible, key=lambda row: (-row['results'][target]['total_pnl'],
+                                             -row['results'][target]['win_rate'], row['index']))
+
+
+def run_sweep(df, candidates, target='combined', workers=None, min_trades=0,
+              trigger_amount=TRIGGER_AMOUNT, chunksize=None):
+    """
+    후보 설정을 병렬로 백테스트해 순위 목록 반환
+    Parameters:
+        df: OHLCV 데이터프레임 (timestamp 인덱스)
+        candidates: grid_space / random_space 결과
+        target: 순위 기준 ('combined' 또는 'st'/'lr'/'sz'/'dv')
+        workers: 프로세스 수 (기본 CPU 수, 1이면 현재 프로세스에서 순차 실행)
+    Returns:
+        list of {'index', 'params', 'results': {전략: summarize 요약}, 'elapsed'}
+    """
+    if target not in STRATEGY_ORDER + ('combined',):
+        raise ValueError(f"Invalid target: {target}")
+
+    # 지표 설정이 같은 후보끼리 같은 워커 묶음에 들어가도록 정렬
+    tasks = sorted(enumerate(candidates), key=lambda task: (indicator_key(task[1]), task[0]))
+    rows = map_candles(df, _evaluate, tasks, workers, trigger_amount, chunksize)
+    return rank(rows, target, min_trades)
+
+
+def format_ranking(rows, target='combined', top=10):
+    """순위 상위 top개 출력용 문자열 목록"""
+    lines = []
+    for place, row in enumerate(rows[:top], start=1):
+        result = row['results'][target]
+        params = ', '.join(f"{key}={value}" for key, value in row['params'].items())
+        lines.append(f"{place:>3}. PnL ${result['total_pnl']:,.2f} | 승률 {result['win_rate']:.1f}% "
+                     f"({result['wins']}/{result['total_trades']}) | {params}")
+    return lines
+
+
+if __name__ == "__main__":
+    import sys
+
+    from docs.utility.bench_strategies import make_ohlcv
+    from docs.utility.candle_cache import load_candles
+
+    # 로컬 캔들 캐시가 있으면 실제 데이터, 없으면 합성 5분봉 30일치
+    df = load_candles('BTCUSDT', '5m')
+    if df is None or len(df) < 1000:
+        df = make_ohlcv(8640)
+        print("로컬 캔들 캐시 없음: 합성 데이터 사용")
+    print(f"캔들 {len(df)}개")
+
+    space = {
+        'SUPERTREND.ATR_MULTIPLIER': [4, 5, 6, 7],
+        'LINEAR_REG.LENGTH': [80, 100, 120],
+        'MACD_SIZE.SIZE_RATIO_THRESHOLD': [0.8, 0.9, 1.0],
+    }
+    candidates = grid_space(space) if '--random' not in sys.argv else random_space(
+        {'SUPERTREND.ATR_MULTIPLIER': (3.0, 8.0), 'LINEAR_REG.LENGTH': (60, 140),
+         'MACD_SIZE.SIZE_RATIO_THRESHOLD': (0.6, 1.2)}, 36, seed=0)
+
+    t0 = time.perf_counter()
+    sequential = run_sweep(df, candidates, workers=1)
+    sequential_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    parallel = run_sweep(df, candidates)
+    parallel_time = time.perf_counter() - t0
+
+    assert [row['index'] for row in sequential] == [row['index'] for row in parallel]
+    print(f"{len(candidates)}개 조합: 순차 {sequential_time:.1f}s, 병렬({os.cpu_count()}코어) {parallel_time:.1f}s")
+    for line in format_ranking(parallel):
+        print(line)
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+# 블록 내 누적 감쇠값이 언더플로하지 않도록 하는 하한 (exp(-600) ~ 1e-261)
+_MIN_LOG_DECAY = -600.0
+
+
+def first_order_filter(values, alpha, initial):
+    """
+    1차 IIR 필터 y[i] = alpha * x[i] + (1 - alpha) * y[i-1] (y[-1] = initial)
+    x[i]가 NaN이면 y[i] = y[i-1] 로 이전 값을 유지한다.
+
+    파이썬 루프 대신 블록 단위 누적곱/누적합으로 계산한다.
+    블록 안에서는 y[i] = P[i] * (y0 + Σ b[k] / P[k]) (P는 감쇠 누적곱) 이고,
+    감쇠 누적곱이 언더플로하지 않는 길이로 블록을 나눠 이전 블록의 마지막 값을 이어받는다.
+    """
+    x = np.asarray(values, dtype=float)
+    n = len(x)
+    out = np.empty(n)
+    if n == 0:
+        return out
+
+    valid = ~np.isnan(x)
+
+    # alpha가 1이면 감쇠가 0 → 유효값 그대로, NaN은 이전 값 유지
+    if alpha >= 1:
+        positions = np.where(valid, np.arange(n), -1)
+        np.maximum.accumulate(positions, out=positions)
+        out[:] = np.where(positions >= 0, x[np.maximum(positions, 0)], initial)
+        return out
+
+    if valid.all():
+        decay = np.full(n, 1 - alpha)
+        drive = alpha * x
+    else:
+        decay = np.where(valid, 1 - alpha, 1.0)
+        drive = np.where(valid, alpha * x, 0.0)
+
+    block = max(1, int(_MIN_LOG_DECAY / np.log(1 - alpha)))
+    prev = initial
+    for start in range(0, n, block):
+        end = min(start + block, n)
+        cum_decay = np.cumprod(decay[start:end])
+        out[start:end] = cum_decay * (prev + np.cumsum(drive[start:end] / cum_decay))
+        prev = out[end - 1]
+    return out
+
+
+def ema_with_sma_init(series, period):
+    """
+    cal_chart의 EMA (첫 봉 값으로 시작)
+    - 첫 봉이 NaN이면 0에서 시작
+    - NaN 입력은 이전 EMA 값을 유지
+    """
+    # NaN 체크
+    if series.isnull().any():
+        print(f"Warning: Input series contains {series.isnull().sum()} NaN values")
+
+    multiplier = 2 / (period + 1)
+    values = series.to_numpy(dtype=float)
+    if len(values) == 0:
+        return pd.Series(0.0, index=series.index)
+
+    # y[-1]을 첫 값으로 두면 y[0] = 첫 값 (NaN이면 0)
+    initial = values[0] if not np.isnan(values[0]) else 0.0
+    return pd.Series(first_order_filter(values, multiplier, initial), index=series.index)
+
+
+def wilder_smoothing(series, period):
+    """
+    Wilder 평활 (첫 유효값부터 시작, 이전 구간은 NaN, NaN 입력은 이전 값 유지)
+    """
+    if not isinstance(series, pd.Series):
+        series = pd.Series(series)
+
+    values = series.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return pd.Series(index=series.index)
+
+    first_valid_loc = int(valid.argmax())
+    smoothed = np.full(len(values), np.nan)
+    smoothed[first_valid_loc:] = first_order_filter(values[first_valid_loc:], 1 / period, values[first_valid_loc])
+    return pd.Series(smoothed, index=series.index)
+
+
+def rma(series, period):
+    """RMA (Wilder 방식 EMA, pandas ewm 사용)"""
+    alpha = 1 / period
+    return series.ewm(alpha=alpha, adjust=False).mean()
+
+
+def _ema_with_sma_init_loop(series, period):
+    """기존 cal_chart 루프 구현 (벤치마크용)"""
+    multiplier = 2 / (period + 1)
+    ema = pd.Series(0.0, index=series.index)
+    first_valid_idx = series.first_valid_index()
+    if first_valid_idx:
+        ema.loc[first_valid_idx] = series.loc[first_valid_idx]
+    for i in range(1, len(series)):
+        prev_ema = ema.iloc[i-1]
+        curr_price = series.iloc[i]
+        if pd.notna(curr_price) and pd.notna(prev_ema):
+            ema.iloc[i] = (curr_price * multiplier) + (prev_ema * (1 - multiplier))
+        else:
+            ema.iloc[i] = curr_price if pd.notna(curr_price) else prev_ema
+    return ema
+
+
+def _wilder_smoothing_loop(series, period):
+    """기존 cal_chart 루프 구현 (벤치마크용)"""
+    series = series.astype(float)
+    first_valid_loc = series.index.get_loc(series.first_valid_index())
+    smoothed = np.full(len(series), np.nan)
+    smoothed[first_valid_loc] = series.iloc[first_valid_loc]
+    for i in range(first_valid_loc + 1, len(series)):
+        current_value = series.iloc[i]
+        prev_value = smoothed[i-1]
+        if np.isnan(current_value):
+            smoothed[i] = prev_value
+        elif np.isnan(prev_value):
+            smoothed[i] = current_value
+        else:
+            smoothed[i] = (prev_value * (period - 1) + current_value) / period
+    return pd.Series(smoothed, index=series.index)
+
+
+if __name__ == "__main__":
+    import time
+
+    def best_of(func, *args, repeat=20):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func(*args)
+            times.append(time.perf_counter() - start)
+        return result, min(times)
+
+    # 기존 루프 구현과의 일치 여부 및 속도 비교 (NaN 구간 포함)
+    rng = np.random.default_rng(0)
+    for n in (300, 2100):
+        index = pd.date_range('2025-01-01', periods=n, freq='5min')
+        values = 100000 + np.cumsum(rng.standard_normal(n) * 80)
+        values[[5, 6, 50, 51, 52, n - 1]] = np.nan
+        series = pd.Series(values, index=index)
+        leading_nan = series.copy()
+        leading_nan.iloc[:3] = np.nan
+
+        for name, fast, slow, source, period in (
+            ('ema_with_sma_init', ema_with_sma_init, _ema_with_sma_init_loop, series, 12),
+            ('wilder_smoothing', wilder_smoothing, _wilder_smoothing_loop, leading_nan, 14),
+        ):
+            expected, loop_time = best_of(slow, source, period, repeat=1)
+            result, vec_time = best_of(fast, source, period)
+            np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-10, equal_nan=True, err_msg=name)
+            print(f"{name} {n}봉: 루프 {loop_time * 1000:.2f}ms, 벡터화 {vec_time * 1000:.3f}ms ({loop_time / vec_time:.0f}배)")
@@ -0,0 +1,173 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# 루프 구현과의 허용 오차
+# 합산 순서만 다르므로 상대오차 1e-9 이내에서 동일한 값을 반환한다
+PARITY_RTOL = 1e-9
+PARITY_ATOL = 1e-6
+
+# 한 번에 만드는 윈도우 행 수 (메모리 상한: CHUNK_ROWS * length * 8 byte)
+CHUNK_ROWS = 4096
+
+
+def rolling_linreg(close, length, chunk_rows=CHUNK_ROWS):
+    """
+    파인스크립트 방식 선형회귀 채널 계산 (벡터화)
+
+    Parameters:
+        close: 종가 배열 (Series 또는 ndarray)
+        length: 회귀 윈도우 길이
+    Returns:
+        slope, intercept, average, std_dev 배열 (윈도우가 차지 않는 앞부분은 NaN)
+    """
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+
+    slope = np.full(n, np.nan)
+    intercept = np.full(n, np.nan)
+    average = np.full(n, np.nan)
+    std_dev = np.full(n, np.nan)
+
+    if length < 1 or n < length:
+        return slope, intercept, average, std_dev
+
+    # x는 윈도우의 가장 오래된 봉이 0, 최신 봉이 length-1
+    x = np.arange(length, dtype=float)
+    sum_x = x.sum()
+    sum_x2 = (x * x).sum()
+    length_f = float(length)
+    denom = length_f * sum_x2 - sum_x * sum_x
+
+    # 표준편차 계산은 최신 봉부터 j=0,1,2... 순서로 기대값을 비교 (기존 구현과 동일)
+    j = x
+
+    windows = sliding_window_view(close, length)
+    for start in range(0, len(windows), chunk_rows):
+        block = windows[start:start + chunk_rows]
+        out = slice(start + length - 1, start + length - 1 + len(block))
+
+        sum_y = block.sum(axis=1)
+        sum_xy = block @ x
+
+        if denom != 0:
+            block_slope = (length_f * sum_xy - sum_x * sum_y) / denom
+        else:
+            block_slope = np.full(len(block), np.nan)
+        block_intercept = (sum_y - block_slope * sum_x) / length_f
+
+        expected = block_intercept[:, None] + block_slope[:, None] * j
+        diff = block[:, ::-1] - expected
+
+        slope[out] = block_slope
+        intercept[out] = block_intercept
+        average[out] = sum_y / length_f
+        std_dev[out] = np.sqrt((diff * diff).sum(axis=1) / length_f)
+
+    return slope, intercept, average, std_dev
+
+
+def trend_duration(slope):
+    """
+    기울기 부호가 연속으로 유지된 봉 수 (상승 +, 하락 -, 기울기 없음 0)
+    첫 봉은 기울기가 없으면 -1로 시작한다 (기존 구현과 동일)
+    """
+    slope = np.asarray(slope, dtype=float)
+    n = len(slope)
+    duration = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return duration
+
+    up = slope >= 0
+    down = slope < 0
+    sign = np.where(up, 1, np.where(down, -1, 0))
+    if sign[0] == 0:
+        sign[0] = -1
+
+    # 부호가 바뀌는 지점마다 새 구간 시작
+    run_start = np.r_[True, sign[1:] != sign[:-1]]
+    run_id = np.cumsum(run_start) - 1
+    start_pos = np.flatnonzero(run_start)
+    run_len = np.arange(n) - start_pos[run_id] + 1
+
+    duration[:] = sign * run_len
+    return duration
+
+
+def _linreg_loop(close, length):
+    """기존 process_chart_data의 루프 구현 (검증용)"""
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    slope = np.full(n, np.nan)
+    intercept = np.full(n, np.nan)
+    average = np.full(n, np.nan)
+    std_dev = np.full(n, np.nan)
+
+    for i in range(length - 1, n):
+        sum_x = 0.0
+        sum_y = 0.0
+        sum_xy = 0.0
+        sum_x2 = 0.0
+        for j in range(length):
+            price = close[i - j]
+            x = length - 1 - j
+            sum_x += x
+            sum_y += price
+            sum_xy += x * price
+            sum_x2 += x * x
+        m = float(length)
+        slope[i] = (m * sum_xy - sum_x * sum_y) / (m * sum_x2 - sum_x * sum_x)
+        intercept[i] = (sum_y - slope[i] * sum_x) / m
+        average[i] = sum_y / m
+
+    for i in range(length - 1, n):
+        sum_diff_sq = 0.0
+        for j in range(length):
+            diff = close[i - j] - (intercept[i] + slope[i] * float(j))
+            sum_diff_sq += diff * diff
+        std_dev[i] = np.sqrt(sum_diff_sq / length)
+
+    return slope, intercept, average, std_dev
+
+
+def _trend_duration_loop(slope):
+    """기존 process_chart_data의 추세 지속성 루프 (검증용)"""
+    duration = np.zeros(len(slope), dtype=np.int64)
+    for i in range(len(slope)):
+        is_uptrend = slope[i] >= 0
+        is_downtrend = slope[i] < 0
+        if i == 0:
+            current = 1 if is_uptrend else -1
+        else:
+            prev = duration[i - 1]
+            if is_uptrend:
+                current = (prev + 1) if prev >= 0 else 1
+            elif is_downtrend:
+                current = (prev - 1) if prev <= 0 else -1
+            else:
+                current = 0
+        duration[i] = current
+    return duration
+
+
+if __name__ == "__main__":
+    import time
+
+    # 루프 구현과의 일치 여부 및 속도 비교
+    rng = np.random.default_rng(0)
+    length = 100
+    for n in (300, 2100):
+        close = 100000 + np.cumsum(rng.standard_normal(n) * 80)
+
+        start = time.perf_counter()
+        expected = _linreg_loop(close, length)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = rolling_linreg(close, length)
+        vec_time = time.perf_counter() - start
+
+        for name, a, b in zip(('slope', 'intercept', 'average', 'std_dev'), expected, result):
+            np.testing.assert_allclose(b, a, rtol=PARITY_RTOL, atol=PARITY_ATOL, equal_nan=True, err_msg=name)
+        np.testing.assert_array_equal(trend_duration(result[0]), _trend_duration_loop(result[0]))
+
+        print(f"{n}봉: 루프 {loop_time * 1000:.1f}ms, 벡터화 {vec_time * 1000:.2f}ms ({loop_time / vec_time:.0f}배)")
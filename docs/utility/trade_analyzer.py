@@ -1,12 +1,14 @@
 import json
 import pandas as pd
 from datetime import datetime, timedelta, timezone
-from pymongo import MongoClient
+from docs.utility.mongo_client import get_client
 from pathlib import Path
 
+from docs.strategy.signal import Signal, to_signal, label
+
 class TradeAnalyzer:
-    def __init__(self, mongo_uri="mongodb://mongodb:27017", db_name="bitcoin", collection_name="chart_5m", logs_dir="logs"):
-        self.client = MongoClient(mongo_uri)
+    def __init__(self, mongo_uri=None, db_name="bitcoin", collection_name="chart_5m", logs_dir="logs"):
+        self.client = get_client(mongo_uri)  # 프로세스 공유 클라이언트
         self.db = self.client[db_name]
         self.collection = self.db[collection_name]
         self.logs_dir = Path(logs_dir)
@@ -106,7 +108,9 @@ class TradeAnalyzer:
         for signal in signal_data:
             timestamp = signal['timestamp']
             tag = signal['tag']
-            position = signal['position']
+            # 스냅샷 파일 값(과거 형식 포함) -> Signal, 화면에는 'Long'/'Short' 라벨로 전달
+            signal_value = to_signal(signal['position'])
+            position = label(signal_value)
             
             # 전략별 신호 저장
             if tag:
@@ -148,11 +152,10 @@ class TradeAnalyzer:
                     print(f"타임스탬프 처리 오류: {e}")
             
             # 포지션 타임라인 생성
-            position_value = 1 if position == 'Long' else -1 if position == 'Short' else 0
             position_timeline.append({
                 'timestamp': timestamp,
                 'position': position,
-                'value': position_value
+                'value': int(signal_value)
             })
         
         
@@ -165,7 +168,7 @@ class TradeAnalyzer:
                 current = position_timeline[i]
                 next_item = position_timeline[i + 1]
                 
-                if current['position'] in ['Long', 'Short']:
+                if current['value'] != Signal.NONE:
                     position_ranges.append({
                         'start': current['timestamp'],
                         'end': next_item['timestamp'],
@@ -2,6 +2,8 @@ import json
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from docs.strategy.signal import label
+
 class TradeLogger:
     def __init__(self, base_dir="logs"):
         self.base_dir = Path(base_dir)
@@ -15,7 +17,7 @@ class TradeLogger:
         Args:
             server_time: 서버 시간 (UTC로 가정)
             tag: 전략 태그
-            position: 포지션 방향
+            position: 포지션 방향 (Signal, 파일에는 화면용 'Long'/'Short'/null로 저장)
         """
         # 5분 단위로 반올림
         rounded_time = server_time.replace(minute=(server_time.minute // 5) * 5, second=0, microsecond=0)
@@ -23,7 +25,7 @@ class TradeLogger:
         snapshot = {
             "timestamp": rounded_time.isoformat(),  # ISO 형식으로 저장
             "tag": tag,
-            "position": position
+            "position": label(position)
         }
         
         # 파일에 로그 추가 (파일이 없으면 생성)
@@ -0,0 +1,278 @@
+"""
+워크 포워드 검증 (학습 구간 -> 검증 구간을 밀어 가며 반복)
+
+    from docs.utility.walk_forward import run_walk_forward
+    report = run_walk_forward(df, train_size=2016, test_size=36)          # 리버스 판단 검증
+    report = run_walk_forward(df, 2016, 288, candidates=grid_space(...))  # 파라미터 튜닝 검증
+
+- 학습 구간에서 back_test와 같은 규칙(should_reverse)으로 전략별 리버스 여부를 정하고,
+  candidates가 여러 개면 학습 구간 성적이 가장 좋은 설정을 고른 뒤
+  바로 다음 검증 구간(표본 외)에 그대로 적용한 성적을 모은다
+- 지표/시그널은 후보마다 전체 기간에서 한 번만 계산하고 구간별로 배열을 잘라 쓴다
+  (겹치는 구간마다 다시 계산하지 않음, 재귀 지표의 워밍업도 구간 경계에서 끊기지 않는다)
+- 구간 묶음 x 후보 조합을 param_sweep 워커 풀에서 병렬로 평가한다
+- 학습 구간은 back_test처럼 포지션 없이 시작하는 조각으로 평가하고,
+  검증 구간 시그널(구간별 리버스 적용)은 하나로 이어 붙여 전체 가격 위에서 한 번에 시뮬레이션한다
+  (검증 구간 끝에 열려 있는 거래도 다음 봉들에서 TP/SL까지 진행, 손익은 신호 봉이 속한 구간에 넣는다)
+"""
+import math
+import os
+
+import numpy as np
+
+from docs.utility.backtest_engine import (TRIGGER_AMOUNT, price_arrays, should_reverse, simulate, summarize,
+                                          trade_pnl)
+from docs.strategy.signal import SIGNAL_DTYPE
+from docs.strategy.signal_matrix import STRATEGY_ORDER, blend
+from docs.utility.param_sweep import candidate_codes, compact, indicator_key, map_candles, worker_prices
+
+TAGS = STRATEGY_ORDER + ('combined',)
+
+
+def walk_windows(n, train_size, test_size, step=None):
+    """
+    봉 n개 위 학습/검증 구간 목록
+    Parameters:
+        train_size, test_size: 구간 길이 (봉 개수)
+        step: 다음 구간까지 이동 거리 (기본 test_size, 검증 구간이 겹치지 않음)
+    Returns:
+        list of (구간 번호, 학습 시작, 학습 끝, 검증 시작, 검증 끝) - 끝은 포함하지 않음
+    """
+    step = step or test_size
+    if train_size < 2 or test_size < 2 or step < 1:
+        raise ValueError(f"Invalid window sizes: train={train_size}, test={test_size}, step={step}")
+    windows = []
+    start = 0
+    while start + train_size + test_size <= n:
+        train_end = start + train_size
+        windows.append((len(windows), start, train_end, train_end, train_end + test_size))
+        start += step
+    return windows
+
+
+def _run(prices, code, start, end, trigger_amount):
+    sliced = tuple(values[start:end] for values in prices)
+    return summarize(simulate(sliced, code[start:end], trigger_amount))
+
+
+def _evaluate_windows(task):
+    """
+    워커: 한 후보의 전체 구간 시그널을 한 번 만들고 구간 묶음별 학습 성적/리버스 판단 계산
+    검증 구간은 시그널 조각만 돌려주고 시뮬레이션은 구간 선택 후 이어 붙여서 한다
+    """
+    position, params, windows = task
+    codes = candidate_codes(params)
+    prices, trigger_amount = worker_prices()
+
+    records = []
+    for number, train_start, train_end, test_start, test_end in windows:
+        train = {tag: _run(prices, codes[tag], train_start, train_end, trigger_amount) for tag in TAGS}
+        records.append({
+            'window': number,
+            'candidate': position,
+            'params': params,
+            'train': {tag: compact(result) for tag, result in train.items()},
+            'reverse': {tag: should_reverse(train[tag]) for tag in STRATEGY_ORDER},
+            'test_codes': {tag: codes[tag][test_start:test_end].copy() for tag in STRATEGY_ORDER},
+        })
+    return records
+
+
+def oos_series(records, windows, n):
+    """
+    구간 기록의 검증 구간 시그널을 제자리에 이어 붙인 길이 n 배열 (검증 구간 밖은 NONE)
+    Returns:
+        as_is(그대로), reversed(학습 구간 리버스 판단 적용, main.py와 같이 롱/숏 뒤집기),
+        owner(봉 -> 구간 번호, 검증 구간 밖은 -1)
+    """
+    as_is = {tag: np.zeros(n, dtype=SIGNAL_DTYPE) for tag in STRATEGY_ORDER}
+    flipped = {tag: np.zeros(n, dtype=SIGNAL_DTYPE) for tag in STRATEGY_ORDER}
+    owner = np.full(n, -1)
+    for record in sorted(records, key=lambda record: record['window']):
+        _, _, _, test_start, test_end = windows[record['window']]
+        owner[test_start:test_end] = record['window']
+        for tag in STRATEGY_ORDER:
+            segment = record['test_codes'][tag]
+            as_is[tag][test_start:test_end] = segment
+            flipped[tag][test_start:test_end] = -segment if record['reverse'][tag] else segment
+    as_is['combined'] = blend(as_is)
+    flipped['combined'] = blend(flipped)
+    return as_is, flipped, owner
+
+
+def oos_totals(trades, owner, windows):
+    """
+    이어 붙인 검증 시그널의 거래 합계 (PnL, 거래 수, 승률, 수익 구간 수)
+    구간별 손익은 신호 봉이 속한 검증 구간에 넣는다
+    """
+    result = summarize(trades)
+    window_pnl = {}
+    for trade in trades:
+        number = owner[trade[0]]
+        window_pnl[number] = window_pnl.get(number, 0) + trade_pnl(trade)
+    return {
+        'total_pnl': result['total_pnl'],
+        'total_trades': result['total_trades'],
+        'wins': result['wins'],
+        'win_rate': result['win_rate'],
+        'profitable_windows': sum(1 for pnl in window_pnl.values() if pnl > 0),
+        'windows': windows,
+    }
+
+
+def _select(records, target, min_trades):
+    """구간마다 학습 성적(target 기준 PnL, 승률)이 가장 좋은 후보 기록"""
+    best = {}
+    for record in records:
+        train = record['train'][target]
+        if train['total_trades'] < min_trades and record['candidate'] != 0:
+            continue
+        score = (train['total_pnl'], train['win_rate'], -record['candidate'])
+        current = best.get(record['window'])
+        if current is None or score > current[0]:
+            best[record['window']] = (score, record)
+    return [best[number][1] for number in sorted(best)]
+
+
+def _report(records, windows, prices, trigger_amount):
+    as_is, flipped, owner = oos_series(records, windows, len(prices[0]))
+    return {
+        'as_is': {tag: oos_totals(simulate(prices, as_is[tag], trigger_amount), owner, len(records))
+                  for tag in TAGS},
+        'reversed': {tag: oos_totals(simulate(prices, flipped[tag], trigger_amount), owner, len(records))
+                     for tag in TAGS},
+        'reverse_rate': {tag: sum(record['reverse'][tag] for record in records) / len(records) if records else 0
+                         for tag in STRATEGY_ORDER},
+    }
+
+
+def run_walk_forward(df, train_size, test_size, step=None, candidates=None, target='combined',
+                     min_trades=0, workers=None, window_chunk=None, trigger_amount=TRIGGER_AMOUNT):
+    """
+    워크 포워드 실행
+    Parameters:
+        df: OHLCV 데이터프레임 (timestamp 인덱스)
+        train_size, test_size, step: walk_windows 참고 (봉 개수)
+        candidates: param_sweep.grid_space / random_space 결과 (없으면 현재 STG_CONFIG 하나)
+                    여러 개면 첫 번째를 기준 설정으로 비교한다
+        target: 후보 선택 기준 전략 ('combined' 또는 'st'/'lr'/'sz'/'dv')
+        min_trades: 학습 구간 거래 수가 이보다 적은 후보는 선택하지 않음 (기준 설정은 예외)
+        window_chunk: 작업 하나에 넣을 구간 수 (기본: 후보가 하나면 워커 수로 나눔)
+    Returns:
+        dict: windows, selected(구간별 선택 기록), tuned/baseline(이어 붙인 검증 구간 합계)
+    """
+    if target not in TAGS:
+        raise ValueError(f"Invalid target: {target}")
+    candidates = candidates or [{}]
+    windows = walk_windows(len(df), train_size, test_size, step)
+    if not windows:
+        raise ValueError(f"데이터가 부족합니다: {len(df)}개 봉 < 학습 {train_size} + 검증 {test_size}")
+
+    workers = workers or os.cpu_count() or 1
+    if window_chunk is None:
+        window_chunk = math.ceil(len(windows) / workers) if len(candidates) == 1 else len(windows)
+    chunks = [windows[i:i + window_chunk] for i in range(0, len(windows), window_chunk)]
+
+    # 같은 후보(지표 설정)의 구간 묶음이 이어서 처리되도록 정렬
+    tasks = [(position, params, chunk) for position, params in enumerate(candidates) for chunk in chunks]
+    tasks.sort(key=lambda task: (indicator_key(task[1]), task[0], task[2][0][0]))
+    records = [record for batch in map_candles(df, _evaluate_windows, tasks, workers, trigger_amount, chunksize=1)
+               for record in batch]
+
+    selected = _select(records, target, min_trades)
+    prices = price_arrays(df)
+    report = {
+        'windows': windows,
+        'index': (df.index[windows[0][1]], df.index[windows[-1][4] - 1]),
+        'selected': selected,
+        'tuned': _report(selected, windows, prices, trigger_amount),
+    }
+    if len(candidates) > 1:
+        report['baseline'] = _report([record for record in records if record['candidate'] == 0],
+                                     windows, prices, trigger_amount)
+    return report
+
+
+def format_report(report, target='combined'):
+    """출력용 문자열 목록"""
+    start, end = report['index']
+    lines = [f"워크 포워드: 구간 {len(report['windows'])}개 ({start} ~ {end})"]
+    if 'baseline' in report:
+        sections = [('기준 설정', report['baseline']), ('선택 설정', report['tuned'])]
+    else:
+        sections = [('현재 설정', report['tuned'])]
+    for title, section in sections:
+        lines.append(f"[{title}] 검증 구간 합계")
+        for tag in TAGS:
+            for label, totals in (('그대로', section['as_is'][tag]), ('리버스 적용', section['reversed'][tag])):
+                lines.append(f"  {tag:<8} {label:<6} PnL ${totals['total_pnl']:,.2f} | 승률 {totals['win_rate']:.1f}% "
+                             f"({totals['wins']}/{totals['total_trades']}) | 수익 구간 "
+                             f"{totals['profitable_windows']}/{totals['windows']}")
+        rates = ', '.join(f"{tag} {rate * 100:.0f}%" for tag, rate in section['reverse_rate'].items())
+        lines.append(f"  리버스 판단 비율: {rates}")
+
+    if 'baseline' in report:
+        chosen = {}
+        for record in report['selected']:
+            marker = tuple(record['params'].items())
+            chosen[marker] = chosen.get(marker, 0) + 1
+        lines.append(f"구간별 선택 설정 ({target} 기준, 상위 5개):")
+        for marker, count in sorted(chosen.items(), key=lambda item: -item[1])[:5]:
+            params = ', '.join(f"{key}={value}" for key, value in marker) or '기본 STG_CONFIG'
+            lines.append(f"  {count}회: {params}")
+    return lines
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from docs.utility.bench_strategies import make_ohlcv
+    from docs.utility.candle_cache import load_candles
+    from docs.utility.param_sweep import grid_space
+
+    BARS_PER_DAY = 288  # 5분봉
+
+    # 로컬 캔들 캐시가 있으면 실제 데이터, 없으면 합성 5분봉 1년치
+    df = load_candles('BTCUSDT', '5m')
+    if df is None or len(df) < 30 * BARS_PER_DAY:
+        df = make_ohlcv(365 * BARS_PER_DAY)
+        print("로컬 캔들 캐시 없음: 합성 데이터 사용")
+    print(f"캔들 {len(df)}개")
+
+    # back_test.py 운영 주기: 최근 7일로 판단, 3시간마다 갱신
+    t0 = time.perf_counter()
+    report = run_walk_forward(df, train_size=7 * BARS_PER_DAY, test_size=36)
+    print(f"리버스 검증 {time.perf_counter() - t0:.1f}s")
+    for line in format_report(report):
+        print(line)
+
+    # 리버스를 적용하지 않은 검증 합계 = 검증 구간 밖 시그널을 지운 전체 기간 backtest_columns 한 번
+    from docs.cal_chart import process_chart_data
+    from docs.strategy.signal_matrix import SIGNAL_COLUMNS, signal_matrix
+    from docs.utility.backtest_engine import backtest_columns
+
+    df_calculated, stg_config = process_chart_data(df.copy())
+    signals = signal_matrix(df_calculated, stg_config)
+    signals['combined'] = blend({tag: signals[SIGNAL_COLUMNS[tag]].to_numpy() for tag in STRATEGY_ORDER})
+    signals.iloc[:report['windows'][0][3]] = 0
+    signals.iloc[report['windows'][-1][4]:] = 0
+    full = backtest_columns(df, list(signals.columns), signals=signals)
+    for tag in TAGS:
+        expected = full[SIGNAL_COLUMNS.get(tag, 'combined')]
+        totals = report['tuned']['as_is'][tag]
+        assert (totals['total_pnl'], totals['total_trades'], totals['wins']) == \
+            (expected['total_pnl'], expected['total_trades'], expected['wins']), tag
+    print("리버스 미적용 검증 합계 = 전체 기간 백테스트 일치")
+
+    if '--tune' in sys.argv:
+        candidates = [{}] + grid_space({
+            'SUPERTREND.ATR_MULTIPLIER': [4, 5, 6, 7],
+            'LINEAR_REG.LENGTH': [80, 100, 120],
+        })
+        t0 = time.perf_counter()
+        report = run_walk_forward(df, train_size=30 * BARS_PER_DAY, test_size=7 * BARS_PER_DAY,
+                                  candidates=candidates, min_trades=5)
+        print(f"\n튜닝 검증 {len(candidates)}개 후보: {time.perf_counter() - t0:.1f}s")
+        for line in format_report(report):
+            print(line)
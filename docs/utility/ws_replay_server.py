@@ -0,0 +1,76 @@
+"""
+Bybit 공개 WebSocket 흉내 서버 (기록된 프레임 재생, 테스트용)
+
+구독 요청을 받으면 구독한 topic의 프레임만 순서대로 보내고, ping에는 pong으로 답한다.
+프레임은 KlineStream(record_path=...)로 기록한 JSONL 파일이나 synthetic_frames()로 만든다.
+"""
+import asyncio
+import json
+
+import websockets
+
+
+def load_frames(path):
+    """JSONL 파일의 프레임 목록"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_frames(symbol, interval, start_ms, bars, updates_per_bar=3, price=100000.0):
+    """
+    봉마다 진행 중 업데이트(confirm=false) 몇 개와 마감(confirm=true) 1개, tickers 1개씩 생성
+    마감 프레임은 한 번 더 보내 중복 처리를 확인할 수 있게 한다.
+    """
+    interval_ms = int(interval) * 60 * 1000
+    frames = []
+    for i in range(bars):
+        start = start_ms + i * interval_ms
+        open_ = price
+        for j in range(updates_per_bar + 1):
+            price = open_ + (j - 1) * 10.0
+            confirm = j == updates_per_bar
+            item = {
+                "start": start, "end": start + interval_ms - 1, "interval": str(interval),
+                "open": str(open_), "close": str(price), "high": str(max(open_, price) + 5),
+                "low": str(min(open_, price) - 5), "volume": str(1.5 * (j + 1)), "turnover": "0",
+                "confirm": confirm, "timestamp": start + (interval_ms - 1 if confirm else j * 1000),
+            }
+            frames.append({"topic": f"kline.{interval}.{symbol}", "type": "snapshot", "data": [item],
+                           "ts": item["timestamp"]})
+            if confirm:
+                frames.append(frames[-1])
+        frames.append({"topic": f"tickers.{symbol}", "type": "delta",
+                       "data": {"symbol": symbol, "lastPrice": str(price)}, "ts": start + interval_ms})
+    return frames
+
+
+async def serve_replay(frames, host='127.0.0.1', port=0, interval=0.0):
+    """
+    재생 서버 시작 (port=0 이면 빈 포트 사용: server.sockets[0].getsockname()[1])
+    interval: 프레임 사이 대기(초)
+    """
+    async def handler(websocket):
+        request = json.loads(await websocket.recv())
+        topics = set(request.get('args', []))
+        await websocket.send(json.dumps({"success": True, "ret_msg": "", "conn_id": "replay",
+                                         "op": request.get('op', 'subscribe')}))
+
+        async def answer_pings():
+            async for raw in websocket:
+                if json.loads(raw).get('op') == 'ping':
+                    await websocket.send(json.dumps({"success": True, "ret_msg": "pong", "op": "ping"}))
+
+        responder = asyncio.ensure_future(answer_pings())
+        try:
+            for frame in frames:
+                if frame.get('topic') in topics:
+                    await websocket.send(json.dumps(frame))
+                    if interval:
+                        await asyncio.sleep(interval)
+            await responder
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            responder.cancel()
+
+    return await websockets.serve(handler, host, port)
@@ -1,13 +1,18 @@
-from tqdm import tqdm
 from docs.get_chart import chart_update, chart_update_one
-from docs.cal_chart import process_chart_data
 from docs.cal_position import cal_position
-from docs.get_current import fetch_investment_status
-from docs.making_order import set_leverage, create_order_with_tp_sl, close_position, get_position_amount
+from docs.get_current import fetch_account_snapshot
+from docs.making_order import set_leverage, create_order_with_tp_sl, close_position
 from docs.utility.cal_close import isclowstime
+from docs.strategy.signal import Signal, label
 from docs.current_price import get_current_price
 from docs.utility.load_data import load_data
-from datetime import datetime, timezone, timedelta
+from docs.utility.mongo_client import get_database, health_check, pool_metrics
+from docs.utility.indicator_state import IndicatorState
+from docs.kline_stream import KlineStream
+from docs.utility.bar_scheduler import BarScheduler
+from docs.utility.exchange_clock import clock
+from docs.exchange_gateway import warm_up
+from datetime import datetime, timezone
 from docs.utility.trade_logger import TradeLogger
 from docs.utility.check_pnl import get_7win_rate
 import time
@@ -54,21 +59,36 @@ win_reverse_flag = False
 
 trade_logger = TradeLogger()
 
+# 스트리밍 지표 상태 (최초 1회 히스토리로 시드 후 마감 봉만 반영)
+indicator_state = None
+INDICATOR_SEED_PERIOD = 300
+INDICATOR_UPDATE_PERIOD = 3  # 직전 반영 봉과 겹치도록 최근 몇 개 봉만 로드
+
+# WebSocket 마감 봉 수신 (실패/지연 시 REST 폴링으로 대체)
+USE_KLINE_STREAM = os.getenv("USE_KLINE_STREAM", "true").lower() == "true"
+KLINE_STREAM_GRACE = 10  # 봉 마감 후 이벤트를 기다리는 최대 시간(초)
+kline_stream = None
+
+REST_CLOSE_DELAY = 5  # REST 폴링 시 서버 렉 고려 봉 마감 후 대기(초)
+
 def get_time_block(dt, interval):
     """datetime 객체를 interval 분 단위로 표현"""
     return (dt.year, dt.month, dt.day, dt.hour, (dt.minute // interval) * interval)
 
-def get_next_run_time(current_time, interval_minutes):
-    """다음 실행 시간 계산"""
-    minute_block = (current_time.minute // interval_minutes + 1) * interval_minutes
-    next_time = current_time.replace(minute=0, second=0, microsecond=0) + timedelta(minutes=minute_block)
-    return next_time
+def reference_price(symbol):
+    """TP/SL 기준가 (스트림 tickers 최근가가 몇 초 이내에 받은 값이면 사용, 아니면 REST 시세 조회)"""
+    if kline_stream is not None:
+        price = kline_stream.fresh_price()
+        if price:
+            return price
+        logger.debug("스트림 최근가 없음/오래됨, REST 시세 조회")
+    return get_current_price(symbol=symbol)
 
 def execute_order(symbol, position, usdt_amount, leverage, stop_loss, take_profit):
     """주문 실행"""
     try:
-        current_price = get_current_price(symbol=symbol)
-        side = "Buy" if position == "Long" else "Sell"
+        current_price = reference_price(symbol)
+        side = "Buy" if position == Signal.LONG else "Sell"
         
         order_response = create_order_with_tp_sl(
             symbol=symbol,
@@ -88,6 +108,8 @@ def execute_order(symbol, position, usdt_amount, leverage, stop_loss, take_profi
         print("주문 생성 실패")
         logger.info(f"주문 생성 실패 재시도 : {symbol}, {side}, {usdt_amount}, {leverage}, {current_price}, {stop_loss}, {take_profit}")
 
+        # 재시도는 기준가를 다시 조회 (TP/SL이 주문에 같이 붙으므로 오래된 가격이면 다시 거절될 수 있음)
+        current_price = reference_price(symbol)
         order_response = create_order_with_tp_sl(
             symbol=symbol,
             side=side,
@@ -135,15 +157,79 @@ def try_update_with_check(config, max_retries=3):
         
     return None, server_time, execution_time  # 실패시에도 기존 형식 유지
 
+def load_config():
+    """전략 리버싱 설정 로드 (공유 MongoDB 연결 사용)"""
+    config = get_database()['config'].find_one({'name': 'reverse_settings'})
+    if config:
+        return config['is_reverse']
+    return None
+
+def wait_for_stream_close(config, bar, scheduler):
+    """
+    bar의 스트림 마감 이벤트 대기 (봉은 이미 저장된 상태로 도착)
+    Returns:
+        이벤트 dict, 스트림 미사용/시간 초과 시 None
+    """
+    if kline_stream is None:
+        return None
+
+    bar_start = bar.start_time.replace(tzinfo=None)
+    timeout = scheduler.seconds_until(bar, KLINE_STREAM_GRACE)
+    event = kline_stream.wait_for_close(config['set_timevalue'], after=bar_start, timeout=max(timeout, 0))
+    if event is None:
+        logger.warning(f"kline 스트림 마감 봉 수신 실패 ({bar_start}), REST 폴링으로 대체")
+        return None
+
+    logger.debug(f"마감 봉 수신: {event['start']}, 지연 {event['stored_latency_ms']:.0f}ms")
+    return event
+
+def update_indicator_state(config, last_closed=None):
+    """
+    새로 마감된 봉만 지표 상태에 반영하고 전략 계산용 DataFrame 반환
+    last_closed: 스트림 마감 이벤트의 봉 시작 시각 (없으면 REST 경로처럼 최신 문서를 미완성 봉으로 제외)
+    """
+    global indicator_state
+
+    if indicator_state is not None:
+        df_recent = load_data(set_timevalue=config['set_timevalue'], period=INDICATOR_UPDATE_PERIOD,
+                              last_closed=last_closed)
+        if df_recent is not None and indicator_state.extend(df_recent):
+            return indicator_state.frame(), indicator_state.stg_config
+        logger.warning("지표 상태와 차트 데이터가 이어지지 않음, 히스토리로 재시드")
+
+    df_rare_chart = load_data(set_timevalue=config['set_timevalue'], period=INDICATOR_SEED_PERIOD,
+                              last_closed=last_closed)
+    if df_rare_chart is None or df_rare_chart.empty:
+        return None, None
+
+    indicator_state = IndicatorState.from_history(df_rare_chart, keep=INDICATOR_SEED_PERIOD)
+    return indicator_state.frame(), indicator_state.stg_config
+
 def main():
     # 초기 설정
     config = TRADING_CONFIG
     stg_tag = None
     stg_side = None
     global trigger_first_active, trigger_first_count, position_first_active, position_first_count, position_save
+    global kline_stream
 
 
     try:
+        # MongoDB 연결 확인
+        mongo_ok, mongo_latency = health_check()
+        if not mongo_ok:
+            logger.error("MongoDB 연결 실패")
+            raise Exception("MongoDB 연결 실패")
+        logger.info(f"MongoDB 연결 확인: {mongo_latency:.1f}ms")
+
+        # 서버 시계 오프셋 주기 측정 (주문 서명/봉 마감 시각 계산에 사용)
+        clock.start()
+        # 거래소 연결/마켓 정보 미리 준비 (첫 주문에서 핸드셰이크/load_markets 비용 제거)
+        warm_up()
+
+        if USE_KLINE_STREAM:
+            kline_stream = KlineStream(config['symbol'], (config['set_timevalue'],)).start()
+
         # 초기 차트 동기화
         last_time, server_time = chart_update(config['set_timevalue'], config['symbol'])
         last_time = last_time['timestamp']
@@ -166,27 +252,28 @@ def main():
             raise Exception("레버리지 설정 실패")
             
         
-        # 메인 루프
+        # 메인 루프 (봉 마감마다 한 번 실행)
+        scheduler = BarScheduler(TIME_VALUES[config['set_timevalue']], delay=REST_CLOSE_DELAY,
+                                 clock=lambda: clock.now_ms() / 1000)
         while True:
-            # 시간 동기화
+            bar = scheduler.next_bar()
+
+            # 스트림으로 마감 봉이 저장되면 바로 진행
+            event = wait_for_stream_close(config, bar, scheduler)
+            if event is None:
+                scheduler.sleep_until(bar)
+
+                # 차트 데이터 업데이트 (재시도 포함)
+                result, update_server_time, execution_time = try_update_with_check(config)
+                if result is None:
+                    logger.error("최대 재시도 횟수 초과, 프로세스 종료")
+                    return
             server_time = datetime.now(timezone.utc)
-            next_run_time = get_next_run_time(server_time, TIME_VALUES[config['set_timevalue']])
-            wait_seconds = (next_run_time - server_time).total_seconds() + 5 # 서버 렉 시간 고려 봉 마감 후 5초 진입입
-            
-            if wait_seconds > 0:
-                with tqdm(total=int(wait_seconds), desc="싱크 조절 중", ncols=100) as pbar:
-                    for _ in range(int(wait_seconds)):
-                        time.sleep(1)
-                        pbar.update(1)
-            
-            # 차트 데이터 업데이트 (재시도 포함)
-            result, update_server_time, execution_time = try_update_with_check(config)
-            if result is None:
-                logger.error("최대 재시도 횟수 초과, 프로세스 종료")
-                return
 
-            df_rare_chart = load_data(set_timevalue=config['set_timevalue'], period=300)
-            if df_rare_chart is None or df_rare_chart.empty:
+            # 차트 데이터 처리 (새 마감 봉만 지표 상태에 반영)
+            df_calculated, STG_CONFIG = update_indicator_state(
+                config, last_closed=event['start'] if event is not None else None)
+            if df_calculated is None or df_calculated.empty:
                 logger.error("데이터 로드 실패: 데이터가 비어있습니다")
                 return
             
@@ -203,41 +290,27 @@ def main():
                     with open('win_rate.json', 'w') as f:
                         json.dump({'win_rate': True}, f)
 
-            # 차트 데이터 처리
-            df_calculated, STG_CONFIG = process_chart_data(df_rare_chart)
-            
+
 
 
             # 시그널 체크 먼저 수행
             try:
-                position, df, tag = cal_position(df=df_calculated, STG_CONFIG = STG_CONFIG)  # 포지션은 숏,롱,None, hma롱, hma숏
-                logger.info(f"결정 포지션: {position}, 전략 : {tag}")
+                position, df, tag = cal_position(df=df_calculated, STG_CONFIG = STG_CONFIG, live=True)  # 포지션은 Signal (LONG / SHORT / NONE)
+                logger.info(f"결정 포지션: {label(position)}, 전략 : {tag}")
             except:
                 logger.info(f"포지션 계산 오류", exc_info=True)
 
 
 
-            # 전략 리버싱 로드
-            from pymongo import MongoClient
-
-            def load_config():
-                mongoClient = MongoClient("mongodb://mongodb:27017")
-                database = mongoClient["bitcoin"]
-                config_collection = database['config']
-                
-                config = config_collection.find_one({'name': 'reverse_settings'})
-                if config:
-                    return config['is_reverse']
-                return None
-
             # 전략 리버싱 체크
             is_reverse = load_config()
+            logger.debug(f"MongoDB 커넥션 풀: {pool_metrics()}")
 
             if is_reverse and tag:
                 reversed_chaek = is_reverse[tag]
 
                 if reversed_chaek:
-                    position = 'Long' if position == 'Short' else 'Short'
+                    position = Signal(-position)
 
             # 승률 리버싱 체크
             with open('win_rate.json', 'r') as f:
@@ -249,40 +322,33 @@ def main():
                 win_rate = True
 
             if win_rate == False:
-                if position == 'Long':
-                    position = 'Short'
-                elif position == 'Short':
-                    position = 'Long'
+                position = Signal(-position)  # 롱 <-> 숏 (NONE은 그대로)
 
 
-            # 포지션 상태 확인
-            balance, positions_json, ledger = fetch_investment_status()
+            # 포지션 상태 확인 (잔고/포지션 동시 조회, 거래 기록은 사용하지 않으므로 생략)
+            snapshot = fetch_account_snapshot()
 
-            error_time = 0
-            if balance == 'error':
+            if snapshot is None:
                 logger.info(f"오류 발생: 상태 확인 api 호출 오류", exc_info=True)
                 
                 for i in range(24):
                     print("API 호출 실패, 5초 후 재시도합니다...")
 
                     time.sleep(5)
-                    error_time += 5
-                    balance, positions_json, ledger = fetch_investment_status()
+                    snapshot = fetch_account_snapshot()
 
                     
-                    if balance != 'error':
+                    if snapshot is not None:
                         logger.info(f"api 호출 재시도 성공", exc_info=True)
                         break
                 else:
                     logger.info(f"api 호출 오류 3분 재시도 실패", exc_info=True)
                     
 
-            positions_flag = positions_json != '[]' and positions_json is not None
+            current_position = snapshot.position(config['symbol']) if snapshot is not None else None
 
-            if positions_flag:  # 포지션이 있는 경우
-                positions_data = json.loads(positions_json)
-                current_amount, current_side, current_avgPrice,pnl = get_position_amount(config['symbol'])
-                current_side = 'Long' if current_side == 'Buy' else 'Short'
+            if current_position is not None:  # 포지션이 있는 경우
+                current_side = current_position.direction
 
                 
                 # 포지션 종료 조건 체크
@@ -389,21 +455,17 @@ def main():
                         logger.info(f"그래프 신호 표시 오류")
     
 
-            remaining_time = 269 - (execution_time + error_time)
-
-            # 남은 시간이 있다면 대기
-            if remaining_time > 0:
-                with tqdm(total=int(remaining_time), desc="대기 중", ncols=100) as pbar:
-                    for _ in range(int(remaining_time)):
-                        time.sleep(1)
-                        pbar.update(1)
-                                
-                        save_signal = position
+            # 마감 -> 결정 지연 기록 (다음 봉은 scheduler.next_bar()가 놓침/지연 판단)
+            scheduler.complete(bar)
+            logger.debug(f"봉 처리 지연: {scheduler.latency_summary()}")
             
     except Exception as e:
         print(f"오류 발생: {e}")
         logger.info(f"오류 발생: {e}", exc_info=True)
         return False
+    finally:
+        if kline_stream is not None:
+            kline_stream.stop()
     
 if __name__ == "__main__":
     main()
\ No newline at end of file